@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ NAME: benchmarkHVSR.py
+
+ DESCRIPTION: a Python script to time the HVSR hot paths on synthetic MUSTANG responses served from a local server
+
+ Copyright (C) 2026  Product Team, IRIS Data Management Center
+
+    This is a free software; you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as
+    published by the Free Software Foundation; either version 3 of the
+    License, or (at your option) any later version.
+
+    This script is distributed in the hope that it will be useful, but
+    WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License (GNU-LGPL) for more details.  The
+    GNU-LGPL and further information can be found here:
+    http://www.gnu.org/
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+ OUTPUTS:
+    the best and median time of each stage, also written as JSON, and the comparison with an earlier result file
+
+ USAGE:
+
+ benchmarkHVSR.py {stations=[number of stations]} {days=[days]} {psds=[PSDs per day]} {bins=[frequency bins]}
+     {repeat=[number of runs]} {workers=[number of concurrent requests]} {seed=[seed]} {output=[JSON file]}
+     {compare=[earlier JSON file]} {tolerance=[slowdown ratio]}
+
+ HISTORY:
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+ NOTES:
+    The synthetic noise-psd XML and noise-pdf text responses (see syntheticMustang.py) are served by a local HTTP
+    server on a thread of this process, so no MUSTANG request is made and the data are the same on every run. For
+    each station the stages run in the computeHVSR.py order through the lib/computeLib.py library API:
+
+        fetch        request and parse the PSDs of the 3 channels over HTTP (computeLib.fetch, workers threads)
+        parse        parse the noise-psd XML of the 3 channels from memory (psdLib.iter_psds)
+        load         assemble the PSDs of each channel (computeLib.get_channel_psds)
+        clean        reject the PSDs outside of the station baseline (computeLib.clean)
+        daily        group the accepted PSDs by day (computeLib.get_daily)
+        median       median daily PSDs (computeLib.get_median_daily)
+        dfa          DFA HVSR (computeLib.compute_hvsrs, method 1)
+        hvsr         HVSR of the parameter file method (computeLib.compute_hvsrs)
+        peaks        find and rank the HVSR peaks (computeLib.get_peaks)
+        pdf parse    parse the noise-pdf text of the 3 channels from memory (pdfLib.parse_pdf)
+        percentiles  baseline percentiles of all frequency bins (pdfLib.get_percentiles)
+
+    A stage time is the total over the stations of one run, the best and the median of the repeats are reported.
+    The JSON file also records the data sizes and a few result values (PSDs accepted, f0 of the best peak), so a
+    change that alters the results shows up next to the timing. With compare, a stage whose best time is over
+    tolerance times the earlier best time is reported as a regression and the script exits with status 1. Stages
+    under 1 ms are not compared.
+"""
+
+version = 'V.2026.291'
+
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+benchmarkDirectory = os.path.dirname(os.path.abspath(__file__))
+hvsrDirectory = os.path.dirname(benchmarkDirectory)
+
+sys.path.append(os.path.join(hvsrDirectory, 'param'))
+sys.path.append(os.path.join(hvsrDirectory, 'lib'))
+
+import numpy as np
+
+import fileLib as fileLib
+import baselineLib as baselineLib
+import computeLib as computeLib
+import pdfLib as pdfLib
+import psdLib as psdLib
+import syntheticMustang as syntheticMustang
+import computeHVSR_param as param
+
+script = os.path.basename(__file__)
+stages = ('fetch', 'parse', 'load', 'clean', 'daily', 'median', 'dfa', 'hvsr', 'peaks', 'pdf parse', 'percentiles')
+start_day = '2020-01-01'
+
+# Stages faster than this (seconds) are not compared.
+min_compare_time = 0.001
+
+
+def usage():
+    """The usage message.
+    """
+    print('\n\n{} ({}):'.format(script, version))
+    print('\nThis script times the HVSR hot paths on synthetic MUSTANG responses served from a local HTTP server.')
+    print('\n\nUsage:\n\n{} stations=[number of stations] days=[days] psds=[PSDs per day] bins=[frequency bins]'
+          '\n\trepeat=[number of runs] workers=[number of concurrent requests] seed=[seed] output=[JSON file]'
+          '\n\tcompare=[earlier JSON file] tolerance=[slowdown ratio]'.format(script))
+    print('\nstations\tnumber of stations; default 3'
+          '\ndays\t\tdays of each station; default 30'
+          '\npsds\t\tPSDs per day of each channel; default 48'
+          '\nbins\t\tfrequency bins of each PSD; default 96'
+          '\nrepeat\t\tnumber of runs, the best and median run are reported; default 3'
+          '\nworkers\t\tnumber of concurrent requests of the fetch stage; default {}'
+          '\nseed\t\tseed of the synthetic data; default 0'
+          '\noutput\t\tthe JSON result file; default scratch/benchmark/benchmarkHVSR.<version>.<time>.json'
+          '\ncompare\t\tan earlier JSON result file to compare with; default none'
+          '\ntolerance\tslowdown ratio of a stage reported as a regression; default 1.25'.format(param.workers))
+    print('\n\nExample:\n\n{} stations=5 days=90 repeat=5 compare=scratch/benchmark/baseline.json'.format(script))
+    print('\n\n\n')
+
+
+def get_args(_arg_list):
+    """get the run arguments"""
+    _args = {}
+    for _i in range(1, len(_arg_list)):
+        try:
+            _key, _value = _arg_list[_i].split('=')
+            _args[_key] = _value
+        except Exception as _e:
+            print('[ERR] Bad parameter: {}, will use the default\n{}'.format(_arg_list[_i], _e), flush=True)
+            continue
+    return _args
+
+
+def get_baseline(_channel, _bins):
+    """the station baseline of a synthetic channel, 10 dB around its noise level"""
+    _frequency = syntheticMustang.get_frequency(_bins)
+    _model = syntheticMustang.get_model(_channel, _frequency)
+    return baselineLib.Baseline(_frequency, _model - 10.0, _model, _model + 10.0)
+
+
+def get_stations(_config, _server):
+    """the HVSR settings of the synthetic stations"""
+    _end = (datetime.datetime.strptime(start_day, '%Y-%m-%d') +
+            datetime.timedelta(days=_config['days'])).strftime('%Y-%m-%d')
+    return [computeLib.get_settings(param, network='XX', station='S{:03d}'.format(_index), location='00',
+                                    channels='BHZ,BHN,BHE', start=start_day, end=_end, n=1, cache='off', store=0,
+                                    archive=0, pdf=False, verbose=-1, remove_outliers=True, bootstrap=0,
+                                    workers=_config['workers'], psd_url=_server.psd_url, pdf_url=_server.pdf_url)
+            for _index in range(_config['stations'])]
+
+
+def get_responses(_settings, _config):
+    """the noise-psd XML and noise-pdf text responses of the channels of a station, for the in-memory stages"""
+    _window = ('{}T00:00:00'.format(_settings.start), '{}T00:00:00'.format(_settings.end))
+    _targets = [computeLib.get_target(_settings, _channel) for _channel in _settings.channels]
+    return ([syntheticMustang.get_psd_xml(_target, *_window, _config['psds'], _config['bins'],
+                                          seed=_config['seed']).encode() for _target in _targets],
+            [syntheticMustang.get_pdf_text(_target, *_window, _config['psds'], _config['bins'], seed=_config['seed'])
+             for _target in _targets])
+
+
+def run_station(_settings, _responses, _times, _checks):
+    """run the stages of one station, adding their time to _times and the result values to _checks"""
+
+    def _timed(_stage, _function, *_args, **_kwargs):
+        _t = time.perf_counter()
+        _value = _function(*_args, **_kwargs)
+        _times[_stage] += time.perf_counter() - _t
+        return _value
+
+    # get_channel_psds reports each segment, keep the timing output readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        _fetched = _timed('fetch', computeLib.fetch, _settings)
+        _timed('parse', lambda: [sum(1 for _psd in psdLib.iter_psds(io.BytesIO(_xml))) for _xml in _responses[0]])
+        _channels = [_timed('load', computeLib.get_channel_psds, _settings, _channel, _fetched)
+                     for _channel in _settings.channels]
+
+    _daily = list()
+    for _psds in _channels:
+        _baseline = baselineLib.align(get_baseline(_psds.channel, len(_psds.x_values)), _psds.x_values)
+        _ok, _not_ok = _timed('clean', computeLib.clean, _psds, baseline=_baseline)
+        _daily.append(_timed('daily', computeLib.get_daily, _psds, _ok))
+        _timed('median', computeLib.get_median_daily, _daily[-1])
+        _checks['PSDs'] += len(_psds.psd_values)
+        _checks['PSDs accepted'] += len(_ok)
+
+    _x_values = _channels[-1].x_values
+    _timed('dfa', computeLib.compute_hvsrs, (1,), _x_values, _daily, _channels[-1].day_time_values)
+    _result = _timed('hvsr', computeLib.compute_hvsrs, (_settings.method,), _x_values, _daily,
+                     _channels[-1].day_time_values)[_settings.method]
+    _peaks = _timed('peaks', computeLib.get_peaks, _result, _settings.hvsr_band, _settings.water_level)
+    if len(_peaks.peak):
+        _best = _peaks.peak[np.argmax(_peaks.peak['score'])]
+        _checks['f0'].append(round(float(_best['f0']), 4))
+
+    for _text in _responses[1]:
+        _frequency, _power, _hits = _timed('pdf parse', pdfLib.parse_pdf, _text)
+        _starts, _counts = pdfLib.get_bins(_frequency)
+        _timed('percentiles', lambda: (pdfLib.get_totals(_hits, _starts),
+                                       pdfLib.get_percentiles(_power, _hits, _starts, _counts, (10, 50, 90))))
+
+
+def run(_config):
+    """run the benchmark, returns the result dictionary"""
+    _server = syntheticMustang.Server(psds=_config['psds'], bins=_config['bins'], seed=_config['seed'])
+    try:
+        _stations = get_stations(_config, _server)
+        _responses = [get_responses(_settings, _config) for _settings in _stations]
+        _runs = {_stage: list() for _stage in stages}
+        _checks = None
+        for _repeat in range(_config['repeat']):
+            _times = {_stage: 0.0 for _stage in stages}
+            _checks = {'PSDs': 0, 'PSDs accepted': 0, 'f0': list()}
+            for _settings, _station_responses in zip(_stations, _responses):
+                run_station(_settings, _station_responses, _times, _checks)
+            for _stage in stages:
+                _runs[_stage].append(round(_times[_stage], 6))
+            print('[INFO] run {} of {}: {:0.3f} s'.format(_repeat + 1, _config['repeat'], sum(_times.values())),
+                  flush=True)
+        _requests = _server.http.requests
+    finally:
+        _server.stop()
+
+    return {'script': script, 'version': version,
+            'created': datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+            'cpus': os.cpu_count(), 'config': _config,
+            'data': {'psd_bytes': sum(len(_xml) for _station in _responses for _xml in _station[0]),
+                     'pdf_bytes': sum(len(_text) for _station in _responses for _text in _station[1]),
+                     'requests': _requests},
+            'checks': _checks,
+            'stages': {_stage: {'best': min(_runs[_stage]), 'median': round(statistics.median(_runs[_stage]), 6),
+                                'runs': _runs[_stage]} for _stage in stages}}
+
+
+def print_result(_result):
+    """print the stage times of a result"""
+    _config = _result['config']
+    print('\n{} stations x {} days x {} PSDs/day x {} bins, 3 channels, {:0.1f} MB of noise-psd XML, '
+          'best of {} runs'.format(_config['stations'], _config['days'], _config['psds'], _config['bins'],
+                                   _result['data']['psd_bytes'] / 1.0e6, _config['repeat']))
+    print('\n\t{:<12s} {:>10s} {:>10s}'.format('stage', 'best (s)', 'median (s)'))
+    for _stage, _time in _result['stages'].items():
+        print('\t{:<12s} {:10.4f} {:10.4f}'.format(_stage, _time['best'], _time['median']))
+    print('\t{:<12s} {:10.4f}'.format('total', sum(_time['best'] for _time in _result['stages'].values())))
+    print('\n\t{} PSDs, {} accepted, f0 of the best peaks: {}'.format(
+        _result['checks']['PSDs'], _result['checks']['PSDs accepted'],
+        ', '.join(str(_f0) for _f0 in sorted(set(_result['checks']['f0'])))), flush=True)
+
+
+def compare(_result, _earlier, _tolerance):
+    """print the best time ratio of each stage to the _earlier result, returns the list of the regressed stages"""
+    if _earlier['config'] != _result['config']:
+        print('[WARN] the configurations differ, earlier: {}'.format(_earlier['config']))
+    if _earlier.get('checks') != _result['checks']:
+        print('[WARN] the result values differ, earlier: {}'.format(_earlier.get('checks')))
+    print('\n\tcompared with {} {} ({})'.format(_earlier['script'], _earlier['version'], _earlier['created']))
+    print('\t{:<12s} {:>10s} {:>10s} {:>8s}'.format('stage', 'earlier', 'now', 'ratio'))
+    _regressions = list()
+    for _stage, _time in _result['stages'].items():
+        if _stage not in _earlier['stages']:
+            continue
+        _before = _earlier['stages'][_stage]['best']
+        _ratio = _time['best'] / _before if _before > 0 else float('inf')
+        _status = ''
+        if max(_before, _time['best']) >= min_compare_time and _ratio > _tolerance:
+            _status = 'SLOWER'
+            _regressions.append(_stage)
+        elif max(_before, _time['best']) >= min_compare_time and _ratio < 1.0 / _tolerance:
+            _status = 'faster'
+        print('\t{:<12s} {:10.4f} {:10.4f} {:8.2f} {}'.format(_stage, _before, _time['best'], _ratio, _status))
+    print(flush=True)
+    return _regressions
+
+
+if __name__ == '__main__':
+    args = get_args(sys.argv)
+    if 'help' in args or 'usage' in args:
+        usage()
+        sys.exit()
+
+    config = {'stations': int(args.get('stations', 3)), 'days': int(args.get('days', 30)),
+              'psds': int(args.get('psds', 48)), 'bins': int(args.get('bins', 96)),
+              'repeat': max(1, int(args.get('repeat', 3))), 'workers': int(args.get('workers', param.workers)),
+              'seed': int(args.get('seed', 0))}
+    tolerance = float(args.get('tolerance', 1.25))
+    output = args.get('output', os.path.join(fileLib.mkdir(param.workDir, 'benchmark'), '{}.{}.{}.json'.format(
+        os.path.splitext(script)[0], version, datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%S'))))
+
+    print('\n[INFO]', script, version)
+    result = run(config)
+    print_result(result)
+    with open(output, 'w') as output_file:
+        json.dump(result, output_file, indent=2)
+    print('[INFO] Result file: {}'.format(output), flush=True)
+
+    if 'compare' in args:
+        with open(args['compare'], 'r') as earlier_file:
+            earlier = json.load(earlier_file)
+        regressions = compare(result, earlier, tolerance)
+        if regressions:
+            print('[ERR] slower than {:0.2f} x the earlier best time: {}'.format(tolerance, ', '.join(regressions)))
+            sys.exit(1)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ NAME: importTime.py
+
+ DESCRIPTION: a Python script to measure the import time of the HVSR scripts when no plot is requested
+
+ Copyright (C) 2026  Product Team, IRIS Data Management Center
+
+    This is a free software; you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as
+    published by the Free Software Foundation; either version 3 of the
+    License, or (at your option) any later version.
+
+    This script is distributed in the hope that it will be useful, but
+    WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License (GNU-LGPL) for more details.  The
+    GNU-LGPL and further information can be found here:
+    http://www.gnu.org/
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+ OUTPUTS:
+    the import time of each script (best of the repeats), its slowest imports and the modules that should only be
+    imported to plot
+
+ USAGE:
+
+ importTime.py {budget=[seconds]} {repeat=[number of runs]} {top=[number of imports to list]}
+
+ HISTORY:
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+ NOTES:
+    Each script is run without arguments under "python -X importtime" in a new interpreter (the script prints its
+    usage message and exits) and the cumulative time of the top-level imports is reported. The script exits with
+    status 1 if the import time of a script is over the budget or if a plot module (matplotlib, ObsPy or
+    scipy.signal) is imported, so it can be used as a startup time check.
+"""
+
+version = 'V.2026.291'
+
+import os
+import sys
+import subprocess
+
+benchmarkDirectory = os.path.dirname(os.path.abspath(__file__))
+binDirectory = os.path.join(os.path.dirname(benchmarkDirectory), 'bin')
+
+script = os.path.basename(__file__)
+scripts = ('computeHVSR.py', 'getStationChannelBaseline.py')
+plot_modules = ('matplotlib', 'obspy', 'scipy.signal')
+
+
+def usage():
+    """The usage message.
+    """
+    print('\n\n{} ({}):'.format(script, version))
+    print('\nThis script measures the import time of {} when no plot is requested.'.format(', '.join(scripts)))
+    print('\n\nUsage:\n\n{} budget=[seconds] repeat=[number of runs] top=[number of imports to list]'.format(script))
+    print('\nbudget\t\tmaximum import time of a script in seconds; default 0.5'
+          '\nrepeat\t\tnumber of runs of each script, the best run is reported; default 5'
+          '\ntop\t\tnumber of the slowest imports to list; default 5')
+    print('\n\n\n')
+
+
+def get_args(_arg_list):
+    """get the run arguments"""
+    _args = {}
+    for _i in range(1, len(_arg_list)):
+        try:
+            _key, _value = _arg_list[_i].split('=')
+            _args[_key] = _value
+        except Exception as _e:
+            print('[ERR] Bad parameter: {}, will use the default\n{}'.format(_arg_list[_i], _e), flush=True)
+            continue
+    return _args
+
+
+def get_import_times(_script):
+    """run _script under -X importtime, returns the {module: (self, cumulative)} import times in seconds
+
+    Only the top-level imports have no leading spaces in the module name column.
+    """
+    _process = subprocess.run([sys.executable, '-X', 'importtime', os.path.join(binDirectory, _script)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    _times = dict()
+    for _line in _process.stderr.splitlines():
+        if not _line.startswith('import time:') or 'self [us]' in _line:
+            continue
+        _self, _cumulative, _name = _line[len('import time:'):].split('|')
+        _times[_name[1:].rstrip()] = (int(_self) / 1.0e6, int(_cumulative) / 1.0e6)
+    return _times
+
+
+def get_total(_times):
+    """total import time, the sum of the cumulative times of the top-level imports"""
+    return sum(_time[1] for _name, _time in _times.items() if not _name.startswith(' '))
+
+
+if __name__ == '__main__':
+    args = get_args(sys.argv)
+    if 'help' in args or 'usage' in args:
+        usage()
+        sys.exit()
+    budget = float(args.get('budget', 0.5))
+    repeat = max(1, int(args.get('repeat', 5)))
+    top = int(args.get('top', 5))
+
+    print('\n[INFO]', script, version)
+    failed = False
+    for this_script in scripts:
+        runs = [get_import_times(this_script) for _ in range(repeat)]
+        times = min(runs, key=get_total)
+        total = get_total(times)
+        status = 'OK' if total <= budget else 'OVER BUDGET'
+        failed = failed or total > budget
+        print('\n{}: {:0.3f} s import time (budget {:0.3f} s, best of {}) {}'.format(this_script, total, budget,
+                                                                                     repeat, status))
+
+        for name, (self_time, cumulative) in sorted(((_name, _time) for _name, _time in times.items()
+                                                     if not _name.startswith(' ')),
+                                                    key=lambda _item: _item[1][1], reverse=True)[:top]:
+            print('\t{:0.3f} s {}'.format(cumulative, name))
+
+        imported = sorted(name.strip() for name in times if name.strip() in plot_modules)
+        if imported:
+            failed = True
+            print('[ERR] {} imports {} without a plot request'.format(this_script, ', '.join(imported)))
+
+    print()
+    sys.exit(1 if failed else 0)
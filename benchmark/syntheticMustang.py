@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ NAME: syntheticMustang.py
+
+ DESCRIPTION: a Python script to serve synthetic MUSTANG noise-psd and noise-pdf responses from a local HTTP server
+
+ Copyright (C) 2026  Product Team, IRIS Data Management Center
+
+    This is a free software; you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as
+    published by the Free Software Foundation; either version 3 of the
+    License, or (at your option) any later version.
+
+    This script is distributed in the hope that it will be useful, but
+    WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License (GNU-LGPL) for more details.  The
+    GNU-LGPL and further information can be found here:
+    http://www.gnu.org/
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+ OUTPUTS:
+    noise-psd XML (format=xml) and noise-pdf text (format=text) responses for any target and time window
+
+ USAGE:
+
+ syntheticMustang.py {port=[port]} {psds=[PSDs per day]} {bins=[frequency bins]} {seed=[seed]}
+
+ HISTORY:
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+ NOTES:
+    The responses have the layout of the MUSTANG web services, so the computeHVSR.py and getStationChannelBaseline.py
+    code paths (request, parse, clean up, daily median, HVSR, peaks and percentiles) run unchanged against them. The
+    vertical channel (?HZ) is a flat noise level, the horizontal channels have a resonance peak near 1.3 Hz. A few
+    PSDs of each day are raised by 30 dB, so the outlier rejection has PSDs to reject.
+
+    The values of a channel and day only depend on the seed, the target and the day, so a response is the same for
+    every run and every request split (run argument n). Used as a module, Server() runs the server on a thread of
+    the calling process (see benchmarkHVSR.py). Run as a script, it serves until interrupted, point the
+    mustangPsdUrl and mustangPdfUrl parameters at it to run computeHVSR.py offline.
+"""
+
+version = 'V.2026.291'
+
+import datetime
+import os
+import sys
+import threading
+import urllib.parse
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+script = os.path.basename(__file__)
+
+# Lowest and highest power (dB) of the noise-pdf histograms.
+PDF_POWER = (-190, -50)
+
+# Share of the PSDs of a day that are raised above the station noise.
+OUTLIER_FRACTION = 0.05
+
+
+def get_frequency(_bins):
+    """the PSD frequencies, _bins log spaced frequencies from 0.05 to 20 Hz"""
+    return np.logspace(np.log10(0.05), np.log10(20.0), _bins)
+
+
+def get_model(_channel, _frequency):
+    """the noise level (dB) of a channel, with a resonance peak near 1.3 Hz on the horizontal channels"""
+    _model = -150.0 + 10.0 * np.log10(1.0 + (0.2 / _frequency) ** 2)
+    if not _channel.endswith('Z'):
+        _model = _model + 12.0 * np.exp(-np.log(_frequency / 1.3) ** 2 / 0.08)
+    return _model
+
+
+def get_days(_start, _end):
+    """the days (datetime) of the start - end window, the start day only if they are the same"""
+    _first = datetime.datetime.strptime(_start[0:10], '%Y-%m-%d')
+    _last = datetime.datetime.strptime(_end[0:10], '%Y-%m-%d')
+    _count = max((_last - _first).days, 1 if _start[0:10] == _end[0:10] else 0)
+    return [_first + datetime.timedelta(days=_index) for _index in range(_count)]
+
+
+def get_rng(_seed, _target, _day):
+    """random generator of a target and day"""
+    return np.random.default_rng([_seed, zlib.crc32('{} {}'.format(_target, _day).encode())])
+
+
+def get_day_psds(_target, _day, _psds_per_day, _bins, seed=0):
+    """the (start times, power (PSDs x bins)) of a day of a target"""
+    _channel = _target.split('.')[3]
+    _frequency = get_frequency(_bins)
+    _rng = get_rng(seed, _target, _day.strftime('%Y-%m-%d'))
+    _power = get_model(_channel, _frequency) + _rng.normal(0.0, 1.0) + _rng.normal(0.0, 2.0, (_psds_per_day, _bins))
+    _power[_rng.random(_psds_per_day) < OUTLIER_FRACTION] += 30.0
+    _step = 86400 // _psds_per_day
+    _starts = [(_day + datetime.timedelta(seconds=_index * _step)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+               for _index in range(_psds_per_day)]
+    return _starts, _power
+
+
+def get_psd_xml(_target, _start, _end, _psds_per_day, _bins, seed=0):
+    """the noise-psd XML response of the target from _start to _end"""
+    _frequency = ['{:0.6g}'.format(_value) for _value in get_frequency(_bins)]
+    _lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+              '<PsdRoot><RequestedDateRange><Start>{}</Start><End>{}</End></RequestedDateRange>'.format(_start, _end),
+              '<Psds target="{}">'.format(_target)]
+    for _day in get_days(_start, _end):
+        _starts, _power = get_day_psds(_target, _day, _psds_per_day, _bins, seed=seed)
+        for _psd_start, _values in zip(_starts, _power):
+            _lines.append('<Psd start="{}" end="{}">'.format(_psd_start, _psd_start))
+            _lines.append(''.join('<value freq="{}" power="{:0.0f}"/>'.format(_freq, _value)
+                                  for _freq, _value in zip(_frequency, _values)))
+            _lines.append('</Psd>')
+    _lines.append('</Psds></PsdRoot>')
+    return '\n'.join(_lines)
+
+
+def get_pdf_text(_target, _start, _end, _psds_per_day, _bins, seed=0):
+    """the noise-pdf text response of the target from _start to _end, the 1 dB histogram of its PSDs"""
+    _days = get_days(_start, _end)
+    _power_bins = np.arange(PDF_POWER[0], PDF_POWER[1] + 1)
+    _hits = np.zeros((_bins, len(_power_bins)), dtype=np.int64)
+    _rows = np.arange(_bins)
+    for _day in _days:
+        _power = np.clip(np.rint(get_day_psds(_target, _day, _psds_per_day, _bins, seed=seed)[1]).astype(np.int64),
+                         PDF_POWER[0], PDF_POWER[1]) - PDF_POWER[0]
+        for _psd in _power:
+            _hits[_rows, _psd] += 1
+    _lines = ['#binFreq, binPower, hits']
+    for _freq, _row in zip(get_frequency(_bins), _hits):
+        _lines.extend('{:0.4f}, {}, {}'.format(_freq, _power, _count) for _power, _count in zip(_power_bins, _row))
+    return '\n'.join(_lines) + '\n'
+
+
+class Handler(BaseHTTPRequestHandler):
+    """serve the noise-psd (format=xml) and noise-pdf (format=text) requests"""
+
+    def log_message(self, *_args):
+        pass
+
+    def do_GET(self):
+        _query = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(self.path).query))
+        _options = self.server.options
+        try:
+            _function = get_psd_xml if _query.get('format', 'xml') == 'xml' else get_pdf_text
+            _body = _function(_query['target'], _query['starttime'], _query['endtime'], _options['psds'],
+                              _options['bins'], seed=_options['seed']).encode()
+        except (KeyError, ValueError, IndexError) as _e:
+            self.send_error(400, str(_e))
+            return
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.bytes += len(_body)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml' if _function is get_psd_xml else 'text/plain')
+        self.send_header('Content-Length', str(len(_body)))
+        self.end_headers()
+        self.wfile.write(_body)
+
+
+class Server:
+    """the synthetic MUSTANG server on a thread of this process, psds PSDs per day of bins frequency bins"""
+
+    def __init__(self, psds=48, bins=96, seed=0, port=0):
+        self.http = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.http.daemon_threads = True
+        self.http.options = {'psds': psds, 'bins': bins, 'seed': seed}
+        self.http.lock = threading.Lock()
+        self.http.requests = 0
+        self.http.bytes = 0
+        self.thread = threading.Thread(target=self.http.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}'.format(self.http.server_address[1])
+
+    @property
+    def psd_url(self):
+        return '{}/mustang/noise-psd/1/query?'.format(self.url)
+
+    @property
+    def pdf_url(self):
+        return '{}/mustang/noise-pdf/1/query?'.format(self.url)
+
+    def stop(self):
+        self.http.shutdown()
+        self.http.server_close()
+
+
+def get_args(_arg_list):
+    """get the run arguments"""
+    _args = {}
+    for _i in range(1, len(_arg_list)):
+        try:
+            _key, _value = _arg_list[_i].split('=')
+            _args[_key] = _value
+        except Exception as _e:
+            print('[ERR] Bad parameter: {}, will use the default\n{}'.format(_arg_list[_i], _e), flush=True)
+            continue
+    return _args
+
+
+if __name__ == '__main__':
+    args = get_args(sys.argv)
+    if 'help' in args or 'usage' in args:
+        print('\n\n{} ({}):\n\n{} port=[port] psds=[PSDs per day] bins=[frequency bins] seed=[seed]\n\n'.format(
+            script, version, script))
+        sys.exit()
+    server = Server(psds=int(args.get('psds', 48)), bins=int(args.get('bins', 96)), seed=int(args.get('seed', 0)),
+                    port=int(args.get('port', 8080)))
+    print('\n[INFO] {} {}\n[INFO] mustangPsdUrl = \'{}\'\n[INFO] mustangPdfUrl = \'{}\''.format(
+        script, version, server.psd_url, server.pdf_url), flush=True)
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ NAME: computeHVSRBatch.py
+
+ DESCRIPTION: a Python script to run computeHVSR.py for all stations of a station list in one process
+
+ Copyright (C) 2026  Product Team, IRIS Data Management Center
+
+    This is a free software; you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as
+    published by the Free Software Foundation; either version 3 of the
+    License, or (at your option) any later version.
+
+    This script is distributed in the hope that it will be useful, but
+    WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License (GNU-LGPL) for more details.  The
+    GNU-LGPL and further information can be found here:
+    http://www.gnu.org/
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+ INPUTS: a station list file with one station per line:
+
+    net sta loc chan start end
+
+ fields are separated by spaces or by commas, chan is the comma separated channel list (for example
+ BHZ,BHN,BHE). Use commas to give an empty location code. Empty lines, lines starting with # and a
+ "net,sta,..." header line are skipped.
+ Script uses the computeHVSR.py parameter file under the 'param' directory.
+
+ OUTPUTS:
+    - the usual computeHVSR.py HVSR, report and plot files of each station
+    - the log of each station under the scratch/batch directory
+    - a summary table of the stations processed
+    - with profile=1 or 2, the stage times of each station and of the whole batch, also written as JSON under the
+      scratch/profile directory
+
+ USAGE:
+
+ computeHVSRBatch.py list=stations.txt {processes=[number of processes]} {computeHVSR.py run arguments}
+
+ the computeHVSR.py run arguments (except net, sta, loc, chan, start and end) apply to all stations
+
+ HISTORY:
+    2026-10-18 IRIS DMC Product Team: created V.2026.291, stations are run through computeHVSR.main(), the profile
+                                      summaries of the stations are combined (run argument profile)
+
+ NOTES:
+    Stations are run by a pool of worker processes. Each worker imports NumPy (and matplotlib if plot=1) once and then
+    calls computeHVSR.main() for one station after another, so the startup cost is paid once per worker and not per
+    station. All stations share the local cache, PSD store and archive of computeHVSR.py. Plots are not displayed.
+"""
+
+version = 'V.2026.291'
+
+import os
+import sys
+import time
+import json
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+# Import the HVSR parameters and libraries.
+hvsrDirectory = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+paramPath = os.path.join(hvsrDirectory, 'param')
+libPath = os.path.join(hvsrDirectory, 'lib')
+
+sys.path.append(paramPath)
+sys.path.append(libPath)
+
+import fileLib as fileLib
+import msgLib as msgLib
+import profileLib as profileLib
+import computeHVSR_param as param
+
+# computeHVSR.py runs only under __main__, importing it gives its main() entry point.
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import computeHVSR as computeHVSR
+
+script = os.path.basename(__file__)
+compute_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'computeHVSR.py')
+station_keys = ('net', 'sta', 'loc', 'chan', 'start', 'end')
+
+
+def usage():
+    """The usage message.
+    """
+    print('\n\n{} ({}):'.format(script, version))
+    print('\nThis script runs computeHVSR.py for all the stations of a station list file using a pool of processes'
+          '\nand prints a summary of the stations processed.'
+          '\n\nThe station list file has one station per line with the fields (separated by spaces or commas):'
+          '\n\n\tnet sta loc chan start end'
+          '\n\nwhere chan is the comma separated channel list.')
+    print('\n\nUsage:\n\n{} list=stations.txt processes=[number of processes] '
+          '{{computeHVSR.py run arguments}}'.format(script))
+    print('\nlist\t\tthe station list file'
+          '\nprocesses\tnumber of stations to process at the same time; default number of CPUs ({})'
+          '\n\nThe other run arguments are passed to computeHVSR.py for all stations, '
+          'see computeHVSR.py for details.'.format(os.cpu_count()))
+    print('\nWith profile=1 or 2 the stage times of the stations are combined in a batch profile, see computeHVSR.py.')
+    print('\n\nExample:\n\n{} list=stations.txt processes=4 method=4 removeoutliers=0 n=1 plot=1'.format(script))
+    print('\n\n\n')
+
+
+def get_args(_arg_list):
+    """get the run arguments"""
+    _args = {}
+    for _i in range(1, len(_arg_list)):
+        try:
+            _key, _value = _arg_list[_i].split('=')
+            _args[_key] = _value
+        except Exception as _e:
+            msgLib.error('Bad parameter: {}, will use the default\n{}'.format(_arg_list[_i], _e), 1)
+            continue
+    return _args
+
+
+def read_station_list(_file):
+    """read the station list file, returns a list of {net, sta, loc, chan, start, end} dictionaries"""
+    _stations = list()
+    with open(_file, 'r') as _list:
+        for _line_number, _line in enumerate(_list, 1):
+            _line = _line.strip()
+            if not _line or _line.startswith('#'):
+                continue
+            _fields = _line.split()
+            if len(_fields) < len(station_keys):
+                _fields = [_field.strip() for _field in _line.split(',')]
+            if _fields[0].lower() == 'net':
+                continue
+            if len(_fields) < len(station_keys):
+                msgLib.error('skipped line {} of {}, expected {} fields: {}'.format(
+                    _line_number, _file, ' '.join(station_keys), _line), 1)
+                continue
+
+            # The channel list may itself be comma separated.
+            _stations.append(dict(zip(station_keys, _fields[0:3] + [','.join(_fields[3:-2])] + _fields[-2:])))
+    return _stations
+
+
+def get_label(_station):
+    """station label used in the logs and the summary"""
+    return '{}.{}.{}'.format(_station['net'], _station['sta'], _station['loc'])
+
+
+def run_station(_station, _args):
+    """run computeHVSR.py for one _station in this process, returns (status, message, elapsed time)
+
+    The output of the run goes to the log file of the station.
+    """
+    _t = time.time()
+    _arg_list = [compute_script] + ['{}={}'.format(_key, _value) for _key, _value in _args.items()] + \
+                ['{}={}'.format(_key, _station[_key]) for _key in station_keys]
+    _log_file = os.path.join(fileLib.mkdir(param.workDir, 'batch'), '{}.{}.{}.log'.format(
+        get_label(_station).replace('*', '_'), _station['start'], _station['end']))
+
+    _status = 'OK'
+    _message = ''
+    with open(_log_file, 'w', encoding='utf-8') as _log, contextlib.redirect_stdout(_log):
+        try:
+            computeHVSR.main(_arg_list)
+        except SystemExit as _e:
+            # computeHVSR.py exits only when it cannot complete the run.
+            _status = 'FAILED'
+            _message = 'exit {}'.format(_e.code)
+        except Exception as _e:
+            _status = 'FAILED'
+            _message = '{}: {}'.format(type(_e).__name__, _e)
+        finally:
+            # Release the figures of this run, the worker process is reused.
+            if 'matplotlib.pyplot' in sys.modules:
+                sys.modules['matplotlib.pyplot'].close('all')
+
+    # Use the last error message of the run for the summary.
+    if _status != 'OK':
+        with open(_log_file, 'r', encoding='utf-8') as _log:
+            _errors = [_line.strip() for _line in _log if _line.startswith('[ERR]')]
+        if _errors:
+            _message = _errors[-1][6:]
+    return _status, _message, time.time() - _t
+
+
+def print_summary(_stations, _results):
+    """print the summary table of the batch run"""
+    _header = ('#', 'station', 'channels', 'start', 'end', 'status', 'time (s)', 'message')
+    _rows = [(str(_i + 1), get_label(_station), _station['chan'], _station['start'], _station['end'], _result[0],
+              '{:0.1f}'.format(_result[2]), _result[1]) for _i, (_station, _result) in enumerate(zip(_stations,
+                                                                                                    _results))]
+    _widths = [max(len(_row[_j]) for _row in [_header] + _rows) for _j in range(len(_header) - 1)]
+    _line = '-' * (sum(_widths) + 2 * len(_widths) + len(_header[-1]))
+    print('\n\n{}'.format(_line))
+    print('  '.join(_value.ljust(_width) for _value, _width in zip(_header, _widths + [0])))
+    print(_line)
+    for _row in _rows:
+        print('  '.join(_value.ljust(_width) for _value, _width in zip(_row, _widths + [0])))
+    print(_line)
+    _failed = sum(1 for _result in _results if _result[0] != 'OK')
+    print('{} stations, {} succeeded, {} failed\n'.format(len(_results), len(_results) - _failed, _failed),
+          flush=True)
+
+
+def get_profile(_stations, _args):
+    """combine the profile summaries of the _stations, returns the batch summary (stage and request totals and the
+    summary of each station)"""
+    _stations_profile = dict()
+    _stages = dict()
+    _counters = dict()
+    _requests = {'count': 0, 'failed': 0, 'bytes': 0, 'seconds': 0.0, 'parse': 0.0}
+    for _station in _stations:
+        _summary = profileLib.read(profileLib.get_file_name(param.profileDirectory,
+                                                            computeHVSR.get_profile_name(dict(_args, **_station))))
+        if _summary is None:
+            continue
+        _stations_profile[_summary['name']] = {_key: _summary[_key] for _key in ('seconds', 'stages', 'counters',
+                                                                                 'request_summary')}
+        for _name, _stage in _summary['stages'].items():
+            _total = _stages.setdefault(_name, {'seconds': 0.0, 'calls': 0})
+            _total['seconds'] += _stage['seconds']
+            _total['calls'] += _stage['calls']
+        for _name, _value in _summary['counters'].items():
+            _counters[_name] = _counters.get(_name, 0) + _value
+        for _key in _requests:
+            _requests[_key] += _summary['request_summary'][_key]
+    return {'name': 'batch', 'seconds': sum(_profile['seconds'] for _profile in _stations_profile.values()),
+            'stages': dict(sorted(_stages.items(), key=lambda _item: _item[1]['seconds'], reverse=True)),
+            'counters': dict(sorted(_counters.items())), 'request_summary': _requests,
+            'stations': _stations_profile}
+
+
+def print_profile(_profile):
+    """print the stage times of each station and of the batch"""
+    _names = list(_profile['stages'])
+    _header = ['station', 'seconds'] + _names
+    _rows = [[_station, '{:0.2f}'.format(_summary['seconds'])] +
+             ['{:0.2f}'.format(_summary['stages'].get(_name, {'seconds': 0.0})['seconds']) for _name in _names]
+             for _station, _summary in _profile['stations'].items()]
+    _rows.append(['total', '{:0.2f}'.format(_profile['seconds'])] +
+                 ['{:0.2f}'.format(_profile['stages'][_name]['seconds']) for _name in _names])
+    _widths = [max(len(_row[_j]) for _row in [_header] + _rows) for _j in range(len(_header))]
+    _line = '-' * (sum(_widths) + 2 * (len(_widths) - 1))
+    print('\n\nstage times (s) of the stations\n{}'.format(_line))
+    print('  '.join(_value.ljust(_width) for _value, _width in zip(_header, _widths)))
+    print(_line)
+    for _row in _rows:
+        if _row[0] == 'total':
+            print(_line)
+        print('  '.join(_value.ljust(_width) for _value, _width in zip(_row, _widths)))
+    print(_line, flush=True)
+
+
+if __name__ == '__main__':
+    # Set run parameters.
+    args = get_args(sys.argv)
+    if 'list' not in args:
+        usage()
+        sys.exit()
+
+    print('\n[INFO]', script, version)
+    station_list = args.pop('list')
+    processes = int(args.pop('processes', os.cpu_count() or 1))
+    for key in station_keys:
+        if key in args:
+            msgLib.warning(script, 'run argument {} is ignored, it is set by the station list'.format(key))
+            args.pop(key)
+
+    # Plots are never displayed in batch mode.
+    args['showplot'] = '0'
+
+    try:
+        stations = read_station_list(station_list)
+    except OSError as e:
+        msgLib.error('failed to read the station list {}\n{}'.format(station_list, e), 1)
+        sys.exit(1)
+    if not stations:
+        msgLib.error('no stations in {}'.format(station_list), 1)
+        sys.exit(1)
+
+    processes = max(1, min(processes, len(stations)))
+    msgLib.info('processing {} stations using {} processes, logs are under {}'.format(
+        len(stations), processes, os.path.join(param.workDir, 'batch')))
+
+    t0 = time.time()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(run_station, station, args) for station in stations]
+        results = list()
+        for station, future in zip(stations, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(('FAILED', '{}: {}'.format(type(e).__name__, e), 0.0))
+            msgLib.info('{} {} to {}: {}'.format(get_label(station), station['start'], station['end'],
+                                                 results[-1][0]))
+
+    print_summary(stations, results)
+    if int(args.get('profile', param.profile)):
+        batch_profile = get_profile(stations, args)
+        print_profile(batch_profile)
+        profile_file = profileLib.get_file_name(param.profileDirectory, 'batch.{}'.format(
+            os.path.splitext(os.path.basename(station_list))[0]))
+        with open(profile_file, 'w') as output:
+            json.dump(batch_profile, output, indent=2)
+        msgLib.info('Profile file: {}'.format(profile_file))
+    msgLib.info('total time {:0.1f} s'.format(time.time() - t0))
+    sys.exit(0 if all(result[0] == 'OK' for result in results) else 1)
@@ -37,6 +37,12 @@
  the default values for the parameters between {} may be provided in the parameter file
 
  HISTORY:
+     2026-10-18 IRIS DMC Product Team: V.2026.291, the noise-pdf response is loaded into NumPy arrays once and the
+                                       percentiles of all frequency bins are computed using cumulative sums
+                                       (lib/pdfLib.py). The noise-pdf responses are cached locally (run argument
+                                       cache). matplotlib and ObsPy are imported only when plot=1. The merged
+                                       noise-pdf histogram of each channel can be kept and updated with the new
+                                       days only (run argument incremental).
      2020-06-04 IRIS DMC Product Team (Manoch): V.2020.156, addressed the warning about Adding an axes using the same
                                                 arguments as a previous axes currently reuses the earlier instance.
      2019-06-19 IRIS DMC Product Team (Manoch): V.2019.171, added Peterson 1993 NLNM and NHNM to the plots and updated
@@ -55,22 +61,15 @@
 
 """
 
-version = 'V.2020.156'
+version = 'V.2026.291'
 
 import os
 import sys
 
-import matplotlib
-import matplotlib.pyplot as plt
-from matplotlib.offsetbox import AnchoredText
-
 import numpy as np
-import urllib
 import datetime
 import importlib
 
-from obspy.signal.spectral_estimation import get_nlnm, get_nhnm
-
 # Set paths based on the script's location.
 scriptDirectory = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 script = os.path.basename(__file__)
@@ -82,6 +81,11 @@ sys.path.append(libPath)
 # Import  HVSR parameters and libraries.
 import fileLib as fileLib
 import msgLib as msgLib
+import cacheLib as cacheLib
+import fetchLib as fetchLib
+import pdfLib as pdfLib
+import storeLib as storeLib
+import histogramLib as histogramLib
 
 
 def usage():
@@ -95,7 +99,9 @@ def usage():
           '\nhttp://srl.geoscienceworld.org/content/80/4/628')
     print('\n\nUsage:\n{} net=netName sta=staName loc=locCode chan=chanCode\n\tstart=2007-03-19 '
           'end=2008-10-28 plot=[0|1] plotnnm=[0|1]' 
-          'verbose=[0, 1] percentlow=[10] \n\tpercenthigh=[90] xtype=[period,frequency]'.format(script))
+          'verbose=[0, 1] percentlow=[10] \n\tpercenthigh=[90] xtype=[period,frequency] cache=[off|read|refresh] '
+          'incremental=[0|1]'
+          .format(script))
     print('\nnet\t\tstation network name'
           '\nsta\t\tstation name'
           '\nloc\t\tstation location code'
@@ -114,9 +120,14 @@ def usage():
           '\npercenthigh\tHighest percentile to compute (float); default {}'
           '\nplot\t\tplot values [0|1]'
           '\nplotnnm\t\tplot the New Noise Models [0|1], active if plot=1'
+          '\ncache\t\tuse the local cache of the MUSTANG responses: off, read (request only if not cached) or '
+          '\n\t\trefresh (always request and update the cache); default {}'
+          '\nincremental\tkeep the merged noise-pdf histogram of each channel and only request the days that are '
+          '\n\t\tnot in it yet, the baseline covers all the days of the histogram [0|1]; default {}'
           '\n\nPeterson, J. (1993). Observations and modeling of seismic background noise, U.S. Geological Survey '
           'open-file report (Vol. 93-322, p. 94). Albuquerque: U.S. Geological Survey.'
-          .format(param.chan, param.xtype, param.verbose, param.percentlow, param.percenthigh))
+          .format(param.chan, param.xtype, param.verbose, param.percentlow, param.percenthigh, param.cache,
+                  param.incremental))
     print('\n\nexamples:\ngetStationChannelBaseline.py net=IU sta=ANMO loc=00 chan=BHZ start=2002-11-20 '
           'end=2008-11-20 plot=1 plotnnm=1 '
           'verbose=1 percentlow=10 percenthigh=90')
@@ -137,6 +148,13 @@ def get_args(arg_list):
     return these_args
 
 
+def get_url(this_target, first_day, end_day):
+    """Get the noise-pdf request URL for the days from first_day to end_day (exclusive).
+   """
+    return '{}target={}&starttime={}&endtime={}&format=text'.format(param.mustangUrl, this_target, first_day,
+                                                                    end_day)
+
+
 def get_param(these_args, this_key, value=None):
     """Get a run argument for a given key.
    """
@@ -171,12 +189,15 @@ if verbose:
     msgLib.info('Param Path: {}'.format(paramPath))
     msgLib.info('loaded: {}'.format(param_file_name))
 
-# If plot is not requested, turn the display requirement.
+# If plot is not requested, turn the display requirement. matplotlib and ObsPy are imported only to plot.
 if do_plot <= 0:
     msgLib.info('Plot OFF!')
-    matplotlib.use('agg')
 else:
+    import matplotlib
+    import matplotlib.pyplot as plt
+    from matplotlib.offsetbox import AnchoredText
     from obspy.imaging.cm import pqlx
+    from obspy.signal.spectral_estimation import get_nlnm, get_nhnm
 
 channel_list = get_param(args, 'chan', value=param.chan)
 network = get_param(args, 'net', msgLib)
@@ -225,6 +246,15 @@ if end_time < start_time:
 
 x_type = get_param(args, 'xtype', value=param.xtype)
 
+# Use the local cache of the MUSTANG responses?
+cache_mode = get_param(args, 'cache', value=param.cache)
+if cache_mode not in cacheLib.MODES:
+    msgLib.error('bad cache value (must be one of {})'.format('|'.join(cacheLib.MODES)), cache_mode)
+    sys.exit()
+
+# Keep the merged noise-pdf histograms and only request the new days?
+incremental = int(get_param(args, 'incremental', value=param.incremental))
+
 channel_index = -1
 got_data = False
 channels = channel_list.strip().replace(' ', '').split(',')
@@ -232,15 +262,6 @@ psd_count = {}
 ax2 = None
 for channel in channels:
     channel_index += 1
-    X = list()
-    Y = list()
-    P = list()
-    x_values = list()
-    y_values = list()
-    pct_low = list()
-    pct_mid = list()
-    pct_high = list()
-
     target = '.'.join([network, station, location, channel, 'M'])
     if start == end:
         title = ' '.join(['.'.join([network, station, location]), 'Station-Channel Baseline for', start])
@@ -249,8 +270,7 @@ for channel in channels:
         title = ' '.join(['.'.join([network, station, location]), 'Station-Channel Baseline', start, '-',
                           end])
         msgLib.info('requesting {} from {} to {}'.format(target, start, end))
-    URL = '{}target={}&starttime={}&endtime={}&format=text'.format(
-        param.mustangUrl, target, start_time.strftime('%Y-%m-%d'), end_time.strftime('%Y-%m-%d'))
+    URL = get_url(target, start_time.strftime('%Y-%m-%d'), end_time.strftime('%Y-%m-%d'))
 
     label = '.'.join([network, station, location, channel_list.replace(',', '-'), 'PSDs', x_type, start,
                       end])
@@ -263,8 +283,25 @@ for channel in channels:
 
     if verbose:
         msgLib.info('requesting: {}'.format(URL))
+    msgLib.info('waiting for reply....')
     try:
-        link = urllib.request.urlopen(URL)
+        if incremental:
+            # Add the days that are not in the histogram yet.
+            (frequency, power, hits), histogram_days, requests = histogramLib.update(
+                param.histogramDirectory, storeLib.get_name(network, station, location, channel), start, end,
+                lambda first_day, end_day: cacheLib.fetch(fetchLib.get_pdf, 'pdf', param.cacheDirectory,
+                                                          get_url(target, first_day, end_day), mode=cache_mode,
+                                                          recent_days=param.cacheRecentDays, ttl=param.cacheTtl,
+                                                          max_size=param.cacheSize),
+                recent_days=param.cacheRecentDays)
+            msgLib.info('{} new requests, the histogram covers {} days'.format(requests, len(histogram_days)))
+            if histogram_days:
+                title = ' '.join(['.'.join([network, station, location]), 'Station-Channel Baseline',
+                                  histogram_days[0], '-', histogram_days[-1]])
+        else:
+            frequency, power, hits = cacheLib.fetch(fetchLib.get_pdf, 'pdf', param.cacheDirectory, URL,
+                                                    mode=cache_mode, recent_days=param.cacheRecentDays,
+                                                    ttl=param.cacheTtl, max_size=param.cacheSize)
     except Exception as e:
         got_data = False
         msgLib.error('failed on target {} {}'.format(target, URL), 1)
@@ -272,91 +309,32 @@ for channel in channels:
 
         continue
 
-    msgLib.info('waiting for reply....')
-
-    data = link.read().decode()
-    lines = data.split('\n')
-    end_frequency = ''
     got_data = True
-    line_count = 0
-    non_blank_last_line = 0
-    if len(lines[-1].strip()) <= 0:
-        non_blank_last_line = 1
-    for line in lines:
-        line_count += 1
-        if len(line.strip()) <= 0:
-            continue
-        if line[0] == '#' or ',' not in line:
-            continue
 
-        (freq, power, hits) = line.split(',')
-        if end_frequency == '':
-            end_frequency = freq.strip()
-            power_list = list()
-            power_list.append(float(power.strip()))
-            hits_list = list()
-            hits_list.append(int(hits.strip()))
-        elif end_frequency == freq.strip():
-            power_list.append(float(power.strip()))
-            hits_list.append(int(hits.strip()))
-
-        # Got all the counts for this bin, find the percentiles.
-        if end_frequency != freq.strip() or line_count == len(lines) - non_blank_last_line:
-            totalHits = sum(hits_list)
-
-            # Get the number of contributing PSDs from the first bin of each channel.
-            if channel not in psd_count.keys():
-                psd_count[channel] = totalHits
-
-            values = list()
-            y_values.append(np.array(hits_list) * 100.0 / totalHits)
-
-            # Find the percentiles.
-            for p in percentile:
-                total = 0
-                this_level = p * float(totalHits) / 100.0
-                # power goes from low to high
-                # here we define percentile as the smallest value in the list such that
-                # no more than P percent of the data is strictly less than the value
-                # and at least P percent of the data is less than or equal to that value
-                previous_power = None
-                for (currentHits, currentPower) in zip(hits_list, power_list):
-                    if previous_power is None:
-                        previous_power = currentPower
-                    total += int(currentHits)
-                    if float(total) == this_level:
-                        values.append(currentPower)
-                        break
-                    elif float(total) > this_level:
-                        values.append(previous_power)
-                        break
-                    previous_power = currentPower
-
-            if x_type == 'period':
-                last_x = 1.0 / float(end_frequency)
-                x_values.append(last_x)
-            else:
-                last_x = float(end_frequency)
-                x_values.append(last_x)
-
-            # Write the baseline file.
-            baseline_file.write('%s %0.2f %0.2f %0.2f\n' % (end_frequency, values[0], values[1], values[2]))
-
-            # Save values for the plot.
-            for i in range(len(hits_list)):
-                Y.append(float(power_list[i]))
-                P.append(float(hits_list[i]) * 100.0 / float(totalHits))
-                X.append(last_x)
-
-            pct_low.append(values[0])
-            pct_mid.append(values[1])
-            pct_high.append(values[2])
-
-            end_frequency = freq.strip()
-            power_list = list()
-            power_list.append(float(power))
-            hits_list = list()
-            hits_list.append(int(hits))
+    # Find the percentiles of all frequency bins at once.
+    starts, counts = pdfLib.get_bins(frequency)
+    totals = pdfLib.get_totals(hits, starts)
+    values = pdfLib.get_percentiles(power, hits, starts, counts, percentile)
+
+    # Get the number of contributing PSDs from the first bin of each channel.
+    if channel not in psd_count.keys() and len(totals):
+        psd_count[channel] = int(totals[0])
+
+    x_values = list(pdfLib.get_x(frequency[starts], xtype=x_type))
+
+    # Write the baseline file.
+    for bin_index, bin_start in enumerate(starts):
+        baseline_file.write('%s %0.2f %0.2f %0.2f\n' % (frequency[bin_start], values[bin_index, 0],
+                                                       values[bin_index, 1], values[bin_index, 2]))
+
+    # Save values for the plot.
+    X = np.repeat(x_values, counts)
+    Y = power
+    P = pdfLib.get_probability(hits, starts, counts)
+
+    pct_low = values[:, 0]
+    pct_mid = values[:, 1]
+    pct_high = values[:, 2]
     msgLib.info('baseline file: {}'.format(baseline_file_name))
     baseline_file.close()
 
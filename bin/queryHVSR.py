@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+ NAME: queryHVSR.py
+
+ DESCRIPTION: a Python script to query the computeHVSR.py results index for the HVSR peaks of the stations
+
+ Copyright (C) 2026  Product Team, IRIS Data Management Center
+
+    This is a free software; you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as
+    published by the Free Software Foundation; either version 3 of the
+    License, or (at your option) any later version.
+
+    This script is distributed in the hope that it will be useful, but
+    WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License (GNU-LGPL) for more details.  The
+    GNU-LGPL and further information can be found here:
+    http://www.gnu.org/
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+ INPUTS: the results index written by computeHVSR.py (param.indexFile, see lib/indexLib.py)
+ Script uses the computeHVSR.py parameter file under the 'param' directory.
+
+ OUTPUTS:
+    a table of the matching peaks (station, window, method, rank, f0, A0, Sf, Sa, score and the bootstrap
+    intervals), optionally with the output files of their runs
+
+ USAGE:
+
+ queryHVSR.py {net=netName} {sta=staName} {loc=locCode} {method=[1-6]} {f0min=[Hz]} {f0max=[Hz]} {a0min=[A0]}
+     {minrank=[score]} {start=2013-01-01} {end=2013-02-01} {best=[0|1]} {files=[0|1]} {limit=[rows]}
+     {index=[index file]}
+
+ HISTORY:
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+ NOTES:
+    The query reads the SQLite index only, no HVSR or report file is opened, so it runs in milliseconds for
+    thousands of stations.
+"""
+
+version = 'V.2026.291'
+
+import os
+import sys
+import time
+
+# Import the HVSR parameters and libraries.
+hvsrDirectory = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+paramPath = os.path.join(hvsrDirectory, 'param')
+libPath = os.path.join(hvsrDirectory, 'lib')
+
+sys.path.append(paramPath)
+sys.path.append(libPath)
+
+import msgLib as msgLib
+import indexLib as indexLib
+import computeHVSR_param as param
+
+script = os.path.basename(__file__)
+query_keys = ('net', 'sta', 'loc', 'method', 'f0min', 'f0max', 'a0min', 'minrank', 'start', 'end', 'best', 'files',
+              'limit', 'index')
+
+
+def usage():
+    """The usage message.
+    """
+    print('\n\n{} ({}):'.format(script, version))
+    print('\nThis script lists the HVSR peaks in the computeHVSR.py results index that match the query.')
+    print('\n\nUsage:\n\n{} net=netName sta=staName loc=locCode method=[1-6] f0min=[Hz] f0max=[Hz] a0min=[A0]'
+          '\n\tminrank=[score] start=2013-01-01 end=2013-02-01 best=[0|1] files=[0|1] limit=[rows]'
+          '\n\tindex=[index file]'.format(script))
+    print('\nnet\t\tstation network code, * and ? wildcards allowed; default all'
+          '\nsta\t\tstation code, * and ? wildcards allowed; default all'
+          '\nloc\t\tstation location code, * and ? wildcards allowed; default all'
+          '\nmethod\t\tcombination method of the runs; default all'
+          '\nf0min\t\tlowest peak frequency f0 (Hz); default none'
+          '\nf0max\t\thighest peak frequency f0 (Hz); default none'
+          '\na0min\t\tlowest peak amplitude A0; default none'
+          '\nminrank\t\tlowest peak score (0-6); default none'
+          '\nstart\t\tonly the runs with a window that ends after start (format YYYY-MM-DD); default none'
+          '\nend\t\tonly the runs with a window that starts before end (format YYYY-MM-DD); default none'
+          '\nbest\t\tlist only the best ranked matching peak of each run [0|1]; default 0'
+          '\nfiles\t\talso list the HVSR, report and image files of each run [0|1]; default 0'
+          '\nlimit\t\tmaximum number of peaks to list; default all'
+          '\nindex\t\tthe results index file; default {}'.format(param.indexFile))
+    print('\n\nExample:\n\n{} f0min=1 f0max=2 minrank=5 best=1'.format(script))
+    print('\n\n\n')
+
+
+def get_args(_arg_list):
+    """get the run arguments"""
+    _args = {}
+    for _i in range(1, len(_arg_list)):
+        try:
+            _key, _value = _arg_list[_i].split('=')
+            _args[_key] = _value
+        except Exception as _e:
+            msgLib.error('Bad parameter: {}, will use the default\n{}'.format(_arg_list[_i], _e), 1)
+            continue
+    return _args
+
+
+def get_number(_args, _key, _type=float):
+    """a numeric run argument, None if not given"""
+    if _key not in _args:
+        return None
+    return _type(_args[_key])
+
+
+def get_text(_value, _format='{:0.3f}'):
+    """a table value, '-' for NULL"""
+    if _value is None:
+        return '-'
+    if isinstance(_value, float):
+        return _format.format(_value)
+    return str(_value)
+
+
+def print_peaks(_rows, _files=False):
+    """print the table of the matching peaks"""
+    _header = ('station', 'channels', 'start', 'end', 'M', 'rank', 'f0', 'A0', 'Sf', 'Sa', 'score', 'f0 interval',
+               'A0 interval')
+    _table = list()
+    for _row in _rows:
+        _table.append(('.'.join([_row['network'], _row['station'], _row['location']]), _row['channels'],
+                       _row['start'], _row['end'], str(_row['method']), str(_row['rank']), get_text(_row['f0']),
+                       get_text(_row['A0']), get_text(_row['stdf'], '{:0.4f}'), get_text(_row['sigma_a'], '{:0.4f}'),
+                       str(_row['score']), '{}-{}'.format(get_text(_row['f0_low']), get_text(_row['f0_high'])),
+                       '{}-{}'.format(get_text(_row['A0_low']), get_text(_row['A0_high']))))
+    _widths = [max(len(_line[_j]) for _line in [_header] + _table) for _j in range(len(_header))]
+    _line = '-' * (sum(_widths) + 2 * (len(_widths) - 1))
+    print('\n{}'.format(_line))
+    print('  '.join(_value.ljust(_width) for _value, _width in zip(_header, _widths)))
+    print(_line)
+    for _row, _values in zip(_rows, _table):
+        print('  '.join(_value.ljust(_width) for _value, _width in zip(_values, _widths)))
+        if _files:
+            for _key in ('hvsr_file', 'report_file', 'image_file'):
+                if _row[_key]:
+                    print('\t{}'.format(_row[_key]))
+            for _file in (_row['files'] or '').split('\n'):
+                if _file:
+                    print('\t{}'.format(_file))
+    print(_line, flush=True)
+
+
+if __name__ == '__main__':
+    args = get_args(sys.argv)
+    if 'help' in args or 'usage' in args or len(sys.argv) < 2:
+        usage()
+        sys.exit()
+    for key in args:
+        if key not in query_keys:
+            msgLib.warning(script, 'run argument {} is ignored'.format(key))
+
+    index_file = args.get('index', param.indexFile)
+    if not os.path.isfile(index_file):
+        msgLib.error('results index {} not found, run computeHVSR.py with index=1 first'.format(index_file), 1)
+        sys.exit(1)
+
+    try:
+        t0 = time.time()
+        rows = indexLib.query(index_file, network=args.get('net'), station=args.get('sta'), location=args.get('loc'),
+                              method=get_number(args, 'method', int), f0_min=get_number(args, 'f0min'),
+                              f0_max=get_number(args, 'f0max'), a0_min=get_number(args, 'a0min'),
+                              min_score=get_number(args, 'minrank'), start=args.get('start'), end=args.get('end'),
+                              best=bool(int(args.get('best', 0))), limit=get_number(args, 'limit', int))
+        elapsed = time.time() - t0
+    except ValueError as e:
+        msgLib.error('invalid query: {}'.format(e), 1)
+        sys.exit(1)
+
+    if rows:
+        print_peaks(rows, _files=bool(int(args.get('files', 0))))
+    msgLib.info('{} peaks of {} runs in {:0.1f} ms'.format(
+        len(rows), len({(_row['network'], _row['station'], _row['location'], _row['channels'], _row['start'],
+                         _row['end'], _row['method']) for _row in rows}), elapsed * 1000.0))
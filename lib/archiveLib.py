@@ -0,0 +1,140 @@
+"""
+  DESCRIPTION
+    a collection of functions to work with the memory-mapped PSD archive of a channel
+
+  HISTORY
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+  NOTES
+    The archive keeps the PSDs of one NET.STA.LOC.CHA in one binary file that is opened with np.memmap, so a date
+    range of a long station history is read without loading the rest of the file:
+
+        header      int64[8]        MAGIC, VERSION, number of frequencies, number of PSDs, first day, end day, 0, 0
+        frequency   float64[F]      the frequencies shared by all PSDs
+        records     (int64, float32[F]) x N, the PSD start time and power, in the order of the start times
+
+    Times are epoch milliseconds. The archive covers the days from first day (inclusive) to end day (exclusive),
+    including the days without PSDs. PSDs are only appended after the end day. The number of PSDs in the header is
+    updated after the records are written, so records of an interrupted append are ignored and overwritten.
+"""
+
+import bisect
+import os
+
+import numpy as np
+
+MAGIC = int.from_bytes(b'HVSRPSD\0', 'little')
+VERSION = 1
+HEADER_SIZE = 8
+
+
+def get_file(_directory, _name):
+    """archive file of the _name channel"""
+    return os.path.join(_directory, '{}.psd'.format(_name))
+
+
+def get_dtype(_frequency_count):
+    """record dtype of an archive with _frequency_count frequencies"""
+    return np.dtype([('time', '<i8'), ('power', '<f4', (_frequency_count,))])
+
+
+def to_epoch(_times):
+    """convert the 'YYYY-MM-DD' days or the 'YYYY-MM-DDTHH:MM:SS.sssZ' times to epoch milliseconds"""
+    return np.array([_time.rstrip('Z') for _time in _times], dtype='datetime64[ms]').astype(np.int64)
+
+
+def from_epoch(_epochs):
+    """convert epoch milliseconds to the 'YYYY-MM-DDTHH:MM:SS.sssZ' times of the MUSTANG responses"""
+    return [_time + 'Z' for _time in np.datetime_as_string(np.asarray(_epochs).astype('datetime64[ms]'), unit='ms')]
+
+
+def read_header(_file):
+    """read the archive header, returns (frequency, count, first day, end day) or None if there is no archive"""
+    try:
+        _header = np.fromfile(_file, dtype='<i8', count=HEADER_SIZE)
+    except (OSError, ValueError):
+        return None
+    if len(_header) < HEADER_SIZE or _header[0] != MAGIC or _header[1] != VERSION:
+        return None
+    _frequency = np.fromfile(_file, dtype='<f8', count=_header[2], offset=HEADER_SIZE * 8)
+    return _frequency, int(_header[3]), int(_header[4]), int(_header[5])
+
+
+def get_coverage(_file):
+    """(first day, end day) epoch milliseconds covered by the archive, None if there is no archive"""
+    _header = read_header(_file)
+    if _header is None:
+        return None
+    return _header[2], _header[3]
+
+
+def get_records(_file):
+    """open the archive records as a read-only memory map, returns (frequency, records) or None"""
+    _header = read_header(_file)
+    if _header is None:
+        return None
+    _frequency, _count = _header[0], _header[1]
+    _dtype = get_dtype(len(_frequency))
+    if _count <= 0:
+        return _frequency, np.empty(0, dtype=_dtype)
+    return _frequency, np.memmap(_file, dtype=_dtype, mode='r', offset=(HEADER_SIZE + len(_frequency)) * 8,
+                                 shape=(_count,))
+
+
+def read(_file, _start, _end):
+    """read the PSDs starting from _start (inclusive) to _end (exclusive) epoch milliseconds
+
+    Only the records of the range are read, the times are found by a binary search of the memory map. Returns a
+    list of (start, frequency, power) PSDs like the parsed noise-psd response, the power arrays are views of the
+    memory map.
+    """
+    _archive = get_records(_file)
+    if _archive is None:
+        return list()
+    _frequency, _records = _archive
+    _times = _records['time']
+    _first = bisect.bisect_left(_times, _start)
+    _last = bisect.bisect_left(_times, _end, lo=_first)
+    _power = _records['power'][_first:_last]
+    return [(_time, _frequency, _power[_i]) for _i, _time in enumerate(from_epoch(_times[_first:_last]))]
+
+
+def append(_file, _frequency, _times, _power, _first_day, _end_day):
+    """append the PSDs of the days from _first_day to _end_day epoch milliseconds to the archive
+
+    The archive is created if it does not exist, otherwise _first_day must be its end day and _frequency its
+    frequencies.
+    """
+    _header = read_header(_file)
+    if _header is None:
+        _count = 0
+        _coverage_start = _first_day
+        _mode = 'w+b'
+    else:
+        _archive_frequency, _count, _coverage_start, _coverage_end = _header
+        if _coverage_end != _first_day:
+            raise ValueError('appended days must start at the end of the archive')
+        if not np.array_equal(_archive_frequency, _frequency):
+            raise ValueError('appended PSDs must have the archive frequencies')
+        _mode = 'r+b'
+
+    _dtype = get_dtype(len(_frequency))
+    _records = np.empty(len(_times), dtype=_dtype)
+    _records['time'] = _times
+    if len(_times):
+        _records['power'] = _power
+
+    with open(_file, _mode) as _output:
+        if _header is None:
+            np.array([MAGIC, VERSION, len(_frequency), 0, _first_day, _first_day, 0, 0], dtype='<i8').tofile(_output)
+            np.asarray(_frequency, dtype='<f8').tofile(_output)
+        _output.seek((HEADER_SIZE + len(_frequency)) * 8 + _count * _dtype.itemsize)
+        _output.write(_records.tobytes())
+        _output.truncate()
+        _output.flush()
+        os.fsync(_output.fileno())
+
+        # Commit the new records.
+        _output.seek(0)
+        np.array([MAGIC, VERSION, len(_frequency), _count + len(_times), _coverage_start, _end_day, 0, 0],
+                 dtype='<i8').tofile(_output)
@@ -0,0 +1,101 @@
+"""
+  DESCRIPTION
+    a collection of functions to load the station channel baseline files written by getStationChannelBaseline.py
+
+  HISTORY
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+  NOTES
+    A baseline file has a '#frequency <low> percentile <mid> percentile <high> percentile' header line and one
+    'frequency low mid high' line per frequency bin. It is parsed once into NumPy arrays and kept in memory by file
+    name, and parsed again only if the file changes (modification time or size), so a long-running (batch) process
+    does not re-read the baseline of a channel for every run.
+
+    The baseline frequencies come from the noise-pdf service and may not match the frequencies of the noise-psd
+    PSDs. align() interpolates the baseline onto the PSD frequencies (linear in log frequency). PSD frequencies
+    outside of the baseline range get NaN values, so they never reject a PSD.
+"""
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+# Parsed baselines by file name: (modification time, size, Baseline).
+_loaded = dict()
+
+
+@dataclass
+class Baseline:
+    """station channel baseline as written by getStationChannelBaseline.py"""
+    x_values: np.ndarray
+    low: np.ndarray
+    mid: np.ndarray
+    high: np.ndarray
+    percent_low: str = ''
+    percent_mid: str = ''
+    percent_high: str = ''
+
+
+def read(_file_name):
+    """parse a baseline file, raises OSError if it is not available and ValueError if it is not a baseline file"""
+    _percent = ['', '', '']
+    _rows = list()
+    with open(_file_name, 'r') as _baseline_file:
+        for _line in _baseline_file:
+            _line = _line.strip()
+            if not _line:
+                continue
+            if _line.startswith('#'):
+                _values = _line.split()
+                _percent = [_values[1], _values[3], _values[5]]
+                continue
+            _rows.append(_line.split()[0:4])
+
+    _values = np.array(_rows, dtype=float).reshape(-1, 4)
+
+    # Keep the bins in increasing frequency order for the interpolation.
+    _values = _values[np.argsort(_values[:, 0], kind='stable')]
+    return Baseline(_values[:, 0], _values[:, 1], _values[:, 2], _values[:, 3], *_percent)
+
+
+def load(_file_name):
+    """the parsed baseline of _file_name, parsed again only if the file has changed since the last load
+
+    The returned Baseline is shared between the calls and must not be modified.
+    """
+    _stat = os.stat(_file_name)
+    _key = os.path.abspath(_file_name)
+    if _key in _loaded and _loaded[_key][0:2] == (_stat.st_mtime_ns, _stat.st_size):
+        return _loaded[_key][2]
+    _baseline = read(_file_name)
+    _loaded[_key] = (_stat.st_mtime_ns, _stat.st_size, _baseline)
+    return _baseline
+
+
+def clear():
+    """forget the loaded baselines"""
+    _loaded.clear()
+
+
+def is_aligned(_baseline, _x_values):
+    """True if the baseline frequencies are the _x_values frequencies"""
+    return len(_baseline.x_values) == len(_x_values) and np.allclose(_baseline.x_values, _x_values, rtol=1.0e-6,
+                                                                      atol=0.0)
+
+
+def align(_baseline, _x_values):
+    """the baseline on the _x_values frequencies, interpolated linearly in log frequency if they differ
+
+    Frequencies outside of the baseline range get NaN values.
+    """
+    if is_aligned(_baseline, _x_values):
+        return _baseline
+
+    _x_values = np.asarray(_x_values, dtype=float)
+    _log_x = np.log10(_x_values)
+    _log_baseline_x = np.log10(_baseline.x_values)
+    _values = list()
+    for _y in (_baseline.low, _baseline.mid, _baseline.high):
+        _values.append(np.interp(_log_x, _log_baseline_x, _y, left=np.nan, right=np.nan))
+    return Baseline(_x_values, *_values, _baseline.percent_low, _baseline.percent_mid, _baseline.percent_high)
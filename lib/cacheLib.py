@@ -0,0 +1,188 @@
+"""
+  DESCRIPTION
+    a collection of functions to cache the parsed MUSTANG noise-psd and noise-pdf responses on disk
+
+  HISTORY
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+  NOTES
+    Each response is stored as a compressed NumPy .npz file named after the hash of its normalized query, so the
+    parameter sweeps (method, waterlevel, minrank, plot options, ...) of the same station and window run without
+    requesting MUSTANG again.
+
+    cache modes:
+        off      do not use the cache
+        read     use the cached response if available, otherwise request and cache it
+        refresh  always request and cache the response
+
+    Responses with an end time within 'recent_days' of the time they were cached may still be updated by MUSTANG,
+    they expire 'ttl' hours after they were cached. The other responses do not expire. When the cache grows
+    larger than 'max_size' MB, the least recently used responses are removed.
+
+    The size of the cache is estimated from the responses written by this process, the directory is only scanned
+    when the estimate passes 'max_size' and on every EVICT_INTERVAL writes (other processes may write to the same
+    directory, e.g. the computeHVSRBatch.py workers).
+"""
+
+import datetime
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+
+MODES = ('off', 'read', 'refresh')
+
+# Writes between two scans of the cache directory.
+EVICT_INTERVAL = 100
+
+# Estimated size (bytes) and number of writes of each cache directory since its last scan.
+_sizes = dict()
+_writes = dict()
+_lock = threading.Lock()
+
+
+def get_key(_url):
+    """cache key for _url, the hash of its service path and sorted query parameters"""
+    _parts = urllib.parse.urlsplit(_url)
+    _query = sorted((_name.lower(), _value) for _name, _value in urllib.parse.parse_qsl(_parts.query))
+    _normalized = '{}?{}'.format(_parts.path.rstrip('/'), urllib.parse.urlencode(_query))
+    return hashlib.sha1(_normalized.encode()).hexdigest()
+
+
+def get_end_time(_url):
+    """end time of the _url request (None if not available)"""
+    _query = {_name.lower(): _value for _name, _value in urllib.parse.parse_qsl(urllib.parse.urlsplit(_url).query)}
+    try:
+        return datetime.datetime.strptime(_query['endtime'][0:10], '%Y-%m-%d').replace(tzinfo=datetime.timezone.utc)
+    except (KeyError, ValueError):
+        return None
+
+
+def pack(_kind, _value):
+    """convert a parsed response to a dictionary of arrays"""
+    if _kind == 'psd':
+        _frequencies = list()
+        _index = np.empty(len(_value), dtype=np.int64)
+        for _i, (_start, _frequency, _power) in enumerate(_value):
+            if not _frequencies or _frequency is not _frequencies[-1]:
+                _frequencies.append(_frequency)
+            _index[_i] = len(_frequencies) - 1
+        _lengths = [len(_psd[2]) for _psd in _value]
+        return {'start': np.array([_psd[0] for _psd in _value], dtype=str),
+                'power': np.concatenate([_psd[2] for _psd in _value]) if _value else np.empty(0, dtype=np.float32),
+                'power_offset': np.concatenate(([0], np.cumsum(_lengths, dtype=np.int64))),
+                'frequency': np.concatenate(_frequencies) if _frequencies else np.empty(0),
+                'frequency_offset': np.concatenate(([0], np.cumsum([len(_f) for _f in _frequencies],
+                                                                   dtype=np.int64))),
+                'frequency_index': _index}
+    elif _kind == 'pdf':
+        return {'frequency': _value[0], 'power': _value[1], 'hits': _value[2]}
+    raise ValueError(f'unknown cache kind {_kind}')
+
+
+def unpack(_kind, _arrays):
+    """convert the dictionary of arrays back to the parsed response"""
+    if _kind == 'psd':
+        _offset = _arrays['frequency_offset']
+        _frequencies = [_arrays['frequency'][_offset[_i]:_offset[_i + 1]] for _i in range(len(_offset) - 1)]
+        _power = _arrays['power']
+        _power_offset = _arrays['power_offset']
+        return [(str(_start), _frequencies[_arrays['frequency_index'][_i]],
+                 _power[_power_offset[_i]:_power_offset[_i + 1]]) for _i, _start in enumerate(_arrays['start'])]
+    elif _kind == 'pdf':
+        return _arrays['frequency'], _arrays['power'], _arrays['hits']
+    raise ValueError(f'unknown cache kind {_kind}')
+
+
+def get(_kind, _url, _directory):
+    """get the cached response to _url, None if it is not cached or has expired"""
+    _file = os.path.join(_directory, '{}.{}.npz'.format(get_key(_url), _kind))
+    try:
+        with np.load(_file, allow_pickle=False) as _npz:
+            _expires = float(_npz['expires'])
+            if 0 < _expires < time.time():
+                return None
+            _value = unpack(_kind, {_name: _npz[_name] for _name in _npz.files})
+
+        # Mark it as recently used.
+        os.utime(_file)
+        return _value
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def put(_kind, _url, _value, _directory, recent_days=3, ttl=24, max_size=2000):
+    """cache the parsed _value response to _url"""
+    _expires = 0.0
+    _end_time = get_end_time(_url)
+    if _end_time is None or _end_time > datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+            days=recent_days):
+        _expires = time.time() + ttl * 3600.0
+
+    # Write to a temporary file first, so readers never see a partial file.
+    _file = os.path.join(_directory, '{}.{}.npz'.format(get_key(_url), _kind))
+    _handle, _temporary = tempfile.mkstemp(dir=_directory, suffix='.tmp')
+    try:
+        with os.fdopen(_handle, 'wb') as _output:
+            np.savez_compressed(_output, expires=_expires, **pack(_kind, _value))
+        os.replace(_temporary, _file)
+    except OSError:
+        if os.path.exists(_temporary):
+            os.remove(_temporary)
+        raise
+    if add_size(_directory, os.path.getsize(_file), max_size):
+        evict(_directory, max_size)
+
+
+def add_size(_directory, _bytes, max_size):
+    """add the _bytes of a new response to the size estimate of the cache, True if the cache should be scanned"""
+    with _lock:
+        if _directory not in _sizes:
+            return True
+        _sizes[_directory] += _bytes
+        _writes[_directory] += 1
+        return _sizes[_directory] > max_size * 1024 * 1024 or _writes[_directory] >= EVICT_INTERVAL
+
+
+def evict(_directory, max_size):
+    """remove the least recently used responses until the cache is smaller than max_size MB"""
+    _files = list()
+    for _entry in os.scandir(_directory):
+        if _entry.name.endswith('.npz'):
+            try:
+                _stat = _entry.stat()
+            except OSError:
+                continue
+            _files.append((_stat.st_mtime, _stat.st_size, _entry.path))
+    _size = sum(_file[1] for _file in _files)
+    for _mtime, _file_size, _path in sorted(_files):
+        if _size <= max_size * 1024 * 1024:
+            break
+        try:
+            os.remove(_path)
+        except OSError:
+            pass
+        _size -= _file_size
+    with _lock:
+        _sizes[_directory] = _size
+        _writes[_directory] = 0
+
+
+def fetch(_function, _kind, _directory, _url, mode='read', recent_days=3, ttl=24, max_size=2000):
+    """request _url using _function(_url) through the cache"""
+    if mode == 'off':
+        return _function(_url)
+    if mode == 'read':
+        _value = get(_kind, _url, _directory)
+        if _value is not None:
+            return _value
+    _value = _function(_url)
+    try:
+        put(_kind, _url, _value, _directory, recent_days=recent_days, ttl=ttl, max_size=max_size)
+    except OSError:
+        pass
+    return _value
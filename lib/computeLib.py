@@ -0,0 +1,1300 @@
+"""
+  DESCRIPTION
+    the library API of computeHVSR.py, a collection of functions to compute the HVSR of a station in-process
+
+  HISTORY
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+  NOTES
+    The computation is split into steps that take and return arrays or dataclasses, so it can be called from a
+    long-running process without running the computeHVSR.py script:
+
+        settings = computeLib.get_settings(computeHVSR_param, network='TA', station='TCOL', location='--',
+                                           channels='BHZ,BHN,BHE', start='2013-01-01', end='2013-02-01')
+        result = computeLib.run(settings)
+
+    or step by step:
+
+        fetch            request the PSDs (and PDFs) of all channels from MUSTANG, the cache or the PSD store
+        get_channel_psds the PSDs of a channel
+        clean            reject the PSDs outside of the station baseline
+        get_daily        group the accepted PSDs by day
+        get_median_daily median daily PSDs
+        compute_hvsr     daily HVSRs and their statistics (compute_hvsrs for several methods)
+        get_peaks        find and rank the HVSR peaks (see peakLib.py)
+        get_bootstrap    bootstrap confidence intervals of f0 and A0 of the peaks (Settings.bootstrap resamples)
+        get_daily_peaks  find the peaks of each daily HVSR and rank their clarity
+        get_time_series  HVSR and best ranked f0/A0 of each day or rolling N-day window (write_time_series)
+        update_rolling   add the new daily HVSRs to a stored rolling window (see rollingLib.py)
+        write_hvsr       write the HVSR file (write_hvsr_npz and write_hvsr_parquet for the binary formats)
+
+    Several combination methods (Settings.methods) are computed from one load of the PSDs, the median daily PSDs of
+    the methods 2-6 are computed once (compute_hvsrs). In the rolling mode (Settings.rolling) run() only fetches the
+    days that are missing from the stored rolling windows (get_rolling_settings) and updates the windows.
+
+    In the streaming mode (Settings.streaming) get_streaming_daily replaces the fetch to get_daily steps: the PSDs
+    of the three channels are read one day at a time, from the PSD store or from the MUSTANG responses as they
+    arrive (iter_channel_days), checked against the baseline and reduced to the median PSD (methods 2-6) and the DFA
+    energy (method 1) of the day before the next day is read. Only these daily values are kept, so the memory used
+    does not grow with the number of PSDs of the window. The PSD responses are not kept in the response cache and
+    the stored days are not moved to the archive in this mode (the archive reads the new days at once).
+
+    The steps are timed as stages of the active profile, if any (see profileLib.py): fetch, load, baseline, clean,
+    aggregate, dfa, hvsr, peaks, bootstrap, time series, rolling and write.
+
+    Errors that stop the computation raise HvsrError.
+"""
+
+import datetime
+import functools
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+
+import baselineLib
+import cacheLib
+import fetchLib
+import fileLib
+import hvsrLib
+import msgLib
+import pdfLib
+import peakLib
+import profileLib
+import rollingLib
+import storeLib
+
+sender = os.path.basename(__file__)
+
+# HVSR output formats, the text file, a NumPy .npz file and a Parquet file (needs pyarrow).
+OUTPUT_FORMATS = ('text', 'npz', 'parquet')
+channel_order = {'Z': 0, '1': 1, 'N': 1, '2': 2, 'E': 2}
+
+
+class HvsrError(Exception):
+    """error that stops the HVSR computation"""
+
+
+class RequestTooLargeError(HvsrError):
+    """MUSTANG rejected the request as too large (HTTP 413)"""
+
+
+class NoPsdsError(HvsrError):
+    """no PSDs were found to process in the window"""
+
+
+@dataclass
+class Settings:
+    """HVSR computation settings, see computeHVSR.py and its parameter file for details"""
+    network: str
+    station: str
+    location: str
+    channels: list
+    start: str
+    end: str
+    method: int = 4
+    methods: tuple = ()
+    n: int = 1
+    remove_outliers: bool = False
+    outlier_tolerance: float = 0
+    outlier_fraction: float = 0
+    water_level: float = 1.8
+    hvsr_band: tuple = (0.2, 15)
+    xtype: str = 'frequency'
+    min_rank: float = 2
+    pdf: bool = False
+    workers: int = 4
+    cache: str = 'read'
+    store: int = 1
+    archive: int = 1
+    verbose: int = -1
+    psd_url: str = 'http://service.iris.edu/mustang/noise-psd/1/query?'
+    pdf_url: str = 'http://service.iris.edu/mustang/noise-pdf/1/query?'
+    baseline_directory: str = ''
+    cache_directory: str = ''
+    cache_size: float = 2000
+    cache_recent_days: int = 3
+    cache_ttl: float = 24
+    store_directory: str = ''
+    streaming: bool = False
+    rolling: int = 0
+    rolling_directory: str = ''
+    bootstrap: int = 0
+    bootstrap_seed: int = 0
+    bootstrap_confidence: float = 95
+
+    @property
+    def method_list(self):
+        """the combination methods to compute, methods if set else method"""
+        return tuple(self.methods) if self.methods else (self.method,)
+
+    @property
+    def dfa(self):
+        return 1 in self.method_list
+
+    @property
+    def use_store(self):
+        """the PSD store follows the cache mode"""
+        return bool(self.store) and self.cache != 'off'
+
+    @property
+    def start_hour(self):
+        return 'T00:00:00'
+
+    @property
+    def end_hour(self):
+        """if start and end are the same day, process that day"""
+        return 'T23:59:59' if self.start.strip() == self.end.strip() else 'T00:00:00'
+
+    @property
+    def date_list(self):
+        return date_range(self.start, self.end, self.n)
+
+
+@dataclass
+class Fetched:
+    """the PSDs from the store and the MUSTANG responses of all channels"""
+    stored_psds: dict
+    psd_segments: dict
+    responses: dict
+
+
+@dataclass
+class ChannelPsds:
+    """PSDs of a channel within the window, psd_values[i] started at day_time_values[i]"""
+    channel: str
+    x_values: list = field(default_factory=list)
+    day_values: list = field(default_factory=list)
+    day_time_values: list = field(default_factory=list)
+    psd_values: list = field(default_factory=list)
+    pdf_x: np.ndarray = field(default_factory=lambda: np.empty(0))
+    pdf_y: np.ndarray = field(default_factory=lambda: np.empty(0))
+    pdf_p: np.ndarray = field(default_factory=lambda: np.empty(0))
+
+
+@dataclass
+class Daily:
+    """accepted PSDs of a channel by start time (day_time_psd) and by day (daily_psd), days in order of the PSDs"""
+    day_time_psd: dict
+    daily_psd: dict
+    days: list
+
+
+@dataclass
+class StreamingDaily:
+    """per-day values kept for a channel in the streaming mode instead of its PSDs, days with accepted PSDs in order
+
+    median_psd holds the median PSD of each day (methods 2-6) and dfa_energy the DFA daily energy of each day that
+    has PSDs of all three channels at the same start times (method 1, see hvsrLib.get_dfa_daily_energy()).
+    """
+    days: list = field(default_factory=list)
+    median_psd: dict = field(default_factory=dict)
+    dfa_energy: dict = field(default_factory=dict)
+
+
+@dataclass
+class HvsrResult:
+    """daily HVSRs of the hvsr_days and their statistics, days are all the days with accepted PSDs"""
+    method: int
+    x_values: list
+    days: list
+    hvsr_days: list
+    daily_hvsr: np.ndarray
+    hvsr: np.ndarray
+    std: np.ndarray
+    log_std: np.ndarray
+    hvsrp: np.ndarray
+    hvsrm: np.ndarray
+    hvsrp2: np.ndarray
+    hvsrm2: np.ndarray
+    missing: int
+
+
+@dataclass
+class Peaks:
+    """ranked HVSR peaks as a peakLib.PEAK_DTYPE structured array, stdf is the standard deviation of the frequency
+    of each peak"""
+    peak: np.ndarray
+    stdf: list
+    max_rank: int
+
+
+@dataclass
+class TimeSeries:
+    """HVSR of each window of window days, by the last day of the window (days)
+
+    count is the number of days with an HVSR in each window. hvsr, std and log_std are (windows x bins) arrays, f0,
+    A0 and score are those of the best ranked peak of each window (NaN f0 and A0 if there is no peak).
+    """
+    method: int
+    window: int
+    x_values: np.ndarray
+    days: list
+    count: np.ndarray
+    hvsr: np.ndarray
+    std: np.ndarray
+    log_std: np.ndarray
+    f0: np.ndarray
+    A0: np.ndarray
+    score: np.ndarray
+
+
+@dataclass
+class Result:
+    """the result of run(), hvsr and peaks are those of the first method, methods holds the (HvsrResult, Peaks)
+    of each method, psd_counts the (PSDs, accepted PSDs) of each channel and cleaned the (aligned baseline, ok,
+    not ok) of the PSDs of each channel (see load_channel())"""
+    settings: Settings
+    channels: list
+    daily: list
+    hvsr: HvsrResult
+    peaks: Peaks
+    methods: dict = field(default_factory=dict)
+    psd_counts: dict = field(default_factory=dict)
+    cleaned: list = field(default_factory=list)
+
+
+def get_settings(_param, **_values):
+    """HVSR settings using the defaults of the computeHVSR_param parameter module, _values override them"""
+    _settings = {'method': _param.method, 'n': _param.n, 'remove_outliers': bool(_param.removeoutliers),
+                 'outlier_tolerance': _param.outliertolerance, 'outlier_fraction': _param.outlierfraction,
+                 'water_level': _param.waterlevel, 'hvsr_band': _param.hvsrband, 'xtype': _param.xtype,
+                 'min_rank': _param.minrank, 'pdf': bool(_param.plot and _param.plotpdf), 'workers': _param.workers,
+                 'cache': _param.cache, 'store': _param.store, 'archive': _param.archive,
+                 'psd_url': _param.mustangPsdUrl, 'pdf_url': _param.mustangPdfUrl,
+                 'baseline_directory': _param.baselineDirectory, 'cache_directory': _param.cacheDirectory,
+                 'cache_size': _param.cacheSize, 'cache_recent_days': _param.cacheRecentDays,
+                 'cache_ttl': _param.cacheTtl, 'store_directory': _param.storeDirectory,
+                 'streaming': bool(_param.streaming), 'rolling': _param.rolling,
+                 'rolling_directory': _param.rollingDirectory, 'bootstrap': _param.bootstrap,
+                 'bootstrap_seed': _param.bootstrapseed, 'bootstrap_confidence': _param.bootstrapconfidence}
+    _settings.update(_values)
+    _settings['channels'] = sort_channels(_settings.get('channels', _param.chan))
+    return Settings(**_settings)
+
+
+def get_methods(_methods):
+    """the combination methods of a method run argument: a method, a comma list of methods or 'all' (methods 2-6)"""
+    if str(_methods).strip().lower() == 'all':
+        return list(hvsrLib.METHODS)
+    _method_list = list()
+    for _value in str(_methods).split(','):
+        try:
+            _method = int(_value)
+        except ValueError:
+            raise HvsrError('method {} for combining H1 & H2 is invalid!'.format(_value.strip()))
+        if _method <= 0 or _method > 6:
+            raise HvsrError('method {} for combining H1 & H2 is invalid!'.format(_method))
+        if _method not in _method_list:
+            _method_list.append(_method)
+    return _method_list
+
+
+def sort_channels(_channels):
+    """sort the channels as Z, 1/N and 2/E, _channels is a list or a comma separated string"""
+    if isinstance(_channels, str):
+        _channels = _channels.split(',')
+
+    # Sort them in the reverse order to make sure that we always have ?HZ first.
+    _channel_list = sorted(_channels, reverse=True)
+    if len(_channel_list) < 3:
+        raise HvsrError('need 3 channels!')
+    _sorted_channel_list = _channel_list.copy()
+    for _channel in _channel_list:
+        _sorted_channel_list[channel_order[_channel[2]]] = _channel
+    return _sorted_channel_list
+
+
+def date_range(_start, _end, _interval):
+    """Break an interval to date ranges
+       this is used to avoid large requests that get rejected.
+    """
+    if _interval <= 1:
+        _date_list = [_start, _end]
+    else:
+        _date_list = list()
+        _start_t = datetime.datetime.strptime(_start, '%Y-%m-%d')
+        _end_t = datetime.datetime.strptime(_end, '%Y-%m-%d')
+        _diff = (_end_t - _start_t) / _interval
+        if _diff.days <= 1:
+            _date_list = [_start, _end]
+        else:
+            for _index in range(_interval):
+                _date_list.append((_start_t + _diff * _index).strftime('%Y-%m-%d'))
+            _date_list.append(_end_t.strftime('%Y-%m-%d'))
+    return _date_list
+
+
+def get_target(_settings, _channel):
+    """MUSTANG target of a channel"""
+    return '.'.join([_settings.network, _settings.station, _settings.location, _channel, '*'])
+
+
+def cached(_settings, _function, _kind):
+    """return a request function for _function that goes through the local cache of the MUSTANG responses"""
+    return functools.partial(cacheLib.fetch, _function, _kind, _settings.cache_directory, mode=_settings.cache,
+                             recent_days=_settings.cache_recent_days, ttl=_settings.cache_ttl,
+                             max_size=_settings.cache_size)
+
+
+def get_error(_error, _target, _url, _settings):
+    """report a request error, raise RequestTooLargeError if the request was too large
+
+    Returns the HTTP error code.
+    """
+    _code = getattr(_error, 'code', None)
+    msgLib.error('\n\nReceived HTTP Error code: {}\n{}'.format(_code, getattr(_error, 'reason', _error)), 1)
+    if _code == 413:
+        raise RequestTooLargeError('Note: Either use the run argument "n" to split the requested date range to '
+                                   'smaller intervals\nCurrent "n"" value is: {}. Or request a shorter time '
+                                   'interval.'.format(_settings.n))
+    if _code != 404:
+        msgLib.error('failed on target {} {}'.format(_target, _url), 1)
+    return _code
+
+
+@profileLib.timed('fetch')
+def fetch(_settings):
+    """request the PSDs (and PDFs) of all channels and date segments concurrently
+
+    Responses are kept by request, so the processing and the outputs do not depend on the number of workers. With
+    the PSD store on, the PSDs are only requested for the runs of days that are missing from the store.
+    """
+    _date_list = _settings.date_list
+    _store_days = storeLib.get_days(_settings.start, _settings.end)
+    _stored_psds = dict()
+    _psd_segments = dict()
+    _keys = list()
+    _requests = list()
+    for _channel in _settings.channels:
+        _target = get_target(_settings, _channel)
+        _stored_psds[_channel] = dict()
+        if _settings.use_store:
+            _store_name = storeLib.get_name(_settings.network, _settings.station, _settings.location, _channel)
+            if _settings.cache == 'read':
+                # Days in the archive are read from its memory map, the other days from the store.
+                if _settings.archive:
+                    _stored_psds[_channel] = storeLib.read_archive(_settings.store_directory, _store_name,
+                                                                   _store_days)
+                for _day in _store_days:
+                    if _day in _stored_psds[_channel]:
+                        continue
+                    _psds = storeLib.read(_settings.store_directory, _store_name, _day)
+                    if _psds is not None:
+                        _stored_psds[_channel][_day] = _psds
+            if _settings.verbose >= 0:
+                msgLib.info('{} of {} days of {} found in the store'.format(len(_stored_psds[_channel]),
+                                                                           len(_store_days), _target))
+
+            _psd_segments[_channel] = get_gap_segments(_settings, _store_days, [
+                _day for _day in _store_days if _day not in _stored_psds[_channel]])
+        else:
+            _psd_segments[_channel] = get_segments(_settings)
+
+        for _segment_index, _segment in enumerate(_psd_segments[_channel]):
+            _url = get_psd_url(_settings, _target, _segment)
+            _keys.append((_channel, _segment_index, 'psd'))
+
+            # The store takes the place of the response cache for the PSDs.
+            _requests.append((fetchLib.get_psds if _settings.use_store else
+                              cached(_settings, fetchLib.get_psds, 'psd'), _url))
+
+        if _settings.pdf:
+            for _date_index in range(len(_date_list) - 1):
+                _url = '{}target={}&starttime={}{}&endtime={}{}&format=text'.format(
+                    _settings.pdf_url, _target, _date_list[_date_index], _settings.start_hour,
+                    _date_list[_date_index + 1], _settings.end_hour)
+                _keys.append((_channel, _date_index, 'pdf'))
+                _requests.append((cached(_settings, fetchLib.get_pdf, 'pdf'), _url))
+
+    if _settings.verbose >= 0:
+        msgLib.info('requesting {} PSD/PDF segments using {} workers'.format(len(_requests), _settings.workers))
+    _responses = {_key: (_request[1],) + _response for _key, _request, _response in
+                  zip(_keys, _requests, fetchLib.fetch_all(_requests, workers=_settings.workers))}
+    return Fetched(_stored_psds, _psd_segments, _responses)
+
+
+def get_segments(_settings):
+    """the (start day, start hour, end day, end hour) PSD segments of the n date ranges of the window"""
+    _date_list = _settings.date_list
+    return [(_date_list[_i], _settings.start_hour, _date_list[_i + 1], _settings.end_hour)
+            for _i in range(len(_date_list) - 1)]
+
+
+def get_gap_segments(_settings, _days, _missing):
+    """the PSD segments of the runs of _missing days of the window _days
+
+    Each run is broken like the whole window, so no request covers more days than the n segments would.
+    """
+    _segments = list()
+    for _gap_start, _gap_end in storeLib.get_gaps(_days, _missing):
+        _gap_list = date_range(_gap_start, _gap_end,
+                               -(-_settings.n * len(storeLib.get_days(_gap_start, _gap_end)) // len(_days)))
+        _segments += [(_gap_list[_i], _settings.start_hour, _gap_list[_i + 1], 'T00:00:00')
+                      for _i in range(len(_gap_list) - 1)]
+    return _segments
+
+
+def get_psd_url(_settings, _target, _segment):
+    """noise-psd request of a PSD segment of the _target"""
+    return '{}target={}&starttime={}{}&endtime={}{}&format=xml&correct=true'.format(_settings.psd_url, _target,
+                                                                                    *_segment)
+
+
+@profileLib.timed('baseline')
+def read_baseline(_settings, _channel):
+    """the baseline of a channel (see baselineLib.py), raises OSError or ValueError if it is not available"""
+    return baselineLib.load(os.path.join(_settings.baseline_directory, fileLib.baselineFileName(
+        _settings.network, _settings.station, _settings.location, _channel)))
+
+
+def get_baseline(_settings, _channel):
+    """read_baseline(), raises HvsrError if the baseline is not available"""
+    try:
+        return read_baseline(_settings, _channel)
+    except (OSError, ValueError) as _e:
+        raise HvsrError('Failed to read baseline file {}: {}\nUse the getStationChannelBaseline.py script to '
+                        'generate the baseline file or set the parameter removeoutliers=0.'.format(
+                            os.path.join(_settings.baseline_directory, fileLib.baselineFileName(
+                                _settings.network, _settings.station, _settings.location, _channel)), _e))
+
+
+def align_baseline(_baseline, _psds):
+    """the baseline on the frequencies of the channel _psds, interpolated if they differ"""
+    if _baseline is None or not _psds.x_values:
+        return _baseline
+    return baselineLib.align(_baseline, _psds.x_values)
+
+
+def get_aligned_baseline(_settings, _channel, _baseline, _x_values):
+    """the baseline of a channel on the _x_values frequencies, reports if it had to be interpolated"""
+    _aligned = baselineLib.align(_baseline, _x_values)
+    if _aligned is not _baseline and _settings.verbose >= 0:
+        msgLib.warning(sender, 'baseline of {} interpolated onto the {} PSD frequencies'.format(_channel,
+                                                                                                len(_x_values)))
+    return _aligned
+
+
+def get_pdf(_settings, _target, _url, _data, _error):
+    """get PDF from the parsed noise-pdf response _data of _url (_error is the request exception, if any)"""
+    if _settings.verbose >= 0:
+        msgLib.info('received:' + _url)
+    if _error is not None:
+        if get_error(_error, _target, _url, _settings) == 404:
+            _url_items = _url.split('&')
+            _starttime = [x for x in _url_items if x.startswith('starttime')][0]
+            _endtime = [x for x in _url_items if x.startswith('endtime')][0]
+            msgLib.error('Error 404: PDF not found in the range {} and {} when requested:\n{}'.format(
+                _starttime.split('=')[1], _endtime.split('=')[1], _url), 1)
+        return np.empty(0), np.empty(0), np.empty(0)
+
+    return pdfLib.get_pdf(_data, xtype=_settings.xtype)
+
+
+@profileLib.timed('load')
+def get_channel_psds(_settings, _channel, _fetched):
+    """get the PSDs of _channel from the _fetched responses
+
+    PSD segments start between start (inclusive) and end (exclusive). The X values of the PSDs must match those of
+    the first PSD, the baseline is aligned to them (see align_baseline()).
+    """
+    _verbose = _settings.verbose
+    _target = get_target(_settings, _channel)
+    _psds = ChannelPsds(_channel)
+    _store_name = storeLib.get_name(_settings.network, _settings.station, _settings.location, _channel)
+    _stored_psds = _fetched.stored_psds[_channel]
+    _fetched_psds = list()
+    for _segment_index, _segment in enumerate(_fetched.psd_segments[_channel]):
+        msgLib.info('Doing {}{} to {}{}'.format(*_segment))
+        _url, _segment_psds, _error = _fetched.responses[(_channel, _segment_index, 'psd')]
+        if _verbose >= 0:
+            msgLib.info('received: {}'.format(_url))
+        if _error is not None:
+            if get_error(_error, _target, _url, _settings) != 404:
+                continue
+            msgLib.error('Error 404: No PSDs found in the range {}{} to {}{} when requested:\n\n{}'.format(
+                *_segment, _url), 1)
+
+            # Keep the empty days in the store, so they are not requested again.
+            _segment_psds = list()
+
+        if _settings.use_store:
+            _daily_psds = storeLib.split_days(_segment_psds)
+            for _day in storeLib.get_days(_segment[0], _segment[2]):
+                _stored_psds[_day] = _daily_psds.get(_day, list())
+                try:
+                    storeLib.write(_settings.store_directory, _store_name, _day, _stored_psds[_day],
+                                   recent_days=_settings.cache_recent_days, ttl=_settings.cache_ttl)
+                except OSError as _e:
+                    msgLib.warning(sender, 'failed to store {} {}: {}'.format(_target, _day, _e))
+        else:
+            _fetched_psds += _segment_psds
+
+        if _verbose:
+            msgLib.info('PSD: {}'.format(str(len(_segment_psds))))
+
+    # Move the final days to the archive.
+    if _settings.use_store and _settings.archive:
+        try:
+            storeLib.compact(_settings.store_directory, _store_name)
+        except (OSError, ValueError) as _e:
+            msgLib.warning(sender, 'failed to archive {}: {}'.format(_target, _e))
+
+    # Assemble the window from the daily partitions of the store.
+    if _settings.use_store:
+        _fetched_psds = [_psd for _day in storeLib.get_days(_settings.start, _settings.end)
+                         for _psd in _stored_psds.get(_day, list())]
+
+    _start_time = time.strptime(_settings.start, '%Y-%m-%d')
+    _end_time = time.strptime(_settings.end, '%Y-%m-%d')
+    for _psd_start, _x, _y in _fetched_psds:
+        _day = _psd_start.split('T')[0]
+        _psd_time = time.strptime(_day, '%Y-%m-%d')
+        if (_start_time != _end_time and (_psd_time < _start_time or _psd_time >= _end_time)) or \
+                (_start_time == _end_time and _psd_time != _start_time):
+            if _verbose >= 0:
+                msgLib.warning(sender, 'Rejected, PSD of {} is outside the  window {} to {}'.
+                               format(_psd_start,
+                                      time.strftime('%Y-%m-%dT%H:%M:%S', _start_time),
+                                      time.strftime('%Y-%m-%dT%H:%M:%S', _end_time)))
+            continue
+
+        # We follow a simple logic, the X values must match. We take the first one to be the sequence we want.
+        if not _psds.x_values:
+            _psds.x_values = _x.tolist()
+
+        if not np.array_equal(_x, _psds.x_values):
+            if _verbose:
+                msgLib.warning(sender, 'Rejected {} {} for bad X'.format(_target, _psd_start))
+        else:
+            # Store the PSD values and at the same time keep track of their day and time.
+            _psds.day_values.append(_day)
+            _psds.day_time_values.append(_psd_start)
+            _psds.psd_values.append(_y)
+
+    if _settings.pdf:
+        for _date_index in range(len(_settings.date_list) - 1):
+            _x, _y, _p = get_pdf(_settings, _target, *_fetched.responses[(_channel, _date_index, 'pdf')])
+            _psds.pdf_x = np.append(_psds.pdf_x, _x)
+            _psds.pdf_y = np.append(_psds.pdf_y, _y)
+            _psds.pdf_p = np.append(_psds.pdf_p, _p)
+            if _verbose:
+                msgLib.info('PDF: {}'.format(len(_psds.pdf_y)))
+    return _psds
+
+
+def check_y_range(_y, _low, _high, tolerance=0.0, max_fraction=0.0):
+    """check the PSD values to see if they are within the range, returns the (ok, not ok) PSD index arrays
+
+    _y is the (PSDs x bins) matrix of the PSD values. A PSD is rejected if more than max_fraction of its bins fall
+    below _low or above _high by more than tolerance. With the defaults a PSD is rejected if any bin is outside.
+    """
+    _low = np.asarray(_low, dtype=float)
+    _high = np.asarray(_high, dtype=float)
+    _y = np.asarray(_y, dtype=float).reshape(-1, len(_low))
+
+    # One broadcast comparison of all PSDs against the range.
+    _outside = np.count_nonzero((_y < _low - tolerance) | (_y > _high + tolerance), axis=1)
+    _rejected = _outside > max_fraction * len(_low)
+
+    return np.flatnonzero(~_rejected), np.flatnonzero(_rejected)
+
+
+@profileLib.timed('clean')
+def clean(_psds, baseline=None, tolerance=0.0, max_fraction=0.0):
+    """reject the PSDs that fall outside the station baseline, returns the (ok, not ok) PSD indices
+
+    Without a baseline all PSDs are accepted. See check_y_range() for tolerance and max_fraction.
+    """
+    if baseline is None:
+        return range(len(_psds.psd_values)), list()
+    return check_y_range(_psds.psd_values, baseline.low, baseline.high, tolerance=tolerance,
+                         max_fraction=max_fraction)
+
+
+@profileLib.timed('aggregate')
+def get_daily(_psds, _ok):
+    """group the accepted PSDs of a channel by start time and by day"""
+    _daily = Daily(dict(), dict(), list())
+    for _index in _ok:
+        # DAY,DAYTIME: 2018-01-01 2018-01-01T00:00:00.000Z
+        _day = _psds.day_values[_index]
+        _psd = _psds.psd_values[_index]
+
+        # Preserve the individual PSDs (day_time)
+        _daily.day_time_psd[_psds.day_time_values[_index]] = _psd
+
+        # Group PSDs into daily bins
+        if _day not in _daily.daily_psd:
+            _daily.daily_psd[_day] = list()
+            _daily.days.append(_day)
+        _daily.daily_psd[_day].append(_psd)
+    return _daily
+
+
+def get_median_daily(_daily):
+    """median daily PSDs, the median of the individual frequencies of the PSDs of each day"""
+    return {_day: np.percentile(_daily.daily_psd[_day], 50, axis=0) for _day in _daily.days}
+
+
+def store_day(_settings, _channel, _day, _psds):
+    """write the PSDs of a day of a channel to the PSD store, if it is on"""
+    if not _settings.use_store:
+        return
+    try:
+        storeLib.write(_settings.store_directory, storeLib.get_name(_settings.network, _settings.station,
+                                                                    _settings.location, _channel),
+                       _day, _psds, recent_days=_settings.cache_recent_days, ttl=_settings.cache_ttl)
+    except OSError as _e:
+        msgLib.warning(sender, 'failed to store {} {}: {}'.format(get_target(_settings, _channel), _day, _e))
+
+
+def iter_days(_psds, _days):
+    """group the (start, frequency, power) _psds, in time order, by day and yield the (day, PSDs) of each of the
+    sorted _days, the PSDs of the other days are dropped"""
+    _index = 0
+    _day_psds = list()
+    for _psd in _psds:
+        _day = _psd[0].split('T')[0]
+        while _index < len(_days) and _days[_index] < _day:
+            yield _days[_index], _day_psds
+            _day_psds = list()
+            _index += 1
+        if _index < len(_days) and _days[_index] == _day:
+            _day_psds.append(_psd)
+    for _day in _days[_index:]:
+        yield _day, _day_psds
+        _day_psds = list()
+
+
+def iter_segment_days(_settings, _channel, _segment, _days):
+    """yield the (day, PSDs) of the _days of a PSD segment of a channel while its response is read
+
+    The days are written to the PSD store as they are complete. The days after a failed request have no PSDs, after
+    HTTP 404 (no PSDs) they are stored as empty days.
+    """
+    _target = get_target(_settings, _channel)
+    _url = get_psd_url(_settings, _target, _segment)
+    msgLib.info('Doing {}{} to {}{}'.format(*_segment))
+    if _settings.verbose >= 0:
+        msgLib.info('requesting: {}'.format(_url))
+    _count = 0
+    _code = None
+    try:
+        for _day, _psds in iter_days(fetchLib.iter_psds(_url), _days):
+            store_day(_settings, _channel, _day, _psds)
+            _count += 1
+            yield _day, _psds
+    except Exception as _e:
+        _code = get_error(_e, _target, _url, _settings)
+        if _code == 404:
+            msgLib.error('Error 404: No PSDs found in the range {}{} to {}{} when requested:\n\n{}'.format(
+                *_segment, _url), 1)
+    for _day in _days[_count:]:
+        if _code == 404:
+            store_day(_settings, _channel, _day, list())
+        yield _day, list()
+
+
+def iter_channel_days(_settings, _channel):
+    """yield the (day, PSDs) of each day of the window of a channel in order, one day at a time
+
+    With the PSD store on, the stored days are read from the store and its archive and the missing days are
+    requested and stored while their responses are read. Otherwise the n segments of the window are requested.
+    """
+    _days = storeLib.get_days(_settings.start, _settings.end)
+    if not _settings.use_store:
+        for _segment in get_segments(_settings):
+            yield from iter_segment_days(_settings, _channel, _segment,
+                                         [_day for _day in storeLib.get_days(_segment[0], _segment[2])
+                                          if _day in _days])
+        return
+
+    _store_name = storeLib.get_name(_settings.network, _settings.station, _settings.location, _channel)
+    _archived = set()
+    _stored = set()
+    if _settings.cache == 'read':
+        if _settings.archive:
+            _archived.update(storeLib.get_archive_days(_settings.store_directory, _store_name, _days))
+        _stored.update(_day for _day in _days if _day not in _archived and
+                       storeLib.is_stored(_settings.store_directory, _store_name, _day))
+    if _settings.verbose >= 0:
+        msgLib.info('{} of {} days of {} found in the store'.format(len(_archived) + len(_stored), len(_days),
+                                                                   get_target(_settings, _channel)))
+
+    _segments = iter(get_gap_segments(_settings, _days, [_day for _day in _days
+                                                         if _day not in _archived and _day not in _stored]))
+    _index = 0
+    while _index < len(_days):
+        _day = _days[_index]
+        if _day in _archived:
+            _psds = storeLib.read_archive(_settings.store_directory, _store_name, [_day]).get(_day)
+        elif _day in _stored:
+            _psds = storeLib.read(_settings.store_directory, _store_name, _day)
+        else:
+            # The next segment starts at this day.
+            _segment = next(_segments)
+            _segment_days = storeLib.get_days(_segment[0], _segment[2])
+            yield from iter_segment_days(_settings, _channel, _segment, _segment_days)
+            _index += len(_segment_days)
+            continue
+        yield _day, list() if _psds is None else _psds
+        _index += 1
+
+
+def get_streaming_daily(_settings):
+    """the StreamingDaily values of the three channels, computed in one pass over the days of the window
+
+    The channels are read together one day at a time (see iter_channel_days()). The PSDs of a day are checked
+    against the frequencies of the first PSD of the channel and its baseline, then reduced to their median and DFA
+    energy and dropped before the next day is read. Returns the x values, the StreamingDaily of each channel and
+    the (PSDs, accepted PSDs) of each channel.
+    """
+    _channels = _settings.channels
+    _baselines = [None] * len(_channels)
+    if _settings.remove_outliers:
+        _baselines = [get_baseline(_settings, _channel) for _channel in _channels]
+    _x_values = [None] * len(_channels)
+    _daily = [StreamingDaily() for _channel in _channels]
+    _counts = [[0, 0] for _channel in _channels]
+    _median = any(_method != 1 for _method in _settings.method_list)
+
+    with profileLib.stage('fetch'):
+        for _channel_days in zip(*[iter_channel_days(_settings, _channel) for _channel in _channels]):
+            _day = _channel_days[0][0]
+            _accepted = list()
+            for _i, (_channel, (_channel_day, _psds)) in enumerate(zip(_channels, _channel_days)):
+                _day_times = list()
+                _values = list()
+                for _psd_start, _x, _y in _psds:
+                    # The first PSD sets the X values of the channel and the baseline is aligned to them.
+                    if _x_values[_i] is None:
+                        _x_values[_i] = _x.tolist()
+                        if _baselines[_i] is not None:
+                            _baselines[_i] = get_aligned_baseline(_settings, _channel, _baselines[_i],
+                                                                  _x_values[_i])
+                    if not np.array_equal(_x, _x_values[_i]):
+                        if _settings.verbose:
+                            msgLib.warning(sender, 'Rejected {} {} for bad X'.format(
+                                get_target(_settings, _channel), _psd_start))
+                        continue
+                    _day_times.append(_psd_start)
+                    _values.append(_y)
+                _ok = range(len(_values))
+                if _values and _baselines[_i] is not None:
+                    with profileLib.stage('clean'):
+                        _ok = check_y_range(_values, _baselines[_i].low, _baselines[_i].high,
+                                            tolerance=_settings.outlier_tolerance,
+                                            max_fraction=_settings.outlier_fraction)[0]
+                _counts[_i][0] += len(_values)
+                _counts[_i][1] += len(_ok)
+                _accepted.append({_day_times[_index]: _values[_index] for _index in _ok})
+
+            with profileLib.stage('aggregate'):
+                for _i, _day_psds in enumerate(_accepted):
+                    if not _day_psds:
+                        continue
+                    _daily[_i].days.append(_day)
+                    if _median:
+                        _daily[_i].median_psd[_day] = np.percentile(list(_day_psds.values()), 50, axis=0)
+
+            # DFA normalizes each PSD by the power of the three channels at its start time.
+            if _settings.dfa:
+                with profileLib.stage('dfa'):
+                    _day_times = sorted(set(_accepted[0]).intersection(_accepted[1], _accepted[2]))
+                    if _day_times:
+                        _energy = hvsrLib.get_dfa_daily_energy(
+                            np.stack([np.stack([_accepted[_i][_day_time] for _i in range(3)], axis=-1)
+                                      for _day_time in _day_times]), [_day] * len(_day_times), _x_values[0])[1]
+                        for _i in range(3):
+                            _daily[_i].dfa_energy[_day] = _energy[0, :, _i]
+
+    for _channel, _count in zip(_channels, _counts):
+        if not _count[0]:
+            raise NoPsdsError('no PSDs found to process between {} and {}'.format(_settings.start, _settings.end))
+        profileLib.count('PSDs', _count[0])
+        profileLib.count('PSDs accepted', _count[1])
+        profileLib.count('PSDs rejected', _count[0] - _count[1])
+    return _x_values[0], _daily, {_channel: tuple(_count) for _channel, _count in zip(_channels, _counts)}
+
+
+def compute_hvsr(_method, _x_values, _daily, _day_time_values=None):
+    """compute the daily HVSRs and their statistics from the Daily PSDs of the three channels (Z, 1/N, 2/E)
+
+    DFA (method 1) uses the individual PSDs that have all 3 components, in the order of _day_time_values. The other
+    methods use the median daily PSDs of the days that have all 3 components.
+    """
+    return compute_hvsrs((_method,), _x_values, _daily, _day_time_values)[_method]
+
+
+@profileLib.timed('hvsr')
+def compute_hvsrs(_methods, _x_values, _daily, _day_time_values=None):
+    """compute_hvsr() for each of the _methods, returns the HvsrResult by method
+
+    The median daily PSDs are computed and stacked once for all of the methods 2-6.
+    """
+
+    # Find the unique days between all channels
+    _days = sorted(set(_daily[0].days + _daily[1].days + _daily[2].days))
+    _daily_hvsr = dict()
+    _hvsr_days = dict()
+
+    # Stack the days that have all 3 channels into a (days x bins x 3) array and compute the daily HVSRs and their
+    # statistics in one pass.
+    if 1 in _methods:
+        # Use equal energy for daily PSDs to give small 'events' a chance to contribute
+        # the same as large ones, so that P1+P2+P3=1
+        _day_times = [_day_time for _day_time in _day_time_values if all(_day_time in _daily[_i].day_time_psd
+                                                                         for _i in range(3))]
+        if _day_times:
+            _dfa_psd = np.stack([np.stack([_daily[_i].day_time_psd[_day_time] for _i in range(3)], axis=-1)
+                                 for _day_time in _day_times])
+        else:
+            _dfa_psd = np.empty((0, len(_x_values), 3))
+        _hvsr_days[1], _equal_daily_energy = hvsrLib.get_dfa_daily_energy(
+            _dfa_psd, [_day_time.split('T')[0] for _day_time in _day_times], _x_values)
+        _daily_hvsr[1] = hvsrLib.get_dfa_daily_hvsr(_equal_daily_energy)
+
+    _median_methods = tuple(_method for _method in _methods if _method != 1)
+    if _median_methods:
+        _median_daily_psd = [get_median_daily(_channel_daily) for _channel_daily in _daily]
+        _median_days, _daily_values = hvsrLib.stack_daily(_median_daily_psd, _days)
+        _daily_hvsr.update(hvsrLib.get_daily_hvsr(_daily_values, _x_values, methods=_median_methods))
+        _hvsr_days.update({_method: _median_days for _method in _median_methods})
+    return {_method: get_result(_method, _x_values, _days, _hvsr_days[_method], _daily_hvsr[_method])
+            for _method in _methods}
+
+
+@profileLib.timed('hvsr')
+def compute_streaming_hvsrs(_methods, _x_values, _daily):
+    """compute the daily HVSRs and their statistics of each of the _methods from the StreamingDaily values of the
+    three channels, returns the HvsrResult by method
+
+    The methods 2-6 use the median_psd and DFA the dfa_energy of the _daily values.
+    """
+    _days = sorted(set(_daily[0].days + _daily[1].days + _daily[2].days))
+    _results = dict()
+    if 1 in _methods:
+        _hvsr_days, _stack = hvsrLib.stack_daily([_channel_daily.dfa_energy for _channel_daily in _daily], _days)
+        _results[1] = get_result(1, _x_values, _days, _hvsr_days, hvsrLib.get_dfa_daily_hvsr(_stack))
+
+    _median_methods = tuple(_method for _method in _methods if _method != 1)
+    if _median_methods:
+        _hvsr_days, _stack = hvsrLib.stack_daily([_channel_daily.median_psd for _channel_daily in _daily], _days)
+        _daily_hvsr = hvsrLib.get_daily_hvsr(_stack, _x_values, methods=_median_methods)
+        for _method in _median_methods:
+            _results[_method] = get_result(_method, _x_values, _days, _hvsr_days, _daily_hvsr[_method])
+    return {_method: _results[_method] for _method in _methods}
+
+
+def get_result(_method, _x_values, _days, _hvsr_days, _daily_hvsr):
+    """the HvsrResult of the daily HVSRs"""
+    _statistics = hvsrLib.get_statistics(_daily_hvsr)
+    return HvsrResult(_method, _x_values, _days, _hvsr_days, _daily_hvsr, _statistics['hvsr'], _statistics['std'],
+                      _statistics['log_std'], _statistics['hvsrp'], _statistics['hvsrm'], _statistics['hvsrp2'],
+                      _statistics['hvsrm2'], (len(_days) - len(_hvsr_days)) * (len(_x_values) - 1))
+
+
+@profileLib.timed('peaks')
+def get_peaks(_result, _hvsr_band, _water_level):
+    """find and rank the peaks of the HVSR curve"""
+    _peak, _stdf, _max_rank = peakLib.get_peaks(_result.x_values, _result.hvsr, _result.hvsrp, _result.hvsrm,
+                                                _result.log_std, _result.daily_hvsr, _hvsr_band, _water_level,
+                                                _result.std)
+    return Peaks(_peak, _stdf, _max_rank)
+
+
+@profileLib.timed('bootstrap')
+def get_bootstrap(_result, _peaks, _settings):
+    """set the bootstrap confidence intervals of f0 and A0 of the _peaks of the _result, resampling its days
+    Settings.bootstrap times on Settings.workers threads"""
+    peakLib.get_bootstrap(_result.x_values, _result.daily_hvsr, _peaks.peak, _settings.bootstrap,
+                          seed=_settings.bootstrap_seed, workers=_settings.workers,
+                          confidence=_settings.bootstrap_confidence)
+    return _peaks
+
+
+def get_daily_peaks(_result, _hvsr_band, _water_level):
+    """the peaks of each daily HVSR of the _result (day is the row in hvsr_days), ranked by the clarity tests"""
+    return peakLib.get_daily_peaks(_result.x_values, _result.daily_hvsr, _hvsr_band, _water_level)
+
+
+def get_windows(_days, _window, first_day=None):
+    """the rows (first, last + 1) of the sorted _days in the _window days ending at each of the _days
+
+    Windows that would begin before first_day (the first of the _days by default) are skipped. Returns the row
+    of the last day and the first and after last rows of each window.
+    """
+    _dates = np.array(_days, dtype='datetime64[D]')
+    if not len(_dates):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    _first_date = _dates[0] if first_day is None else np.datetime64(first_day, 'D')
+    _rows = np.nonzero(_dates >= _first_date + (_window - 1))[0]
+    _first = np.searchsorted(_dates, _dates[_rows] - (_window - 1), side='left')
+    return _rows, _first, _rows + 1
+
+
+@profileLib.timed('time series')
+def get_time_series(_result, _window, _hvsr_band, _water_level, first_day=None):
+    """the HVSR and the best ranked peak of each day (_window = 1) or rolling _window-day window, in one pass
+
+    The windows end on each day with an HVSR (hvsr_days) and begin on or after first_day. The peaks of the window
+    curves are ranked by the peakLib clarity tests, ties go to the highest A0.
+    """
+    _rows, _first, _last = get_windows(_result.hvsr_days, _window, first_day=first_day)
+    _bins = len(_result.x_values) - 1
+    _x_values = np.asarray(_result.x_values[0:_bins], dtype=float)
+
+    # No window fits in the days of the result, e.g. a window longer than the run.
+    if not len(_rows):
+        return TimeSeries(_result.method, _window, _x_values, list(), np.empty(0, dtype=np.int64),
+                          np.empty((0, _bins)), np.empty((0, _bins)), np.empty((0, _bins)), np.empty(0),
+                          np.empty(0), np.empty(0, dtype=np.int64))
+    _statistics = hvsrLib.get_window_statistics(_result.daily_hvsr, _first, _last)
+
+    # The best ranked peak of each window is the last one of the window in (score, A0) order.
+    _peak = peakLib.get_daily_peaks(_result.x_values, _statistics['hvsr'], _hvsr_band, _water_level)
+    _peak = _peak[np.lexsort((_peak['A0'], _peak['score'], _peak['day']))]
+    _peak = _peak[np.append(_peak['day'][1:] != _peak['day'][:-1], True)] if len(_peak) else _peak
+    _f0 = np.full(len(_rows), np.nan)
+    _a0 = np.full(len(_rows), np.nan)
+    _score = np.zeros(len(_rows), dtype=np.int64)
+    _f0[_peak['day']] = _peak['f0']
+    _a0[_peak['day']] = _peak['A0']
+    _score[_peak['day']] = _peak['score']
+    return TimeSeries(_result.method, _window, _x_values, [_result.hvsr_days[_row] for _row in _rows],
+                      _last - _first, _statistics['hvsr'], _statistics['std'], _statistics['log_std'], _f0, _a0,
+                      _score)
+
+
+def get_time_series_file_name(_hvsr_directory, _settings, _window, method=None):
+    """time series file name of the run, next to its HVSR file"""
+    return get_hvsr_file_name(_hvsr_directory, _settings, method=method).replace(
+        '.txt', '.{}day.npz'.format(_window))
+
+
+@profileLib.timed('write')
+def write_time_series(_file_name, _time_series):
+    """write the time series as a (windows x frequency) NumPy .npz file, see TimeSeries for the arrays"""
+    _handle, _temporary = tempfile.mkstemp(dir=os.path.dirname(_file_name), suffix='.tmp')
+    try:
+        with os.fdopen(_handle, 'wb') as _output:
+            np.savez_compressed(_output, method=_time_series.method, window=_time_series.window,
+                                frequency=_time_series.x_values, days=np.array(_time_series.days, dtype='U10'),
+                                count=_time_series.count, hvsr=_time_series.hvsr, std=_time_series.std,
+                                log_std=_time_series.log_std, f0=_time_series.f0, A0=_time_series.A0,
+                                score=_time_series.score)
+        os.replace(_temporary, _file_name)
+    except OSError:
+        if os.path.exists(_temporary):
+            os.remove(_temporary)
+        raise
+
+
+def get_window_start(_end, _days):
+    """start day of the window of _days days before _end"""
+    return (datetime.datetime.strptime(_end, '%Y-%m-%d') - datetime.timedelta(days=_days)).strftime('%Y-%m-%d')
+
+
+def get_rolling_file(_rolling_directory, _settings, _method):
+    """rolling window file of the station of the _settings"""
+    return rollingLib.get_file(_rolling_directory, '.'.join([_settings.network, _settings.station,
+                                                             _settings.location]), _method)
+
+
+def get_rolling_key(_settings):
+    """key of the rolling windows of the _settings, the channels and the settings of the daily HVSRs"""
+    return json.dumps({'channels': list(_settings.channels), 'remove_outliers': bool(_settings.remove_outliers),
+                       'outlier_tolerance': float(_settings.outlier_tolerance),
+                       'outlier_fraction': float(_settings.outlier_fraction),
+                       'baseline_directory': _settings.baseline_directory}, sort_keys=True)
+
+
+def get_rolling_settings(_rolling_directory, _settings):
+    """the _settings of the days to fetch to update the rolling windows (Settings.start to Settings.end) of the
+    methods, from the first day that is missing from a window or recent, None if no day is missing
+
+    All the days are missing from a window of other channels or daily HVSR settings (see get_rolling_key()).
+    """
+    _key = get_rolling_key(_settings)
+    _missing = set()
+    for _method in _settings.method_list:
+        _missing.update(rollingLib.get_missing(rollingLib.read(get_rolling_file(_rolling_directory, _settings,
+                                                                                _method)),
+                                               _key, _settings.start, _settings.end,
+                                               recent_days=_settings.cache_recent_days))
+    return replace(_settings, start=min(_missing)) if _missing else None
+
+
+def get_rolling_result(_method, _rolling):
+    """the HvsrResult of a rolling window, its statistics come from the running sums"""
+    _statistics = rollingLib.get_statistics(_rolling)
+    return HvsrResult(_method, _rolling.frequency.tolist(), list(_rolling.days), list(_rolling.days),
+                      _rolling.daily_hvsr, _statistics['hvsr'], _statistics['std'], _statistics['log_std'],
+                      _statistics['hvsrp'], _statistics['hvsrm'], _statistics['hvsrp2'], _statistics['hvsrm2'], 0)
+
+
+@profileLib.timed('rolling')
+def update_rolling(_rolling_directory, _settings, _result, _start, _end):
+    """add the daily HVSRs of the _result, of the _settings days, to the stored rolling window of its method and
+    move the window to _start - _end (exclusive), returns the HvsrResult of the window
+
+    The window statistics come from its running sums, the days that are already in the window are not aggregated
+    again. The window is started again if its key is not that of the _settings (see get_rolling_key()).
+    """
+    _file = get_rolling_file(_rolling_directory, _settings, _result.method)
+    _rolling = rollingLib.update(rollingLib.read(_file), get_rolling_key(_settings), _result.x_values,
+                                 storeLib.get_days(_settings.start, _settings.end), _result.hvsr_days,
+                                 _result.daily_hvsr, _start, _end, recent_days=_settings.cache_recent_days)
+    rollingLib.write(_file, _rolling)
+    return get_rolling_result(_result.method, _rolling)
+
+
+@profileLib.timed('rolling')
+def move_rolling(_rolling_directory, _settings, _method):
+    """move the stored rolling window of the _method to Settings.start - Settings.end without new daily HVSRs,
+    returns the HvsrResult of the window
+
+    The days missing from the window are not marked empty, so they are requested again by the next run. Raises
+    NoPsdsError if there is no stored window of the _settings.
+    """
+    _file = get_rolling_file(_rolling_directory, _settings, _method)
+    _rolling = rollingLib.read(_file)
+    _key = get_rolling_key(_settings)
+    if not rollingLib.matches(_rolling, _key):
+        raise NoPsdsError('no PSDs found to process between {} and {} and no stored rolling window'.format(
+            _settings.start, _settings.end))
+    rollingLib.move(_rolling, _settings.start, _settings.end)
+    rollingLib.write(_file, _rolling)
+    return get_rolling_result(_method, _rolling)
+
+
+def get_hvsr_file_name(_hvsr_directory, _settings, method=None):
+    """HVSR file name of the run, under the M<method> directory (Settings.method by default)"""
+    _path = ''.join(['M', str(_settings.method if method is None else method)])
+    fileLib.mkdir(_hvsr_directory, _path)
+    return os.path.join(_hvsr_directory, _path, fileLib.hvsrFileName(_settings.network, _settings.station,
+                                                                      _settings.location, _settings.start,
+                                                                      _settings.end))
+
+
+def write_hvsr(_file_name, _result):
+    """write the HVSR and its +/- 1 standard deviation curves"""
+    with open(_file_name, 'w') as _out_file:
+        _out_file.write('frequency HVSR HVSR+1STD HVSR-1STD\n')
+        for _j in range(len(_result.hvsr)):
+            _out_file.write('%s %0.3f %0.3f %0.3f\n' % (str(_result.x_values[_j]), float(_result.hvsr[_j]),
+                                                        float(_result.hvsrp[_j]), float(_result.hvsrm[_j])))
+
+
+def get_output_formats(_formats):
+    """the HVSR output formats of an output format run argument, a comma list of OUTPUT_FORMATS"""
+    _format_list = list()
+    for _format in str(_formats).split(','):
+        _format = _format.strip().lower()
+        if _format not in OUTPUT_FORMATS:
+            raise HvsrError('output format {} is invalid (must be one of {})!'.format(_format,
+                                                                                    '|'.join(OUTPUT_FORMATS)))
+        if _format not in _format_list:
+            _format_list.append(_format)
+    return _format_list
+
+
+def get_metadata(_settings, _result, psd_counts=None):
+    """metadata of the HVSR output files, psd_counts is the (PSDs, accepted PSDs) of each channel"""
+    psd_counts = dict() if psd_counts is None else psd_counts
+    return {'network': _settings.network, 'station': _settings.station, 'location': _settings.location,
+            'channels': list(_settings.channels), 'method': int(_result.method), 'start': _settings.start,
+            'end': _settings.end, 'day_count': len(_result.days), 'hvsr_day_count': len(_result.hvsr_days),
+            'psd_count': [int(psd_counts.get(_channel, (0, 0))[0]) for _channel in _settings.channels],
+            'psd_accepted': [int(psd_counts.get(_channel, (0, 0))[1]) for _channel in _settings.channels]}
+
+
+def get_output_arrays(_result):
+    """the full precision curves of the HVSR output files by name, the per-bin curves and the (days x bins) daily
+    HVSRs
+
+    The daily HVSRs have all of the x values but the last as bins, so a result with no days (and empty curves) gives
+    a (0 x bins) array.
+    """
+    _bins = len(_result.hvsr)
+    return {'frequency': np.asarray(_result.x_values[0:_bins], dtype=np.float64),
+            'hvsr': np.asarray(_result.hvsr, dtype=np.float64), 'hvsrp': np.asarray(_result.hvsrp, dtype=np.float64),
+            'hvsrm': np.asarray(_result.hvsrm, dtype=np.float64), 'std': np.asarray(_result.std, dtype=np.float64),
+            'log_std': np.asarray(_result.log_std, dtype=np.float64),
+            'hvsrp2': np.asarray(_result.hvsrp2, dtype=np.float64),
+            'hvsrm2': np.asarray(_result.hvsrm2, dtype=np.float64),
+            'daily_hvsr': np.asarray(_result.daily_hvsr, dtype=np.float64).reshape(len(_result.daily_hvsr),
+                                                                                    len(_result.x_values) - 1)}
+
+
+def write_hvsr_npz(_file_name, _result, _metadata):
+    """write the HVSR as an uncompressed NumPy .npz file
+
+    The file holds the get_output_arrays() float64 arrays, 'days' (the hvsr_days of the daily_hvsr rows) and one
+    array per get_metadata() value. The members are stored uncompressed, so they load without decoding.
+    """
+    _arrays = get_output_arrays(_result)
+    _arrays['days'] = np.array(_result.hvsr_days, dtype='U10')
+    _arrays.update({_key: np.asarray(_value) for _key, _value in _metadata.items()})
+    _handle, _temporary = tempfile.mkstemp(dir=os.path.dirname(_file_name), suffix='.tmp')
+    try:
+        with os.fdopen(_handle, 'wb') as _output:
+            np.savez(_output, **_arrays)
+        os.replace(_temporary, _file_name)
+    except OSError:
+        if os.path.exists(_temporary):
+            os.remove(_temporary)
+        raise
+
+
+def write_hvsr_parquet(_file_name, _result, _metadata):
+    """write the HVSR as a Parquet file, one row per frequency bin
+
+    The columns are the get_output_arrays() curves, the daily HVSRs are a fixed size list column with one value
+    per day (no column if there are no days). The days and the get_metadata() values are JSON in the 'hvsr' key of
+    the schema metadata. Raises HvsrError if pyarrow is not installed.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise HvsrError('Parquet output needs pyarrow, which is not installed')
+
+    _arrays = get_output_arrays(_result)
+    _daily_hvsr = _arrays.pop('daily_hvsr')
+    _columns = {_name: pyarrow.array(_values) for _name, _values in _arrays.items()}
+    if len(_daily_hvsr):
+        _columns['daily_hvsr'] = pyarrow.FixedSizeListArray.from_arrays(
+            pyarrow.array(np.ascontiguousarray(_daily_hvsr.T).ravel()), len(_daily_hvsr))
+    _table = pyarrow.table(_columns)
+    _table = _table.replace_schema_metadata({'hvsr': json.dumps(dict(_metadata, days=list(_result.hvsr_days)))})
+    _temporary = '{}.{}.tmp'.format(_file_name, os.getpid())
+    try:
+        pyarrow.parquet.write_table(_table, _temporary)
+        os.replace(_temporary, _file_name)
+    except OSError:
+        if os.path.exists(_temporary):
+            os.remove(_temporary)
+        raise
+
+
+@profileLib.timed('write')
+def write_hvsr_outputs(_file_name, _result, _formats, _metadata):
+    """write the HVSR in each of the output _formats, the text _file_name and its .npz and .parquet versions
+
+    Parquet falls back to .npz if pyarrow is not installed. Returns the written file names.
+    """
+    _files = list()
+    for _format in _formats:
+        if _format == 'text':
+            write_hvsr(_file_name, _result)
+            _files.append(_file_name)
+            continue
+        if _format == 'parquet':
+            try:
+                write_hvsr_parquet(_file_name.replace('.txt', '.parquet'), _result, _metadata)
+                _files.append(_file_name.replace('.txt', '.parquet'))
+                continue
+            except HvsrError as _e:
+                msgLib.warning(sender, '{}, writing .npz instead'.format(_e))
+                if 'npz' in _formats:
+                    continue
+        write_hvsr_npz(_file_name.replace('.txt', '.npz'), _result, _metadata)
+        _files.append(_file_name.replace('.txt', '.npz'))
+    return _files
+
+
+def load_channel(_settings, _channel, _fetched):
+    """the PSDs of a channel, its aligned baseline (None if outliers are not removed) and the (ok, not ok) indices"""
+    _baseline = get_baseline(_settings, _channel) if _settings.remove_outliers else None
+    _psds = get_channel_psds(_settings, _channel, _fetched)
+    if not _psds.psd_values:
+        raise NoPsdsError('no PSDs found to process between {} and {}'.format(_settings.start, _settings.end))
+    if _settings.verbose >= 0:
+        msgLib.info('total PSDs: {}'.format(len(_psds.psd_values)))
+    if _baseline is not None:
+        _baseline = get_aligned_baseline(_settings, _channel, _baseline, _psds.x_values)
+    _ok, _not_ok = clean(_psds, baseline=_baseline, tolerance=_settings.outlier_tolerance,
+                         max_fraction=_settings.outlier_fraction)
+    return _psds, _baseline, _ok, _not_ok
+
+
+def get_hvsrs(_settings):
+    """fetch the PSDs of the _settings and compute the HVSR of each method
+
+    Returns the ChannelPsds, the (aligned baseline, ok, not ok) and the Daily values of each channel (the
+    StreamingDaily values and no PSDs in the streaming mode), the (PSDs, accepted PSDs) of each channel and the
+    HvsrResult by method. Raises NoPsdsError if a channel has no PSDs.
+    """
+    _channels = list()
+    _cleaned = list()
+    _daily = list()
+    _psd_counts = dict()
+    if _settings.streaming:
+        _x_values, _daily, _psd_counts = get_streaming_daily(_settings)
+        return _channels, _cleaned, _daily, _psd_counts, compute_streaming_hvsrs(_settings.method_list, _x_values,
+                                                                                  _daily)
+
+    _fetched = fetch(_settings)
+    _x_values = list()
+    for _channel in _settings.channels:
+        _psds, _baseline, _ok, _not_ok = load_channel(_settings, _channel, _fetched)
+        _x_values = _psds.x_values
+        _channels.append(_psds)
+        _cleaned.append((_baseline, _ok, _not_ok))
+        _daily.append(get_daily(_psds, _ok))
+        _psd_counts[_channel] = (len(_psds.psd_values), len(_ok))
+        profileLib.count('PSDs', len(_psds.psd_values))
+        profileLib.count('PSDs accepted', len(_ok))
+        profileLib.count('PSDs rejected', len(_not_ok))
+    return _channels, _cleaned, _daily, _psd_counts, compute_hvsrs(_settings.method_list, _x_values, _daily,
+                                                                   _channels[-1].day_time_values)
+
+
+def run(_settings):
+    """fetch the PSDs, compute the HVSR and find its peaks (with their bootstrap intervals), without plotting or
+    writing any files other than the stores
+
+    In the streaming mode the PSDs are not kept, Result.channels and Result.cleaned are empty and Result.daily holds
+    the StreamingDaily values. In the rolling mode (Settings.rolling) only the days missing from the stored rolling
+    windows are fetched (Result.daily and Result.psd_counts are those of these days) and the HVSRs and peaks are
+    those of the updated windows of Settings.start to Settings.end. Nothing is fetched if no day is missing, and
+    the stored windows are used if the missing days have no PSDs.
+    """
+    _fetch_settings = _settings
+    if _settings.rolling:
+        _fetch_settings = get_rolling_settings(_settings.rolling_directory, _settings)
+        if _fetch_settings is None:
+            msgLib.info('Rolling window from {} to {}, no days to request'.format(_settings.start, _settings.end))
+        else:
+            msgLib.info('Rolling window from {} to {}, requesting the days from {}'.format(
+                _settings.start, _settings.end, _fetch_settings.start))
+
+    _channels, _cleaned, _daily, _psd_counts, _results = list(), list(), list(), dict(), dict()
+    if _fetch_settings is not None:
+        try:
+            _channels, _cleaned, _daily, _psd_counts, _results = get_hvsrs(_fetch_settings)
+        except NoPsdsError as _e:
+            if not _settings.rolling:
+                raise
+            msgLib.warning(sender, '{}, using the stored rolling windows'.format(_e))
+
+    _methods = dict()
+    for _method in _settings.method_list:
+        if _method not in _results:
+            _result = move_rolling(_settings.rolling_directory, _settings, _method)
+        elif _settings.rolling:
+            _result = update_rolling(_settings.rolling_directory, _fetch_settings, _results[_method],
+                                     _settings.start, _settings.end)
+        else:
+            _result = _results[_method]
+        _peaks = get_peaks(_result, _settings.hvsr_band, _settings.water_level)
+        if _settings.bootstrap:
+            _peaks = get_bootstrap(_result, _peaks, _settings)
+        _methods[_method] = (_result, _peaks)
+    _hvsr, _peaks = _methods[_settings.method_list[0]]
+    return Result(_settings, _channels, _daily, _hvsr, _peaks, _methods, _psd_counts, _cleaned)
@@ -0,0 +1,116 @@
+"""
+  DESCRIPTION
+    a collection of functions to request data from the MUSTANG web services
+
+  HISTORY
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+  NOTES
+    Requests are run by a pool of worker threads so that the wall-clock time of a run with many channels and date
+    segments is close to that of its slowest request. Results are always returned in the order of the requests, so
+    the outputs do not depend on the number of workers.
+
+    Each request is recorded in the active profile (see profileLib.py) with its response size, the latency to the
+    response headers and the parse time. The noise-psd response is parsed while it is read, its parse time is the
+    request time less the latency and the time spent reading the response.
+
+    Parsing while reading only removes the document tree of the response. get_psds() still returns all the PSDs of
+    the request as a list, because the response cache and the PSD store keep whole responses and days and the
+    outlier rejection works on the PSD matrix of a channel. Only the streaming mode of computeLib.py consumes the
+    iter_psds() PSDs directly, grouping them by day and reducing each day before the next one is read.
+"""
+
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import pdfLib
+import profileLib
+import psdLib
+
+
+def get_text(_url):
+    """request _url and return the decoded response"""
+    _t = time.perf_counter()
+    try:
+        with urllib.request.urlopen(_url) as _link:
+            _latency = time.perf_counter() - _t
+            _data = _link.read()
+    except Exception as _e:
+        profileLib.add_request(_url, 0, time.perf_counter() - _t, time.perf_counter() - _t, error=_e)
+        raise
+    profileLib.add_request(_url, len(_data), _latency, time.perf_counter() - _t)
+    return _data.decode()
+
+
+def get_pdf(_url):
+    """request _url from the noise-pdf web service and return its parsed (frequency, power, hits) arrays"""
+    _text = get_text(_url)
+    with profileLib.stage('parse'):
+        return pdfLib.parse_pdf(_text)
+
+
+def iter_psds(_url):
+    """request _url from the noise-psd web service and yield its (start, frequency, power) PSDs as they arrive
+
+    PSDs with the same frequencies share the same frequency array. The request is recorded in the active profile
+    when its response has been read, the time the caller spends between two PSDs is not counted as parse time.
+    """
+    _frequency = None
+    _count = 0
+    _paused = 0.0
+    _t = time.perf_counter()
+    _latency = 0.0
+    _link = None
+    try:
+        with urllib.request.urlopen(_url) as _link:
+            _latency = time.perf_counter() - _t
+            _link = profileLib.CountingReader(_link)
+            for _start, _x, _y in psdLib.iter_psds(_link):
+                if _frequency is None or not np.array_equal(_x, _frequency):
+                    _frequency = _x.copy()
+                _count += 1
+                _yielded = time.perf_counter()
+                yield _start, _frequency, _y
+                _paused += time.perf_counter() - _yielded
+    except Exception as _e:
+        profileLib.add_request(_url, getattr(_link, 'bytes', 0), _latency or time.perf_counter() - _t,
+                               time.perf_counter() - _t - _paused, error=_e)
+        raise
+    _seconds = time.perf_counter() - _t - _paused
+    _parse = max(_seconds - _latency - _link.seconds, 0.0)
+    profileLib.add_request(_url, _link.bytes, _latency, _seconds, parse=_parse)
+    profileLib.add_time('parse', _parse)
+    profileLib.count('PSDs received', _count)
+
+
+def get_psds(_url):
+    """request _url from the noise-psd web service and return the list of its (start, frequency, power) PSDs
+
+    The PSDs are parsed as the response arrives (see iter_psds()) but are all kept in the list, so the memory used
+    grows with the length of the request. PSDs with the same frequencies share the same frequency array.
+    """
+    return list(iter_psds(_url))
+
+
+def fetch_all(_requests, workers=1):
+    """run the (function, url) requests using up to 'workers' threads
+
+    Returns a list of (result, error) tuples in the order of _requests. error is None if the request succeeded,
+    otherwise it is the exception raised by the request and result is None.
+    """
+
+    def _run(_request):
+        _function, _url = _request
+        try:
+            return _function(_url), None
+        except Exception as _e:
+            return None, _e
+
+    if workers <= 1 or len(_requests) <= 1:
+        return [_run(_request) for _request in _requests]
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(_requests))) as _pool:
+        return list(_pool.map(_run, _requests))
@@ -0,0 +1,146 @@
+"""
+  DESCRIPTION
+    a collection of functions to keep the merged noise-pdf hit-count histogram of a channel on disk
+
+  HISTORY
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+  NOTES
+    The histogram of each NET.STA.LOC.CHA is a (frequency bins x power bins) matrix of hits, stored with the days
+    it covers:
+
+        <histogram directory>/<NET.STA.LOC.CHA>.npz
+
+    Hit counts add up, so a baseline over a longer interval is updated by requesting the noise-pdf of the days that
+    are not in the histogram yet and adding their hits, instead of requesting the whole interval again. Cells that
+    were not in any noise-pdf response are -1, so the (frequency, power, hits) rows passed to pdfLib.py are the same
+    rows MUSTANG would return for the merged interval.
+
+    Days within 'recent_days' of today may still be updated by MUSTANG. Their hits are added to the returned
+    histogram but not stored, and they are requested again on the next update.
+"""
+
+import datetime
+import os
+import tempfile
+
+import numpy as np
+
+import pdfLib
+import storeLib
+
+
+def get_file(_directory, _name):
+    """histogram file of the _name (NET.STA.LOC.CHA) channel"""
+    return os.path.join(_directory, '{}.npz'.format(_name))
+
+
+def read(_file):
+    """read a stored histogram, returns ((frequency, power, hits), days) or (None, set()) if not available"""
+    try:
+        with np.load(_file, allow_pickle=False) as _data:
+            return (_data['frequency'], _data['power'], _data['hits']), set(_data['days'].tolist())
+    except (OSError, KeyError, ValueError):
+        return None, set()
+
+
+def write(_file, _histogram, _days):
+    """write the histogram and the days it covers"""
+    _frequency, _power, _hits = _histogram
+
+    # Write to a temporary file first, so readers never see a partial file.
+    _handle, _temporary = tempfile.mkstemp(dir=os.path.dirname(_file), suffix='.tmp')
+    try:
+        with os.fdopen(_handle, 'wb') as _output:
+            np.savez_compressed(_output, frequency=_frequency, power=_power, hits=_hits,
+                                days=np.array(sorted(_days), dtype='U10'))
+        os.replace(_temporary, _file)
+    except OSError:
+        if os.path.exists(_temporary):
+            os.remove(_temporary)
+        raise
+
+
+def to_histogram(_pdf):
+    """convert the parsed (frequency, power, hits) noise-pdf rows to a (frequency, power, hits matrix) histogram"""
+    _frequency, _power, _hits = _pdf
+    _starts, _counts = pdfLib.get_bins(_frequency)
+    _power_bins = np.unique(_power)
+    _matrix = np.full((len(_starts), len(_power_bins)), -1, dtype=np.int64)
+    _matrix[np.repeat(np.arange(len(_starts)), _counts), np.searchsorted(_power_bins, _power)] = _hits
+    return _frequency[_starts], _power_bins, _matrix
+
+
+def to_pdf(_histogram):
+    """convert a histogram to the (frequency, power, hits) noise-pdf rows, power from low to high in each bin"""
+    _frequency, _power, _hits = _histogram
+    _rows, _columns = np.nonzero(_hits >= 0)
+    return _frequency[_rows], _power[_columns], _hits[_rows, _columns]
+
+
+def merge(_first, _second):
+    """add the hits of two histograms, either may be None"""
+    if _first is None:
+        return _second
+    if _second is None:
+        return _first
+
+    # New frequency bins go after the existing ones.
+    _frequency = np.concatenate((_first[0], _second[0][~np.isin(_second[0], _first[0])]))
+    _power = np.union1d(_first[1], _second[1])
+    _hits = np.full((len(_frequency), len(_power)), -1, dtype=np.int64)
+    _row_index = {_value: _index for _index, _value in enumerate(_frequency.tolist())}
+    for _bins, _power_bins, _matrix in (_first, _second):
+        _cells = np.ix_([_row_index[_value] for _value in _bins.tolist()], np.searchsorted(_power, _power_bins))
+        _current = _hits[_cells]
+        _hits[_cells] = np.where(_current < 0, _matrix, np.where(_matrix < 0, _current, _current + _matrix))
+    return _frequency, _power, _hits
+
+
+def update(_directory, _name, _start, _end, _fetch, recent_days=3):
+    """add the days from _start to _end that are not in the stored histogram of _name and return the result
+
+    _fetch(first day, day after the last day) returns the parsed noise-pdf of a run of days. Returns the
+    (frequency, power, hits) noise-pdf rows of all the stored days and the recent days of the request, the sorted
+    list of the days they cover and the number of requests made.
+    """
+    _file = get_file(_directory, _name)
+    _histogram, _stored_days = read(_file)
+    _days = storeLib.get_days(_start, _end)
+    _final_end = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=recent_days)).strftime(
+        '%Y-%m-%d')
+    _missing = [_day for _day in _days if _day not in _stored_days]
+    _requests = 0
+
+    # Final days are added to the stored histogram.
+    _final = [_day for _day in _missing if _day < _final_end]
+    for _first, _after in storeLib.get_gaps(_days, _final):
+        _histogram = merge(_histogram, to_histogram(get_pdf(_fetch, _first, _after)))
+        _requests += 1
+    if _final:
+        _stored_days.update(_final)
+        write(_file, _histogram, _stored_days)
+
+    # Recent days are only added to this result.
+    _recent = [_day for _day in _missing if _day >= _final_end]
+    for _first, _after in storeLib.get_gaps(_days, _recent):
+        _histogram = merge(_histogram, to_histogram(get_pdf(_fetch, _first, _after)))
+        _requests += 1
+
+    _pdf = get_empty() if _histogram is None else to_pdf(_histogram)
+    return _pdf, sorted(_stored_days.union(_recent)), _requests
+
+
+def get_empty():
+    """noise-pdf rows with no hits"""
+    return np.empty(0, dtype=str), np.empty(0), np.empty(0, dtype=np.int64)
+
+
+def get_pdf(_fetch, _first, _after):
+    """the noise-pdf of the days from _first to _after (exclusive), empty if there are no PSDs (HTTP 404)"""
+    try:
+        return _fetch(_first, _after)
+    except Exception as _e:
+        if getattr(_e, 'code', None) != 404:
+            raise
+    return get_empty()
@@ -0,0 +1,220 @@
+"""
+  DESCRIPTION
+    a collection of functions to keep the SQLite index of the computeHVSR.py results and query it
+
+  HISTORY
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+  NOTES
+    The index is one SQLite file with a row per HVSR run (station, window and combination method) in 'runs' and a
+    row per peak of the run in 'peaks':
+
+        runs   id, network, station, location, channels, start, end, method, day_count, hvsr_day_count,
+               hvsr_file, report_file, image_file, files, updated
+        peaks  run_id, rank, f0, A0, stdf, sigma_a, score, f0_low, f0_high, A0_low, A0_high
+
+    A run is identified by its network, station, location, channels, start, end and method. Indexing a run again
+    replaces its row and its peaks in one transaction, so a query never sees a partial run. The peaks of a run are
+    ranked (rank 1 first) by score as in the peak report, stdf and sigma_a are the SESAME Sf and Sa values and the
+    f0/A0 intervals are the bootstrap intervals (NULL if not computed).
+
+    The file uses write-ahead logging, so queries run while computeHVSRBatch.py processes update the index, and
+    the writers wait for each other (busy timeout). The peaks are indexed by f0 and the runs by station, so a query
+    for the stations with a ranked f0 in a band reads only the matching rows.
+
+    The schema version is kept in the SQLite user_version, the runs of an index written by an older version are
+    copied to the current tables when it is opened.
+"""
+
+import datetime
+import os
+import sqlite3
+
+import numpy as np
+
+import profileLib
+
+# Seconds a writer waits for the other writers.
+BUSY_TIMEOUT = 60
+
+# Version of the schema, 1: the channels are part of the run key.
+SCHEMA_VERSION = 1
+
+RUNS_TABLE = """
+CREATE TABLE IF NOT EXISTS {} (
+    id INTEGER PRIMARY KEY,
+    network TEXT NOT NULL,
+    station TEXT NOT NULL,
+    location TEXT NOT NULL,
+    channels TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    method INTEGER NOT NULL,
+    day_count INTEGER,
+    hvsr_day_count INTEGER,
+    hvsr_file TEXT,
+    report_file TEXT,
+    image_file TEXT,
+    files TEXT,
+    updated TEXT,
+    UNIQUE (network, station, location, channels, start, end, method)
+);
+"""
+
+SCHEMA = RUNS_TABLE.format('runs') + """
+CREATE TABLE IF NOT EXISTS peaks (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    rank INTEGER NOT NULL,
+    f0 REAL NOT NULL,
+    A0 REAL NOT NULL,
+    stdf REAL,
+    sigma_a REAL,
+    score INTEGER NOT NULL,
+    f0_low REAL,
+    f0_high REAL,
+    A0_low REAL,
+    A0_high REAL,
+    PRIMARY KEY (run_id, rank)
+);
+CREATE INDEX IF NOT EXISTS peaks_f0 ON peaks (f0);
+CREATE INDEX IF NOT EXISTS runs_station ON runs (network, station, location);
+PRAGMA user_version = {};
+""".format(SCHEMA_VERSION)
+
+# Peak columns of the index, from the peakLib.PEAK_DTYPE fields of the same name.
+PEAK_COLUMNS = ('f0', 'A0', 'stdf', 'sigma_a', 'score', 'f0_low', 'f0_high', 'A0_low', 'A0_high')
+
+# Columns of the query results.
+QUERY_COLUMNS = ('network', 'station', 'location', 'channels', 'start', 'end', 'method', 'rank', 'f0', 'A0', 'stdf',
+                 'sigma_a', 'score', 'f0_low', 'f0_high', 'A0_low', 'A0_high', 'hvsr_file', 'report_file',
+                 'image_file', 'files')
+
+
+def connect(_file):
+    """open the index, created if it does not exist"""
+    _directory = os.path.dirname(os.path.abspath(_file))
+    if not os.path.isdir(_directory):
+        os.makedirs(_directory, exist_ok=True)
+    _connection = sqlite3.connect(_file, timeout=BUSY_TIMEOUT, isolation_level=None)
+    _connection.execute('PRAGMA journal_mode=WAL')
+    if _connection.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+        upgrade(_connection)
+    _connection.execute('PRAGMA foreign_keys=ON')
+    _connection.executescript(SCHEMA)
+    return _connection
+
+
+def upgrade(_connection):
+    """copy the runs of an index of an older schema version to the current runs table, keeping their ids
+
+    Runs with the foreign keys off, so dropping the old table does not delete the peaks.
+    """
+    _connection.execute('BEGIN IMMEDIATE')
+    try:
+        if _connection.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION and _connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'runs'").fetchone():
+            _connection.execute(RUNS_TABLE.format('runs_upgrade'))
+            _connection.execute('INSERT INTO runs_upgrade SELECT * FROM runs')
+            _connection.execute('DROP TABLE runs')
+            _connection.execute('ALTER TABLE runs_upgrade RENAME TO runs')
+        _connection.execute('PRAGMA user_version = {:d}'.format(SCHEMA_VERSION))
+        _connection.execute('COMMIT')
+    except BaseException:
+        _connection.execute('ROLLBACK')
+        raise
+
+
+def get_ranked(_peak):
+    """the peaks in report order, highest score first (ties in reverse peak order, as in the peak report)"""
+    if len(_peak) == 0:
+        return _peak
+    _order = np.lexsort((np.arange(len(_peak)), _peak['score']))[::-1]
+    return _peak[_order]
+
+
+def get_value(_value):
+    """an SQLite value of a peak field, None for NaN"""
+    _value = _value.item()
+    if isinstance(_value, float) and _value != _value:
+        return None
+    return _value
+
+
+@profileLib.timed('index')
+def update(_file, _metadata, _peak, files=None):
+    """index a run, replacing the run of the same station, channels, window and method
+
+    _metadata holds the computeLib.get_metadata() values of the run, _peak is its peakLib.PEAK_DTYPE peaks and files
+    is the {hvsr, report, image, other} dictionary of its output files (other a list).
+    """
+    files = dict() if files is None else files
+    _run = (_metadata['network'], _metadata['station'], _metadata['location'], ','.join(_metadata['channels']),
+            _metadata['start'], _metadata['end'], int(_metadata['method']), _metadata.get('day_count'),
+            _metadata.get('hvsr_day_count'), files.get('hvsr'), files.get('report'), files.get('image'),
+            '\n'.join(files.get('other', ())),
+            datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S'))
+    _rows = [tuple([_rank + 1] + [get_value(_value[_column]) for _column in PEAK_COLUMNS])
+             for _rank, _value in enumerate(get_ranked(_peak))]
+
+    _connection = connect(_file)
+    try:
+        # BEGIN IMMEDIATE takes the write lock first, so concurrent writers wait instead of failing.
+        _connection.execute('BEGIN IMMEDIATE')
+        try:
+            _connection.execute('DELETE FROM runs WHERE network = ? AND station = ? AND location = ? AND channels = ? '
+                                'AND start = ? AND end = ? AND method = ?', _run[0:7])
+            _run_id = _connection.execute(
+                'INSERT INTO runs (network, station, location, channels, start, end, method, day_count, '
+                'hvsr_day_count, hvsr_file, report_file, image_file, files, updated) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', _run).lastrowid
+            _connection.executemany(
+                'INSERT INTO peaks (run_id, rank, {}) VALUES (?, ?, {})'.format(
+                    ', '.join(PEAK_COLUMNS), ', '.join('?' * len(PEAK_COLUMNS))),
+                [(_run_id,) + _row for _row in _rows])
+            _connection.execute('COMMIT')
+        except BaseException:
+            _connection.execute('ROLLBACK')
+            raise
+    finally:
+        _connection.close()
+    return _run_id
+
+
+def query(_file, network=None, station=None, location=None, method=None, f0_min=None, f0_max=None, a0_min=None,
+          min_score=None, start=None, end=None, best=False, limit=None):
+    """the indexed peaks that match, as a list of {QUERY_COLUMNS: value} dictionaries
+
+    network, station and location may use the * and ? wildcards. start and end select the runs whose window
+    overlaps start - end. With best only the best ranked peak of each run that matches the other conditions is
+    returned.
+    """
+    _conditions = list()
+    _values = list()
+    for _column, _value in (('network', network), ('station', station), ('location', location)):
+        if _value is not None:
+            _conditions.append('runs.{} GLOB ?'.format(_column))
+            _values.append(_value)
+    for _condition, _value in (('runs.method = ?', method), ('peaks.f0 >= ?', f0_min), ('peaks.f0 <= ?', f0_max),
+                               ('peaks.A0 >= ?', a0_min), ('peaks.score >= ?', min_score), ('runs.end > ?', start),
+                               ('runs.start < ?', end)):
+        if _value is not None:
+            _conditions.append(_condition)
+            _values.append(_value)
+
+    _columns = ', '.join('peaks.{}'.format(_column) if _column in PEAK_COLUMNS + ('rank',)
+                         else 'runs.{}'.format(_column) for _column in QUERY_COLUMNS)
+    _where = ' WHERE {}'.format(' AND '.join(_conditions)) if _conditions else ''
+    _sql = 'SELECT {} FROM peaks JOIN runs ON runs.id = peaks.run_id{}'.format(_columns, _where)
+    if best:
+        _sql = 'SELECT {} FROM (SELECT {}, ROW_NUMBER() OVER (PARTITION BY peaks.run_id ORDER BY peaks.rank) ' \
+               'AS match FROM peaks JOIN runs ON runs.id = peaks.run_id{}) WHERE match = 1'.format(
+                ', '.join(QUERY_COLUMNS), _columns, _where)
+    _sql += ' ORDER BY network, station, location, start, method, rank'
+    if limit is not None:
+        _sql += ' LIMIT {:d}'.format(int(limit))
+
+    _connection = connect(_file)
+    try:
+        return [dict(zip(QUERY_COLUMNS, _row)) for _row in _connection.execute(_sql, _values)]
+    finally:
+        _connection.close()
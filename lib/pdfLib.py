@@ -0,0 +1,94 @@
+"""
+  DESCRIPTION
+    a collection of functions to work with the MUSTANG noise-pdf histograms
+
+  HISTORY
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+  NOTES
+    The noise-pdf text response lists the hits of each power bin, grouped by frequency bin:
+
+        #binFreq, binPower, hits
+        0.0050, -190, 0
+        0.0050, -189, 12
+        ...
+
+    The response is decoded into three arrays in one pass and the frequency bins are found from the runs of equal
+    frequency values.
+"""
+
+import numpy as np
+
+
+def parse_pdf(_text):
+    """parse the noise-pdf text response into frequency (string), power and hits arrays"""
+    _rows = [_line for _line in _text.split('\n') if _line.strip() and _line[0] != '#' and ',' in _line]
+    if not _rows:
+        return np.empty(0, dtype=str), np.empty(0), np.empty(0, dtype=np.int64)
+    _table = np.loadtxt(_rows, delimiter=',', dtype=str, ndmin=2)
+    return np.char.strip(_table[:, 0]), _table[:, 1].astype(np.float64), _table[:, 2].astype(np.int64)
+
+
+def get_bins(_frequency):
+    """find the start index and the number of rows of each frequency bin (runs of the same frequency)"""
+    if len(_frequency) <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    _starts = np.concatenate(([0], np.flatnonzero(_frequency[1:] != _frequency[:-1]) + 1))
+    _counts = np.diff(np.append(_starts, len(_frequency)))
+    return _starts, _counts
+
+
+def get_totals(_hits, _starts):
+    """total hits of each frequency bin"""
+    if len(_starts) <= 0:
+        return np.empty(0, dtype=np.int64)
+    return np.add.reduceat(_hits, _starts)
+
+
+def get_probability(_hits, _starts, _counts):
+    """probability (%) of each row within its frequency bin"""
+    return _hits * 100.0 / np.repeat(get_totals(_hits, _starts), _counts)
+
+
+def get_x(_frequency, xtype='frequency'):
+    """convert the frequency strings to x values (frequency or period)"""
+    _x = _frequency.astype(np.float64)
+    if xtype == 'period':
+        return 1.0 / _x
+    return _x
+
+
+def get_percentiles(_power, _hits, _starts, _counts, _percentiles):
+    """compute the percentiles of all frequency bins
+
+    Power goes from low to high within each bin. Here we define percentile as the smallest value in the bin such that
+    no more than P percent of the data is strictly less than the value and at least P percent of the data is less
+    than or equal to that value. Returns a (bins x percentiles) array.
+    """
+    _values = np.empty((len(_starts), len(_percentiles)))
+    if len(_starts) <= 0:
+        return _values
+    _cumulative = np.cumsum(_hits)
+    _ends = _starts + _counts
+    _base = np.concatenate(([0], _cumulative))[_starts]
+    _totals = _cumulative[_ends - 1] - _base
+    for _index, _percent in enumerate(_percentiles):
+        _level = _percent * _totals.astype(np.float64) / 100.0
+
+        # The first row of each bin where the cumulative hits reach the level (hits are integers).
+        _row = np.searchsorted(_cumulative, _base + np.ceil(_level).astype(np.int64), side='left')
+        _row = np.clip(_row, _starts, _ends - 1)
+        _exact = (_cumulative[_row] - _base).astype(np.float64) == _level
+        _values[:, _index] = np.where(_exact, _power[_row], _power[np.maximum(_row - 1, _starts)])
+    return _values
+
+
+def get_pdf(_pdf, xtype='frequency'):
+    """get the PDF plot values from the parsed (frequency, power, hits) noise-pdf arrays
+
+    Returns the x value (frequency or period), power and probability (%) arrays of all histogram rows.
+    """
+    _frequency, _power, _hits = _pdf
+    _starts, _counts = get_bins(_frequency)
+    return np.repeat(get_x(_frequency[_starts], xtype=xtype), _counts), _power, \
+        get_probability(_hits, _starts, _counts)
@@ -0,0 +1,494 @@
+"""
+  DESCRIPTION
+    a collection of functions to find and rank the HVSR peaks following the SESAME 2004 criteria
+
+  HISTORY
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+  NOTES
+    Moved here from computeHVSR.py. The functions no longer use the script globals, the maximum rank is returned
+    by get_peaks() and init_peaks() now uses the peak indices it is given.
+
+    The peaks are a structured NumPy array (PEAK_DTYPE), one row per peak, and each SESAME test is a set of array
+    comparisons over all the peaks: f- and f+ come from (peaks x bins) masks over [f0/4, f0) and (f0, 4*f0], the
+    epsilon(f) and theta(f) stability thresholds from the STABILITY_THRESHOLDS table. The same tests rank the peaks
+    of thousands of daily HVSR curves at once (get_daily_peaks). get_report() formats the report columns of a peak.
+
+    get_bootstrap() resamples the days with replacement as a (resamples x days) matrix of day counts, so the mean
+    HVSR curves of a block of resamples are one matrix product with the (days x bins) daily HVSRs. f0 and A0 of a
+    resample are those of its peak nearest to the peak of the mean HVSR. The blocks run on a thread pool and each
+    block has its own generator spawned from the seed, so the intervals do not depend on the number of workers.
+
+    Guidelines for the Implementation of the H/V Spectral Ratio Technique on Ambient Vibrations, December 2004
+    SESAME European research project WP12 - Deliverable D23.12, European Commission - Research General
+    Directorate Project No. EVG1-CT-2000-00026 SESAME.
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import profileLib
+
+greek_chars = {'sigma': u'\u03C3', 'epsilon': u'\u03B5', 'teta': u'\u03B8'}
+separator_character = '='
+
+# Number of the SESAME 2004 criteria tested by check_clarity(), check_freq_stability() and check_stability().
+CLARITY_RANK = 3
+FREQ_STABILITY_RANK = 1
+STABILITY_RANK = 2
+MAX_RANK = CLARITY_RANK + FREQ_STABILITY_RANK + STABILITY_RANK
+
+# Minimum peak amplitude A0 and A0 / A(f-), A0 / A(f+) ratio.
+A0_MIN = 2.0
+
+# Number of peaks tested at a time by check_clarity().
+BLOCK_SIZE = 4096
+
+# Number of bootstrap resamples drawn at a time, each block has its own random generator.
+BOOTSTRAP_BLOCK_SIZE = 256
+
+# One row per peak. day is the daily HVSR row of the peak (-1 for the mean HVSR) and index its frequency bin. The
+# frequencies and values of the tests that found nothing are NaN.
+PEAK_DTYPE = np.dtype([('day', np.int64), ('index', np.int64), ('f0', float), ('A0', float), ('f_minus', float),
+                       ('f_plus', float), ('f0_minus', float), ('f0_plus', float), ('f0_stable', bool),
+                       ('stdf', float), ('sigma_a', float), ('epsilon', float), ('theta', float),
+                       ('score', np.int64), ('f0_low', float), ('f0_high', float), ('A0_low', float),
+                       ('A0_high', float)])
+
+# SESAME 2004 stability thresholds by f0, from f_min up to the f_min of the next row (f0 = 2.0 is in the 1.0 row).
+STABILITY_THRESHOLDS = np.array([(-np.inf, 0.25, 0.48), (0.2, 0.2, 0.40), (0.5, 0.15, 0.3), (1.0, 0.1, 0.25),
+                                 (np.nextafter(2.0, np.inf), 0.05, 0.2)],
+                                dtype=[('f_min', float), ('epsilon', float), ('theta', float)])
+
+
+def check_mark():
+    """The default Windows terminal is not able to display the check mark character correctly.
+       This function returns another displayable character if platform is Windows"""
+    check = get_char(u'\u2714')
+    if sys.platform == 'win32':
+        check = get_char(u'\u039E')
+    return check
+
+
+def get_char(in_char):
+    """Output character with proper encoding/decoding"""
+    if in_char in greek_chars.keys():
+        out_char = greek_chars[in_char].encode(encoding='utf-8')
+    else:
+        out_char = in_char.encode(encoding='utf-8')
+    return out_char.decode('utf-8')
+
+
+def find_peaks(_y):
+    """find peaks, the indices of the points greater than both of their neighbors
+
+    Same as scipy.signal.argrelextrema(_y, np.greater)[0], without importing scipy.signal (most of the startup time
+    of a run that does not plot).
+    """
+    _y = np.asarray(_y)
+    return np.nonzero((_y[1:-1] > _y[:-2]) & (_y[1:-1] > _y[2:]))[0] + 1
+
+
+def get_empty(_count):
+    """a structured array of _count peaks with no values"""
+    _peak = np.zeros(_count, dtype=PEAK_DTYPE)
+    for _name in ('f_minus', 'f_plus', 'f0_minus', 'f0_plus', 'stdf', 'sigma_a', 'epsilon', 'theta', 'f0_low',
+                  'f0_high', 'A0_low', 'A0_high'):
+        _peak[_name] = np.nan
+    return _peak
+
+
+def init_peaks(_x, _y, _index_list, _hvsr_band, _peak_water_level):
+    """initialize the peaks, the _index_list extrema of _y above the water level and within the HVSR band
+
+    """
+    _x = np.asarray(_x, dtype=float)
+    _y = np.asarray(_y, dtype=float)
+    _index = np.asarray(_index_list, dtype=np.int64)
+    _keep = (_y[_index] > np.asarray(_peak_water_level)[_index]) & (_hvsr_band[0] <= _x[_index]) & \
+            (_x[_index] <= _hvsr_band[1])
+    _peak = get_empty(np.count_nonzero(_keep))
+    _peak['day'] = -1
+    _peak['index'] = _index[_keep]
+    _peak['f0'] = _x[_index[_keep]]
+    _peak['A0'] = _y[_index[_keep]]
+    return _peak
+
+
+def check_clarity(_x, _y, _peak):
+    """
+       test peaks for satisfying amplitude clarity conditions as outlined by SESAME 2004:
+           - there exist one frequency f-, lying between f0/4 and f0, such that A0 / A(f-) > 2
+           - there exist one frequency f+, lying between f0 and 4*f0, such that A0 / A(f+) > 2
+           - A0 > 2
+
+       _y is the HVSR curve or the (days x bins) daily HVSRs, indexed by the day of each peak. f- is the highest
+       and f+ the lowest such frequency.
+    """
+    _x = np.asarray(_x, dtype=float)
+    _y = np.asarray(_y, dtype=float)
+    _bins = min(len(_x), _y.shape[-1])
+    _x_bins = _x[:_bins]
+
+    # Peaks with A0 > 2.
+    _peak['score'] += _peak['A0'] > A0_MIN
+
+    # Test the peaks for clarity, a block at a time to bound the (peaks x bins) masks.
+    for _start in range(0, len(_peak), BLOCK_SIZE):
+        _block = _peak[_start:_start + BLOCK_SIZE]
+        _f0 = _block['f0'][:, np.newaxis]
+        _curves = _y[np.newaxis, :_bins] if _y.ndim == 1 else _y[_block['day'], :_bins]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            _clear = _block['A0'][:, np.newaxis] / _curves > A0_MIN
+
+        _minus = _clear & (_x_bins >= _f0 / 4.0) & (_x_bins < _f0)
+        _found = _minus.any(axis=1)
+        _block['f_minus'][_found] = _x_bins[_bins - 1 - np.argmax(_minus[:, ::-1], axis=1)][_found]
+        _block['score'] += _found
+
+        # The last frequency is not tested for f+.
+        _plus = _clear & (_x_bins <= _f0 * 4.0) & (_x_bins > _f0) & (np.arange(_bins) < len(_x) - 1)
+        _found = _plus.any(axis=1)
+        _block['f_plus'][_found] = _x_bins[np.argmax(_plus, axis=1)][_found]
+        _block['score'] += _found
+    return _peak
+
+
+def check_freq_stability(_peak, _peakm, _peakp):
+    """
+       test peaks for satisfying stability conditions as outlined by SESAME 2004:
+           - the _peak should appear at the same frequency (within a percentage ± 5%) on the H/V
+             curves corresponding to mean + and – one standard deviation.
+
+       f0_minus and f0_plus are the first peaks of the -/+ one standard deviation curves within ± 5%, or for
+       f0_plus the nearest peak if none is.
+    """
+    _f0 = _peak['f0'][:, np.newaxis]
+    _within_m = (_peakm['f0'] >= _f0 * 0.95) & (_peakm['f0'] <= _f0 * 1.05)
+    _found_m = _within_m.any(axis=1)
+    if len(_peakm):
+        _peak['f0_minus'][_found_m] = _peakm['f0'][np.argmax(_within_m, axis=1)][_found_m]
+
+    _within_p = (_peakp['f0'] >= _f0 * 0.95) & (_peakp['f0'] <= _f0 * 1.05)
+    _found_p = _within_p.any(axis=1)
+    if len(_peakp):
+        _nearest = np.argmin(np.abs(_peakp['f0'] - _f0), axis=1)
+        _peak['f0_plus'] = _peakp['f0'][np.where(_found_p, np.argmax(_within_p, axis=1), _nearest)]
+
+    _peak['f0_stable'] = _found_m & _found_p
+    _peak['score'] += _peak['f0_stable']
+    return _peak
+
+
+def get_thresholds(_f0):
+    """the SESAME 2004 (epsilon, theta) stability thresholds of the _f0 frequencies"""
+    _row = np.searchsorted(STABILITY_THRESHOLDS['f_min'], _f0, side='right') - 1
+    return STABILITY_THRESHOLDS['epsilon'][_row], STABILITY_THRESHOLDS['theta'][_row]
+
+
+def check_stability(_stdf, _peak, _hvsr_log_std):
+    """
+    test peaks for satisfying stability conditions as outlined by SESAME 2004:
+       - σf lower than a frequency dependent threshold ε(f)
+       - σA (f0) lower than a frequency dependent threshold θ(f),
+
+    _stdf is the standard deviation of the frequency of each peak, σA is the log standard deviation of the HVSR at
+    the frequency bin of each peak.
+    """
+    _peak['stdf'] = np.asarray(_stdf, dtype=float)
+    _peak['sigma_a'] = np.asarray(_hvsr_log_std, dtype=float)[_peak['index']]
+    _peak['epsilon'], _peak['theta'] = get_thresholds(_peak['f0'])
+    _peak['score'] += _peak['stdf'] < _peak['epsilon'] * _peak['f0']
+    _peak['score'] += _peak['sigma_a'] < _peak['theta']
+    return _peak
+
+
+def get_index_list(_y):
+    """indices of the relative extrema of _y, none if _y has NaNs"""
+    if not np.isnan(np.sum(_y)):
+        return find_peaks(_y)
+    return list()
+
+
+def get_daily_rows(_x, _daily_hvsr):
+    """the daily HVSRs as a (days x bins) array, the HVSR bins are all of the _x frequencies but the last
+
+    The shape is kept when there are no days, so an empty result has no peaks.
+    """
+    return np.asarray(_daily_hvsr, dtype=float).reshape(len(_daily_hvsr), len(_x) - 1)
+
+
+def find_daily_peaks(_daily_hvsr):
+    """the relative extrema of the (days x bins) daily HVSRs as a (days x bins) mask, no extrema on days with NaNs"""
+    _y = np.asarray(_daily_hvsr, dtype=float)
+    _mask = np.zeros(_y.shape, dtype=bool)
+    _mask[:, 1:-1] = (_y[:, 1:-1] > _y[:, :-2]) & (_y[:, 1:-1] > _y[:, 2:])
+    _mask[np.isnan(np.sum(_y, axis=1))] = False
+    return _mask
+
+
+def get_nearest_peaks(_mask, _index_list):
+    """the nearest peak of each row of a (rows x bins) peak mask to each of the _index_list bins
+
+    Returns a (rows x indices) array of peak bins, the lower one if two are as near and -1 if the row has no peak.
+    """
+    _bins = _mask.shape[1]
+    _position = np.arange(_bins)
+    _index = np.asarray(_index_list, dtype=np.int64)
+
+    # The nearest peak below and above each bin.
+    _below = np.maximum.accumulate(np.where(_mask, _position, -1), axis=1)[:, _index]
+    _above = np.minimum.accumulate(np.where(_mask, _position, _bins)[:, ::-1], axis=1)[:, ::-1][:, _index]
+    _use_lower = (_below >= 0) & ((_above >= _bins) | (_index - _below <= _above - _index))
+    return np.where(_use_lower, _below, np.where(_above < _bins, _above, -1))
+
+
+def get_stdf(_x, _index_list, _daily_hvsr):
+    """standard deviation of the frequency of each peak
+
+    For each peak of the mean HVSR, the nearest peak of each daily HVSR is used (the lower one if two are as near).
+    """
+    _x = np.asarray(_x, dtype=float)
+    _nearest = get_nearest_peaks(find_daily_peaks(get_daily_rows(_x, _daily_hvsr)), _index_list)
+    _stdf = list()
+    for _i, _index in enumerate(_index_list):
+        _point = _nearest[:, _i][_nearest[:, _i] >= 0]
+        _stdf.append(np.std(np.append(_x[_point], _x[_index])))
+    return _stdf
+
+
+def get_peaks(_x, _hvsr, _hvsrp, _hvsrm, _hvsr_log_std, _daily_hvsr, _hvsr_band, _water_level, _hvsr_std):
+    """find and rank the peaks of the HVSR curve
+
+    Returns (peak, stdf, max_rank), peak is the structured array of the peaks (PEAK_DTYPE) and stdf the standard
+    deviation of the frequency of each peak.
+    """
+    _peak = init_peaks(_x, _hvsr, get_index_list(_hvsr), _hvsr_band, np.full(len(_hvsr), _water_level))
+    _stdf = get_stdf(_x, _peak['index'], _daily_hvsr)
+    _peak = check_clarity(_x, _hvsr, _peak)
+
+    # Relative extrema of hvsr + 1 standard deviation.
+    _peakp = init_peaks(_x, _hvsrp, get_index_list(_hvsrp), _hvsr_band, _water_level + _hvsr_std)
+
+    # Relative extrema of hvsr - 1 standard deviation.
+    _peakm = init_peaks(_x, _hvsrm, get_index_list(_hvsrm), _hvsr_band, _water_level - _hvsr_std)
+
+    _peak = check_stability(_stdf, _peak, _hvsr_log_std)
+    _peak = check_freq_stability(_peak, _peakm, _peakp)
+    return _peak, _stdf, MAX_RANK
+
+
+def get_daily_peaks(_x, _daily_hvsr, _hvsr_band, _water_level):
+    """find the peaks of each daily HVSR curve and test them for the SESAME 2004 clarity conditions
+
+    Returns the structured array of the peaks (PEAK_DTYPE) of all days, in day and frequency order. day is the
+    row of the peak in _daily_hvsr and score its clarity rank (out of CLARITY_RANK).
+    """
+    _x = np.asarray(_x, dtype=float)
+    _daily_hvsr = get_daily_rows(_x, _daily_hvsr)
+    _days, _index = np.nonzero(find_daily_peaks(_daily_hvsr))
+    _a0 = _daily_hvsr[_days, _index]
+    _keep = (_a0 > _water_level) & (_hvsr_band[0] <= _x[_index]) & (_x[_index] <= _hvsr_band[1])
+    _peak = get_empty(np.count_nonzero(_keep))
+    _peak['day'] = _days[_keep]
+    _peak['index'] = _index[_keep]
+    _peak['f0'] = _x[_index[_keep]]
+    _peak['A0'] = _a0[_keep]
+    return check_clarity(_x, _daily_hvsr, _peak)
+
+
+def get_resampled_peaks(_x, _daily_hvsr, _index_list, _count, _seed):
+    """f0 and A0 of the peaks nearest to the _index_list bins on _count bootstrap resamples of the daily HVSRs,
+    two (_count x peaks) arrays, NaN if a resample has no peak"""
+    _days = len(_daily_hvsr)
+    _draws = np.random.default_rng(_seed).integers(0, _days, size=(_count, _days))
+    _weights = np.bincount((_draws + _days * np.arange(_count)[:, np.newaxis]).ravel(),
+                           minlength=_count * _days).reshape(_count, _days)
+    _curves = _weights @ _daily_hvsr / _days
+    _nearest = get_nearest_peaks(find_daily_peaks(_curves), _index_list)
+    _found = _nearest >= 0
+    _nearest = np.where(_found, _nearest, 0)
+    _f0 = np.where(_found, _x[_nearest], np.nan)
+    _a0 = np.where(_found, np.take_along_axis(_curves, _nearest, axis=1), np.nan)
+    return _f0, _a0
+
+
+def get_bootstrap(_x, _daily_hvsr, _peak, _resamples, seed=0, workers=1, confidence=95.0):
+    """bootstrap confidence intervals of f0 and A0 of the peaks, from _resamples resamples of the days of the daily
+    HVSRs with replacement
+
+    Sets the f0_low, f0_high, A0_low and A0_high percentiles of the _peak array (confidence in percent) and returns
+    it.
+    """
+    _x = np.asarray(_x, dtype=float)
+    _daily_hvsr = get_daily_rows(_x, _daily_hvsr)
+    if not len(_peak) or not len(_daily_hvsr) or _resamples <= 0:
+        return _peak
+
+    _counts = [min(BOOTSTRAP_BLOCK_SIZE, _resamples - _start) for _start in range(0, _resamples,
+                                                                                 BOOTSTRAP_BLOCK_SIZE)]
+    _seeds = np.random.SeedSequence(seed).spawn(len(_counts))
+
+    def _run(_block):
+        return get_resampled_peaks(_x, _daily_hvsr, _peak['index'], _counts[_block], _seeds[_block])
+
+    if workers <= 1 or len(_counts) <= 1:
+        _blocks = [_run(_block) for _block in range(len(_counts))]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(_counts))) as _pool:
+            _blocks = list(_pool.map(_run, range(len(_counts))))
+
+    _tail = (100.0 - confidence) / 2.0
+    for _i, _name in enumerate(('f0', 'A0')):
+        _values = np.concatenate([_block[_i] for _block in _blocks])
+        for _column in np.nonzero(~np.all(np.isnan(_values), axis=0))[0]:
+            _peak['{}_low'.format(_name)][_column], _peak['{}_high'.format(_name)][_column] = np.nanpercentile(
+                _values[:, _column], (_tail, 100.0 - _tail))
+    return _peak
+
+
+def get_report(_peak):
+    """the report columns of a peak"""
+    _check = check_mark()
+    _report = {'A0': '%10.2f > %0.1f %1s' % (_peak['A0'], A0_MIN, _check if _peak['A0'] > A0_MIN else ' '),
+               'f-': '-', 'f+': '-', 'P-': '- &', 'P+': '-',
+               'Sf': '%10.4f < %0.2f * %0.3f %1s' % (_peak['stdf'], _peak['epsilon'], _peak['f0'],
+                                                     _check if _peak['stdf'] < _peak['epsilon'] * _peak['f0']
+                                                     else ' '),
+               'Sa': '%10.4f < %0.2f %1s' % (_peak['sigma_a'], _peak['theta'],
+                                             _check if _peak['sigma_a'] < _peak['theta'] else ' ')}
+    if not np.isnan(_peak['f_minus']):
+        _report['f-'] = '%10.3f %1s' % (_peak['f_minus'], _check)
+    if not np.isnan(_peak['f_plus']):
+        _report['f+'] = '%10.3f %1s' % (_peak['f_plus'], _check)
+    if not np.isnan(_peak['f0_minus']):
+        _report['P-'] = '%0.3f within ±5%s of %0.3f %1s' % (_peak['f0_minus'], '%', _peak['f0'], '&')
+    if not np.isnan(_peak['f0_plus']):
+        _report['P+'] = '%0.3f within ±5%s of %0.3f %1s' % (_peak['f0_plus'], '%', _peak['f0'],
+                                                             _check if _peak['f0_stable'] else ' ')
+    return _report
+
+
+@profileLib.timed('report')
+def print_peak_report(_station_header, _peak, _min_rank, _max_rank, report_file_name=None):
+    """print a report of peak parameters, also written to report_file_name if given"""
+    _index = list()
+    _rank = list()
+
+    _report_file = None
+    if report_file_name is not None:
+        # In mac(python 3) the following statement works perfectly with just open without encoding, but
+        # in windows(w10, python3) this is is not an option and we have to include the encoding='utf-8' param.
+        _report_file = open(report_file_name, 'w', encoding='utf-8')
+
+        # Write the report to the report file.
+        _report_file.write('\n\nPeaks:\n'
+                           'Parameters and ranking (A0: peak amplitude, f0: peak frequency, {}: satisfied):\n\n'
+                           '\t- amplitude clarity conditions:\n'
+                           '\t\t. there exist one frequency f-, lying between f0/4 and f0, such that A0 / A(f-) > 2\n'
+                           '\t\t. there exist one frequency f+, lying between f0 and 4*f0, such that A0 / A(f+) > 2\n'
+                           '\t\t. A0 > 2\n\n'
+                           '\t- amplitude stability conditions:\n'
+                           '\t\t. peak appear within +/-5% on HVSR curves of mean +/- one standard deviation '
+                           '(f0+/f0-)\n'
+                           '\t\t. {}f lower than a frequency dependent threshold {}(f)\n'
+                           '\t\t. {}A lower than a frequency dependent threshold log {}(f)\n'.
+                           format(check_mark(), get_char('sigma'), get_char('epsilon'), get_char('sigma'),
+                                  get_char('teta')))
+
+        # Also output the report to the terminal.
+        print('\n\nPeaks:\n'
+              'Parameters and ranking (A0: peak amplitude, f0: peak frequency, {}: satisfied)):\n\n'
+              '\t- amplitude clarity conditions:\n'
+              '\t\t. there exist one frequency f-, lying between f0/4 and f0, such that A0 / A(f-) > 2\n'
+              '\t\t. there exist one frequency f+, lying between f0 and 4*f0, such that A0 / A(f+) > 2\n'
+              '\t\t. A0 > 2\n\n'
+              '\t- amplitude stability conditions:\n'
+              '\t\t. peak appear within +/-5% on HVSR curves of mean +/- one standard deviation (f0+/f0-)\n'
+              '\t\t. {}f lower than a frequency dependent threshold {}(f)\n'
+              '\t\t. {}A lower than a frequency dependent threshold log {}(f)\n'.
+              format(check_mark(), get_char('sigma'), get_char('epsilon'), get_char('sigma'), get_char('teta')),
+              flush=True)
+
+    for _i, _peak_value in enumerate(_peak):
+        _index.append(_i)
+        _rank.append(int(_peak_value['score']))
+    _list = list(zip(_rank, _index))
+    _list.sort(reverse=True)
+
+    if _report_file is not None:
+        _report_file.write('\n%47s %10s %22s %12s %12s %32s %32s %27s %22s %17s'
+                           % ('Net.Sta.Loc.Chan', '    f0    ', '        A0 > 2        ', '     f-      ',
+                              '    f+     ', '     f0- within ±5% of f0 &     ', '     f0+ within ±5% of f0       ',
+                              get_char('sigma') +
+                              'f < ' + get_char('epsilon') + ' * f0      ', get_char('sigma') + 'log HVSR < log' +
+                              get_char('teta') + '    ', '   Score/Max.    \n'))
+        _report_file.write('%47s %10s %22s %12s %12s %32s %32s %27s %22s %17s\n'
+                           % (47 * separator_character, 10 * separator_character, 22 * separator_character,
+                              12 * separator_character, 12 * separator_character, 32 * separator_character,
+                              32 * separator_character, 27 * separator_character, 22 * separator_character,
+                              7 * separator_character))
+
+        print('\n%47s %10s %22s %12s %12s %32s %32s %27s %22s %17s'
+              % ('Net.Sta.Loc.Chan', '    f0    ', '        A0 > 2        ', '     f-      ', '    f+     ',
+                 '     f0- within ±5% of f0 &     ', '     f0+ within ±5% of f0       ',
+                 get_char('sigma') +
+                 'f < ' + get_char('epsilon') + ' * f0      ', get_char('sigma') + 'log HVSR < log' +
+                 get_char('teta') + '    ', '   Score/Max.    \n'), flush=True)
+
+        print('%47s %10s %22s %12s %12s %32s %32s %27s %22s %17s\n'
+              % (47 * separator_character, 10 * separator_character, 22 * separator_character,
+                 12 * separator_character, 12 * separator_character, 32 * separator_character,
+                 32 * separator_character, 27 * separator_character, 22 * separator_character,
+                 7 * separator_character), flush=True)
+
+    _peak_visible = list()
+    for _i, _list_value in enumerate(_list):
+        _index = _list_value[1]
+        _peak_found = _peak[_index]
+        if float(_peak_found['score']) < _min_rank:
+            continue
+        else:
+            _peak_visible.append(True)
+
+        _report = get_report(_peak_found)
+        _line = '%47s %10.3f %22s %12s %12s %32s %32s %27s %22s %12d/%0d\n' % (
+            _station_header, _peak_found['f0'], _report['A0'], _report['f-'], _report['f+'], _report['P-'],
+            _report['P+'], _report['Sf'], _report['Sa'], _peak_found['score'], _max_rank)
+        if _report_file is not None:
+            _report_file.write(_line)
+        print(_line, flush=True)
+
+    if len(_list) <= 0 or len(_peak_visible) <= 0:
+        if _report_file is not None:
+            _report_file.write('%47s\n' % _station_header)
+        print('%47s\n' % _station_header, flush=True)
+
+    if _report_file is not None:
+        _report_file.close()
+
+
+@profileLib.timed('report')
+def print_bootstrap_report(_station_header, _peak, _min_rank, _resamples, _confidence, report_file_name=None):
+    """print the bootstrap confidence intervals of f0 and A0 of the ranked peaks, also appended to report_file_name
+    if given"""
+    _lines = ['\n\nBootstrap {:0.4g}% confidence intervals of f0 and A0 ({:,d} resamples of the days):\n'.format(
+        _confidence, _resamples),
+        '\n%47s %10s %23s %10s %23s\n' % ('Net.Sta.Loc.Chan', '    f0    ', '      f0 interval      ',
+                                         '    A0    ', '      A0 interval      '),
+        '%47s %10s %23s %10s %23s\n' % (47 * separator_character, 10 * separator_character,
+                                      23 * separator_character, 10 * separator_character,
+                                      23 * separator_character)]
+    for _index in sorted(range(len(_peak)), key=lambda _i: (_peak['score'][_i], _i), reverse=True):
+        if float(_peak['score'][_index]) < _min_rank:
+            continue
+        _lines.append('%47s %10.3f %10.3f - %-10.3f %10.2f %10.2f - %-10.2f\n' % (
+            _station_header, _peak['f0'][_index], _peak['f0_low'][_index], _peak['f0_high'][_index],
+            _peak['A0'][_index], _peak['A0_low'][_index], _peak['A0_high'][_index]))
+
+    if report_file_name is not None:
+        with open(report_file_name, 'a', encoding='utf-8') as _report_file:
+            _report_file.write(''.join(_lines))
+    print(''.join(_lines), flush=True)
@@ -0,0 +1,163 @@
+"""
+  DESCRIPTION
+    a collection of functions to plot the computeHVSR.py PSD, PDF and HVSR panels
+
+  HISTORY
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+  NOTES
+    Moved here from computeHVSR.py. The figure has one panel per channel (PSDs, PDFs and the station baseline) and
+    a last panel with the HVSR curve and its peaks. The plot parameters come from the computeHVSR_param parameter
+    module. The figure and panels are timed as the plot stage of the active profile, if any (see profileLib.py).
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.offsetbox import AnchoredText
+
+import peakLib
+import profileLib
+
+plot_rows = 4
+
+
+@profileLib.timed('plot')
+def init_figure(_param, _label):
+    """create the figure"""
+    _fig = plt.figure(figsize=_param.imageSize, facecolor='white')
+    _fig.canvas.manager.set_window_title(_label)
+    return _fig
+
+
+@profileLib.timed('plot')
+def plot_channel(_fig, _ax, _channel_index, _name, _psds, _ok, _not_ok, _param, xtype='frequency', baseline=None,
+                 plot_psd=0, plot_bad=0, plot_pdf=0, plot_nnm=0, colorbar_axes=None):
+    """plot the PSDs, PDFs and the baseline of a channel in a new panel appended to the _ax list
+
+    _name is the NET.STA.LOC.CHA label of the channel. Returns the colorbar axes of the PDF probability.
+    """
+    if _channel_index == 0:
+        _ax.append(plt.subplot(plot_rows, 1, _channel_index + 1))
+    else:
+        _ax.append(plt.subplot(plot_rows, 1, _channel_index + 1, sharex=_ax[0]))
+
+    _x_values = np.array(_psds.x_values)
+
+    # Plot the 'bad' PSDs in gray.
+    if plot_psd and plot_bad:
+        for _i, _index in enumerate(_not_ok):
+            if _i == 0:
+                plt.semilogx(_x_values, _psds.psd_values[_index], c='gray', label='Rejected')
+            else:
+                plt.semilogx(_x_values, _psds.psd_values[_index], c='gray')
+
+    if plot_psd:
+        # Plot the 'good' PSDs in green.
+        for _i, _index in enumerate(_ok):
+            if _i == 0:
+                plt.semilogx(_x_values, _psds.psd_values[_index], c='green', label='PSD')
+            else:
+                plt.semilogx(_x_values, _psds.psd_values[_index], c='green')
+
+    _image = None
+    if plot_pdf:
+        from obspy.imaging.cm import pqlx
+
+        # The count of all PSDs is shown with the PDFs.
+        _ok = list()
+        _image = plt.scatter(_psds.pdf_x, _psds.pdf_y, c=_psds.pdf_p, s=46.5, marker='_', linewidth=_param.lw,
+                             edgecolor='face', cmap=pqlx, alpha=_param.alpha)
+        _ax[_channel_index].set_xscale('log')
+
+    if baseline is not None:
+        plt.semilogx(_x_values, baseline.high, c='yellow', label='{}%'.format(baseline.percent_high))
+        plt.semilogx(_x_values, baseline.mid, c='red', label='{}%'.format(baseline.percent_mid))
+        plt.semilogx(_x_values, baseline.low, c='orange', label='{}%'.format(baseline.percent_low))
+    plt.semilogx((_param.hvsrXlim[0], _param.hvsrXlim[0]), _param.yLim, c='black')
+    plt.semilogx((_param.hvsrXlim[1], _param.hvsrXlim[1]), _param.yLim, c='black')
+    plt.axvspan(_param.xLim[xtype][0], _param.hvsrXlim[0], facecolor='#909090', alpha=0.5)
+    plt.axvspan(_param.hvsrXlim[1], _param.xLim[xtype][1], facecolor='#909090', alpha=0.5)
+    plt.ylim(_param.yLim)
+    plt.xlim(_param.xLim[xtype])
+    plt.ylabel(_param.yLabel)
+
+    if len(_ok) <= 0:
+        _anchored_text = AnchoredText(' '.join([_name, '{:,d}'.format(len(_psds.psd_values)), 'PSDs']), loc=2)
+    else:
+        _anchored_text = AnchoredText(' '.join([_name, '{:,d}'.format(len(_ok)), 'out of',
+                                                '{:,d}'.format(len(_psds.psd_values)), 'PSDs']), loc=2)
+    _ax[_channel_index].add_artist(_anchored_text)
+
+    if plot_nnm:
+        from obspy.signal.spectral_estimation import get_nlnm, get_nhnm
+        _nlnm_x, _nlnm_y = get_nlnm()
+        _nhnm_x, _nhnm_y = get_nhnm()
+        if xtype != 'period':
+            _nlnm_x = 1.0 / _nlnm_x
+            _nhnm_x = 1.0 / _nhnm_x
+        plt.plot(_nlnm_x, _nlnm_y, lw=2, ls='--', c='k', label='NLNM, NHNM')
+        plt.plot(_nhnm_x, _nhnm_y, lw=2, ls='--', c='k')
+
+    plt.legend(prop={'size': 6}, loc='lower left')
+
+    # Create a second axes for the colorbar.
+    if plot_pdf and colorbar_axes is None:
+        colorbar_axes = _fig.add_axes([0.92, 0.4, 0.01, 0.4])
+        _colorbar = _fig.colorbar(_image, colorbar_axes, orientation='vertical')
+        _colorbar.set_label('Probability (%)', size=9, rotation=270, labelpad=6)
+        plt.clim(_param.pMin, _param.pMax)
+    return colorbar_axes
+
+
+@profileLib.timed('plot')
+def plot_hvsr(_ax, _result, _peaks, _title, _hvsr_ylim, _param, xtype='frequency', panels=True):
+    """plot the HVSR curve and its peaks in the last panel (the only panel if not panels)"""
+    _nx = len(_result.x_values) - 1
+    _x_values = np.array(_result.x_values[0:_nx])
+    plt.suptitle(_title)
+    if panels:
+        _ax.append(plt.subplot(plot_rows, 1, 4))
+    else:
+        _ax.append(plt.subplot(1, 1, 1))
+
+    plt.semilogx(_x_values, _result.hvsr, lw=1, c='blue', label='HVSR')
+    plt.semilogx(_x_values, _result.hvsrp, c='red', lw=1, ls='--',
+                 label='{} {}'.format(peakLib.get_char(u'\u00B11'), peakLib.get_char(u'\u03C3')))
+    plt.semilogx(_x_values, _result.hvsrm, c='red', lw=1, ls='--')
+    plt.ylabel(_param.hvsrYlabel)
+    plt.legend(loc='upper left')
+
+    plt.xlim(_param.hvsrXlim)
+    _ax[-1].set_ylim(_hvsr_ylim)
+    plt.xlabel(_param.xLabel[xtype])
+
+    _peak = _peaks.peak
+    _stdf = _peaks.stdf
+    for _i in range(len(_peak)):
+        plt.semilogx(_peak[_i]['f0'], _peak[_i]['A0'], marker='o', c='r')
+        plt.semilogx((_peak[_i]['f0'], _peak[_i]['f0']), (_hvsr_ylim[0], _peak[_i]['A0']), c='red')
+        if _stdf[_i] < float(_peak[_i]['f0']):
+            _dz = _stdf[_i]
+            plt.axvspan(float(_peak[_i]['f0']) - _dz, float(_peak[_i]['f0']) + _dz, facecolor='#909090', alpha=0.5)
+            plt.semilogx((_peak[_i]['f0'], _peak[_i]['f0']), (_hvsr_ylim[0], _hvsr_ylim[1]), c='#dcdcdc', lw=0.5)
+
+
+def remove_hvsr(_ax):
+    """remove the HVSR panel, the last panel of the _ax list, to plot the HVSR of another method"""
+    _ax.pop().remove()
+
+
+@profileLib.timed('plot')
+def save(_file_name, _param):
+    """save the figure"""
+    plt.savefig(_file_name, dpi=_param.imageDpi, transparent=True, bbox_inches='tight', pad_inches=0.1)
+
+
+def show():
+    """display the figure"""
+    plt.show()
+
+
+def close():
+    """release all figures"""
+    plt.close('all')
@@ -0,0 +1,239 @@
+"""
+  DESCRIPTION
+    a collection of functions to time the stages of a run and count its requests and PSDs
+
+  HISTORY
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+  NOTES
+    A run starts a Profile with start() and the libraries record into the active profile:
+
+        stage(name)          times a block (a context manager), timed(name) times a function (a decorator)
+        add_time(name, s)    adds the seconds of a stage that is not one block (PSD parsing during the read)
+        count(name, value)   adds to a counter, e.g. the accepted and rejected PSDs
+        add_request(...)     records the size, latency and parse time of a MUSTANG request
+
+    Without an active profile these calls only check a module variable, so the libraries are always instrumented.
+
+    Stage times are self times: the time of a stage nested in another stage (e.g. the fetch of the DFA energy
+    inside the HVSR stage) is counted once, in the inner stage. Stages run on the request threads add up, so the
+    total of the stages may be more than the wall-clock time of the run. The summary is written as JSON by write(),
+    optionally with a cProfile dump of the thread that started the profile (load it with the pstats module or a
+    viewer such as snakeviz).
+"""
+
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+# The active profile, None when the run is not profiled.
+_active = None
+
+# Lock of the profile values, the requests are recorded by the fetch threads.
+_lock = threading.Lock()
+
+# Stack of the running stages of each thread.
+_local = threading.local()
+
+
+@dataclass
+class Profile:
+    """stage times (seconds, calls) and counters by name and the requests of a run"""
+    name: str
+    started: float = field(default_factory=time.time)
+    stopped: float = None
+    stages: dict = field(default_factory=dict)
+    counters: dict = field(default_factory=dict)
+    requests: list = field(default_factory=list)
+    profiler: cProfile.Profile = None
+
+
+def start(_name, cprofile=False):
+    """start profiling the run _name, with cProfile if cprofile, and return its Profile"""
+    global _active
+    _profile = Profile(_name)
+    if cprofile:
+        _profile.profiler = cProfile.Profile()
+        _profile.profiler.enable()
+    _active = _profile
+    return _profile
+
+
+def stop():
+    """stop profiling and return the Profile, None if the run was not profiled"""
+    global _active
+    _profile = _active
+    _active = None
+    if _profile is not None:
+        _profile.stopped = time.time()
+        if _profile.profiler is not None:
+            _profile.profiler.disable()
+    return _profile
+
+
+def is_active():
+    """True if the run is profiled"""
+    return _active is not None
+
+
+@contextmanager
+def stage(_name):
+    """time the block as the _name stage of the active profile"""
+    _profile = _active
+    if _profile is None:
+        yield
+        return
+
+    _stack = getattr(_local, 'stack', None)
+    if _stack is None:
+        _stack = _local.stack = list()
+
+    # [start, time of the nested stages]
+    _frame = [time.perf_counter(), 0.0]
+    _stack.append(_frame)
+    try:
+        yield
+    finally:
+        _stack.pop()
+        _elapsed = time.perf_counter() - _frame[0]
+        if _stack:
+            _stack[-1][1] += _elapsed
+        add_time(_name, _elapsed - _frame[1], profile=_profile)
+
+
+def add_time(_name, _seconds, calls=1, profile=None):
+    """add _seconds and calls to the _name stage of the active profile, for the stages that are not one block"""
+    _profile = _active if profile is None else profile
+    if _profile is None:
+        return
+    with _lock:
+        _stage = _profile.stages.setdefault(_name, [0.0, 0])
+        _stage[0] += _seconds
+        _stage[1] += calls
+
+
+def timed(_name):
+    """decorator, time each call of the function as the _name stage"""
+
+    def _decorator(_function):
+        @functools.wraps(_function)
+        def _wrapper(*_args, **_kwargs):
+            if _active is None:
+                return _function(*_args, **_kwargs)
+            with stage(_name):
+                return _function(*_args, **_kwargs)
+
+        return _wrapper
+
+    return _decorator
+
+
+def count(_name, _value=1):
+    """add _value to the _name counter of the active profile"""
+    _profile = _active
+    if _profile is None:
+        return
+    with _lock:
+        _profile.counters[_name] = _profile.counters.get(_name, 0) + _value
+
+
+def add_request(_url, _bytes, _latency, _seconds, parse=None, error=None):
+    """record a request of _url: response _bytes, _latency to the response headers, total _seconds and the seconds
+    spent parsing the response, error is the exception of a failed request"""
+    _profile = _active
+    if _profile is None:
+        return
+    _request = {'url': _url, 'bytes': int(_bytes), 'latency': round(_latency, 6), 'seconds': round(_seconds, 6),
+                'parse': None if parse is None else round(parse, 6),
+                'error': None if error is None else '{}: {}'.format(type(error).__name__, error)}
+    with _lock:
+        _profile.requests.append(_request)
+
+
+class CountingReader:
+    """a file object that counts the bytes read from _source and the seconds spent reading them"""
+
+    def __init__(self, _source):
+        self.source = _source
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def read(self, *_args):
+        _t = time.perf_counter()
+        _data = self.source.read(*_args)
+        self.seconds += time.perf_counter() - _t
+        self.bytes += len(_data)
+        return _data
+
+
+def get_summary(_profile):
+    """the summary of a Profile as a dictionary for JSON: wall-clock seconds, stages by decreasing time,
+    counters, request statistics and the requests"""
+    _stopped = time.time() if _profile.stopped is None else _profile.stopped
+    _requests = sorted(_profile.requests, key=lambda _request: _request['url'])
+    _latency = sorted(_request['latency'] for _request in _requests)
+    return {
+        'name': _profile.name,
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(_profile.started)),
+        'seconds': round(_stopped - _profile.started, 6),
+        'stages': {_name: {'seconds': round(_value[0], 6), 'calls': _value[1]} for _name, _value in
+                   sorted(_profile.stages.items(), key=lambda _item: _item[1][0], reverse=True)},
+        'counters': dict(sorted(_profile.counters.items())),
+        'request_summary': {
+            'count': len(_requests),
+            'failed': sum(1 for _request in _requests if _request['error'] is not None),
+            'bytes': sum(_request['bytes'] for _request in _requests),
+            'seconds': round(sum(_request['seconds'] for _request in _requests), 6),
+            'parse': round(sum(_request['parse'] or 0.0 for _request in _requests), 6),
+            'latency_min': _latency[0] if _latency else None,
+            'latency_median': _latency[len(_latency) // 2] if _latency else None,
+            'latency_max': _latency[-1] if _latency else None},
+        'requests': _requests}
+
+
+def get_file_name(_directory, _name):
+    """JSON summary file of the run _name, the cProfile dump has the .prof extension"""
+    return os.path.join(_directory, '{}.profile.json'.format(_name))
+
+
+def write(_file_name, _profile):
+    """write the JSON summary of a Profile and its cProfile dump (if any), returns the written file names"""
+    _files = [_file_name]
+    _temporary = '{}.{}.tmp'.format(_file_name, os.getpid())
+    with open(_temporary, 'w') as _output:
+        json.dump(get_summary(_profile), _output, indent=2)
+    os.replace(_temporary, _file_name)
+    if _profile.profiler is not None:
+        _files.append(_file_name.replace('.json', '.prof'))
+        _profile.profiler.dump_stats(_files[-1])
+    return _files
+
+
+def read(_file_name):
+    """read a JSON summary, None if not available"""
+    try:
+        with open(_file_name, 'r') as _input:
+            return json.load(_input)
+    except (OSError, ValueError):
+        return None
+
+
+def print_summary(_summary, top=None):
+    """print the stage times, counters and request statistics of a summary"""
+    print('\n[PROFILE] {} {:0.3f} s'.format(_summary['name'], _summary['seconds']))
+    for _name, _stage in list(_summary['stages'].items())[0:top]:
+        print('\t{:<16s} {:10.3f} s {:6d} calls'.format(_name, _stage['seconds'], _stage['calls']))
+    for _name, _value in _summary['counters'].items():
+        print('\t{:<16s} {:>10}'.format(_name, _value))
+    _requests = _summary['request_summary']
+    if _requests['count']:
+        print('\t{} requests ({} failed), {:,d} bytes, {:0.3f} s, {:0.3f} s parsing, latency {:0.3f}/{:0.3f}/{:0.3f} s '
+              '(min/median/max)'.format(_requests['count'], _requests['failed'], _requests['bytes'],
+                                        _requests['seconds'], _requests['parse'], _requests['latency_min'],
+                                        _requests['latency_median'], _requests['latency_max']))
+    print('', flush=True)
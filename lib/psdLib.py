@@ -0,0 +1,63 @@
+"""
+  DESCRIPTION
+    a collection of functions to work with the MUSTANG noise-psd PSDs
+
+  HISTORY
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+  NOTES
+    The noise-psd XML response is parsed incrementally, one <Psd> element at a time, so no document tree of the
+    whole response is built. Whether the PSDs themselves are kept is up to the caller: fetchLib.get_psds() collects
+    them into a list, the computeLib streaming mode reduces them to daily values as they are yielded:
+
+        <Psds>
+            <Psd target="TA.TCOL.--.BHZ.M" start="2013-01-01T00:00:00.000Z" end="2013-01-01T01:00:00.000Z">
+                <value freq="0.0050" power="-150"/>
+                ...
+"""
+
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+
+def iter_psds(_source):
+    """parse a MUSTANG noise-psd XML response and yield one PSD at a time
+
+    _source is a file name or a file object, e.g. the urlopen() response, so that PSDs are yielded while the
+    response is read. For each <Psd> a (start, frequency, power) tuple is yielded, start is the PSD start time
+    string, frequency is a float64 array of the PSD frequencies and power is a float32 array of the PSD powers.
+    The frequency array is reused by the next PSD and must be copied if it has to be kept.
+    """
+    _size = 0
+    _count = 0
+    _frequency = np.empty(_size, dtype=np.float64)
+    _power = np.empty(_size, dtype=np.float32)
+    _parent = None
+
+    for _event, _element in ET.iterparse(_source, events=('start', 'end')):
+        if _event == 'start':
+            if _element.tag == 'Psds':
+                _parent = _element
+            elif _element.tag == 'Psd':
+                _count = 0
+            continue
+
+        if _element.tag == 'value':
+
+            # Grow the preallocated row only when a PSD has more values than the previous ones.
+            if _count >= _size:
+                _size = max(2 * _size, 128)
+                _frequency = np.resize(_frequency, _size)
+                _power = np.resize(_power, _size)
+            _frequency[_count] = _element.attrib['freq']
+            _power[_count] = _element.attrib['power']
+            _count += 1
+
+        elif _element.tag == 'Psd':
+            yield _element.attrib['start'], _frequency[:_count], _power[:_count].copy()
+
+            # Free the PSD and its values.
+            _element.clear()
+            if _parent is not None:
+                del _parent[:]
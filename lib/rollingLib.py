@@ -0,0 +1,166 @@
+"""
+  DESCRIPTION
+    a collection of functions to keep the daily HVSRs of a rolling window and their running sums on disk
+
+  HISTORY
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+  NOTES
+    The rolling window of each NET.STA.LOC and combination method is stored with the daily HVSR curves of its days
+    and the running sums of HVSR, HVSR^2, log10 HVSR and (log10 HVSR)^2 over them:
+
+        <rolling directory>/<NET.STA.LOC>.M<method>.npz
+
+    When the window moves, the new days are added to the sums and the days that fell out of the window are
+    subtracted, so the mean, standard deviation and log standard deviation of the window are updated in O(bins)
+    per day without aggregating the whole window again (see hvsrLib.get_sum_statistics()).
+
+    The window is started again when the PSD frequencies or its key change. The key identifies the channels and
+    the settings the daily HVSRs are computed with (see computeLib.get_rolling_key()), so daily HVSRs of different
+    settings are never mixed in one window.
+
+    Days that were checked and have no HVSR (no PSDs or a missing component) are kept in 'empty' so they are not
+    requested again. Days within 'recent_days' of today may still be updated by MUSTANG and are requested on every
+    update.
+"""
+
+import datetime
+import os
+import tempfile
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import hvsrLib
+import storeLib
+
+
+@dataclass
+class Rolling:
+    """daily HVSRs of the window by day (days in order) and their running sums, a (4 x bins) array
+
+    frequency holds the PSD frequencies, the HVSR bins are all of them but the last. key identifies the settings of
+    the daily HVSRs.
+    """
+    frequency: np.ndarray
+    key: str = ''
+    days: list = field(default_factory=list)
+    daily_hvsr: np.ndarray = None
+    sums: np.ndarray = None
+    empty: set = field(default_factory=set)
+
+    def __post_init__(self):
+        _bins = len(self.frequency) - 1
+        if self.daily_hvsr is None:
+            self.daily_hvsr = np.empty((0, _bins))
+        if self.sums is None:
+            self.sums = np.zeros((4, _bins))
+
+
+def get_file(_directory, _name, _method):
+    """rolling window file of the _name (NET.STA.LOC) station and _method"""
+    return os.path.join(_directory, '{}.M{}.npz'.format(_name, _method))
+
+
+def read(_file):
+    """read a stored rolling window, None if not available"""
+    try:
+        with np.load(_file, allow_pickle=False) as _data:
+            return Rolling(_data['frequency'], str(_data['key']), _data['days'].tolist(), _data['daily_hvsr'],
+                           _data['sums'], set(_data['empty'].tolist()))
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def write(_file, _rolling):
+    """write the rolling window"""
+
+    # Write to a temporary file first, so readers never see a partial file.
+    _handle, _temporary = tempfile.mkstemp(dir=os.path.dirname(_file), suffix='.tmp')
+    try:
+        with os.fdopen(_handle, 'wb') as _output:
+            np.savez_compressed(_output, frequency=_rolling.frequency, key=np.array(_rolling.key),
+                                days=np.array(_rolling.days, dtype='U10'),
+                                daily_hvsr=_rolling.daily_hvsr, sums=_rolling.sums,
+                                empty=np.array(sorted(_rolling.empty), dtype='U10'))
+        os.replace(_temporary, _file)
+    except OSError:
+        if os.path.exists(_temporary):
+            os.remove(_temporary)
+        raise
+
+
+def get_final_end(recent_days=3):
+    """the first day that may still be updated by MUSTANG"""
+    return (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=recent_days)).strftime(
+        '%Y-%m-%d')
+
+
+def matches(_rolling, _key):
+    """True if there is a _rolling window and it has the _key"""
+    return _rolling is not None and _rolling.key == _key
+
+
+def get_missing(_rolling, _key, _start, _end, recent_days=3):
+    """the days from _start to _end (exclusive) that are not in the rolling window of the _key or are recent"""
+    _final_end = get_final_end(recent_days)
+    _known = _rolling.empty.union(_rolling.days) if matches(_rolling, _key) else set()
+    return [_day for _day in storeLib.get_days(_start, _end) if _day not in _known or _day >= _final_end]
+
+
+def remove(_rolling, _day):
+    """remove a day from the window and subtract it from the sums"""
+    if _day not in _rolling.days:
+        return
+    _row = _rolling.days.index(_day)
+    _rolling.sums -= hvsrLib.get_sum_values(_rolling.daily_hvsr[_row])
+    _rolling.daily_hvsr = np.delete(_rolling.daily_hvsr, _row, axis=0)
+    del _rolling.days[_row]
+
+
+def add(_rolling, _day, _hvsr):
+    """add the daily HVSR of a day to the window and its sums, replaces the day if it is already in the window"""
+    remove(_rolling, _day)
+    _rolling.empty.discard(_day)
+    _row = int(np.searchsorted(np.array(_rolling.days, dtype='U10'), _day))
+    _rolling.sums += hvsrLib.get_sum_values(_hvsr)
+    _rolling.daily_hvsr = np.insert(_rolling.daily_hvsr, _row, _hvsr, axis=0)
+    _rolling.days.insert(_row, _day)
+
+
+def move(_rolling, _start, _end):
+    """drop the days before _start and from _end on (exclusive) from the window"""
+    for _day in [_day for _day in _rolling.days if _day < _start or _day >= _end]:
+        remove(_rolling, _day)
+    _rolling.empty = {_day for _day in _rolling.empty if _start <= _day < _end}
+
+
+def update(_rolling, _key, _frequency, _days, _hvsr_days, _daily_hvsr, _start, _end, recent_days=3):
+    """add the daily HVSRs of a run over the _days to the window and move the window to _start - _end
+
+    _days are all the days of the run, the days that have no HVSR (not in _hvsr_days) are marked empty if they are
+    final and removed from the window. The window is started again if the frequencies or the _key changed.
+    """
+    _frequency = np.asarray(_frequency, dtype=float)
+    if not matches(_rolling, _key) or len(_rolling.frequency) != len(_frequency) or \
+            not np.allclose(_rolling.frequency, _frequency, rtol=1.0e-6, atol=0.0):
+        _rolling = Rolling(_frequency, _key)
+
+    _final_end = get_final_end(recent_days)
+    _rows = {_day: _row for _row, _day in enumerate(_hvsr_days)}
+    for _day in _days:
+        if _day in _rows:
+            add(_rolling, _day, _daily_hvsr[_rows[_day]])
+        else:
+            remove(_rolling, _day)
+            if _day < _final_end:
+                _rolling.empty.add(_day)
+    move(_rolling, _start, _end)
+    return _rolling
+
+
+def get_statistics(_rolling):
+    """hvsrLib.get_statistics() values of the window, from its running sums"""
+    if not _rolling.days:
+        return hvsrLib.get_statistics(_rolling.daily_hvsr[0:0])
+    return hvsrLib.get_sum_statistics(_rolling.sums, len(_rolling.days))
@@ -0,0 +1,196 @@
+"""
+  DESCRIPTION
+    a collection of functions to keep the parsed MUSTANG PSDs in a local day-partitioned store
+
+  HISTORY
+    2026-10-18 IRIS DMC Product Team: created V.2026.291
+
+  NOTES
+    The PSDs of each NET.STA.LOC.CHA are stored one file per day, by the day the PSDs start:
+
+        <store directory>/<NET.STA.LOC.CHA>/<YYYY-MM-DD>.npz
+
+    so that runs over overlapping (sliding) windows only request the days that are not in the store yet. Days with
+    no PSDs are stored too (empty), so that they are not requested again. Like the response cache, days within
+    'recent_days' of the time they were stored may still be updated by MUSTANG and expire after 'ttl' hours.
+
+    The stored days that no longer expire are compacted into the memory-mapped archive of the channel (see
+    archiveLib.py), in order and without gaps from the first stored day, and then removed from the store.
+"""
+
+import datetime
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import archiveLib
+import cacheLib
+
+
+def get_name(_network, _station, _location, _channel):
+    """store name of a channel"""
+    return '.'.join([_network, _station, _location, _channel]).replace('*', '_')
+
+
+def get_days(_start, _end):
+    """list of the days from _start (inclusive) to _end (exclusive), or just _start if they are the same day"""
+    _day = datetime.datetime.strptime(_start, '%Y-%m-%d')
+    _end_day = datetime.datetime.strptime(_end, '%Y-%m-%d')
+    if _end_day <= _day:
+        return [_start]
+    _days = list()
+    while _day < _end_day:
+        _days.append(_day.strftime('%Y-%m-%d'))
+        _day += datetime.timedelta(days=1)
+    return _days
+
+
+def next_day(_day):
+    """the day after _day"""
+    return (datetime.datetime.strptime(_day, '%Y-%m-%d') + datetime.timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def get_gaps(_days, _missing):
+    """find the contiguous runs of _missing days in _days
+
+    Returns a list of (first day, day after the last day) of each run.
+    """
+    _missing = set(_missing)
+    _gaps = list()
+    _first = None
+    for _index, _day in enumerate(_days):
+        if _day in _missing:
+            if _first is None:
+                _first = _day
+            if _index + 1 == len(_days) or _days[_index + 1] not in _missing:
+                _gaps.append((_first, next_day(_day)))
+                _first = None
+    return _gaps
+
+
+def split_days(_psds):
+    """group a list of (start, frequency, power) PSDs by their start day"""
+    _daily = dict()
+    for _psd in _psds:
+        _daily.setdefault(_psd[0].split('T')[0], list()).append(_psd)
+    return _daily
+
+
+def read(_directory, _name, _day):
+    """read the PSDs of _day from the store, None if the day is not stored or has expired"""
+    _file = os.path.join(_directory, _name, '{}.npz'.format(_day))
+    try:
+        with np.load(_file, allow_pickle=False) as _npz:
+            _expires = float(_npz['expires'])
+            if 0 < _expires < time.time():
+                return None
+            return cacheLib.unpack('psd', {_key: _npz[_key] for _key in _npz.files})
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def is_stored(_directory, _name, _day):
+    """True if the PSDs of _day are in the store and have not expired, only the expiry time is read"""
+    _file = os.path.join(_directory, _name, '{}.npz'.format(_day))
+    try:
+        with np.load(_file, allow_pickle=False) as _npz:
+            _expires = float(_npz['expires'])
+    except (OSError, KeyError, ValueError):
+        return False
+    return not 0 < _expires < time.time()
+
+
+def get_archive_days(_directory, _name, _days):
+    """the _days covered by the archive of the channel"""
+    _coverage = archiveLib.get_coverage(archiveLib.get_file(_directory, _name))
+    if _coverage is None:
+        return list()
+    return [_day for _day, _epoch in zip(_days, archiveLib.to_epoch(_days)) if _coverage[0] <= _epoch < _coverage[1]]
+
+
+def read_archive(_directory, _name, _days):
+    """read the PSDs of the _days covered by the archive of the channel, returns a {day: PSDs} dictionary"""
+    _file = archiveLib.get_file(_directory, _name)
+    _days = get_archive_days(_directory, _name, _days)
+    if not _days:
+        return dict()
+    _daily = split_days(archiveLib.read(_file, archiveLib.to_epoch([_days[0]])[0],
+                                        archiveLib.to_epoch([next_day(_days[-1])])[0]))
+    return {_day: _daily.get(_day, list()) for _day in _days}
+
+
+def write(_directory, _name, _day, _psds, recent_days=3, ttl=24):
+    """write the PSDs of _day to the store"""
+    _expires = 0.0
+    if datetime.datetime.strptime(_day, '%Y-%m-%d').replace(tzinfo=datetime.timezone.utc) > \
+            datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=recent_days + 1):
+        _expires = time.time() + ttl * 3600.0
+
+    _channel_directory = os.path.join(_directory, _name)
+    os.makedirs(_channel_directory, exist_ok=True)
+    _handle, _temporary = tempfile.mkstemp(dir=_channel_directory, suffix='.tmp')
+    try:
+        with os.fdopen(_handle, 'wb') as _output:
+            np.savez_compressed(_output, expires=_expires, **cacheLib.pack('psd', _psds))
+        os.replace(_temporary, os.path.join(_channel_directory, '{}.npz'.format(_day)))
+    except OSError:
+        if os.path.exists(_temporary):
+            os.remove(_temporary)
+        raise
+
+
+def compact(_directory, _name):
+    """move the days that no longer expire from the store to the archive of the channel
+
+    Days are appended to the archive while they follow its end day without a gap and their PSDs have the archive
+    frequencies. Returns the number of days moved.
+    """
+    _file = archiveLib.get_file(_directory, _name)
+    _coverage = archiveLib.get_coverage(_file)
+    _channel_directory = os.path.join(_directory, _name)
+    try:
+        _days = sorted(_entry.name[:-4] for _entry in os.scandir(_channel_directory) if _entry.name.endswith('.npz'))
+    except OSError:
+        return 0
+    if _coverage is not None:
+        _end_day = archiveLib.from_epoch([_coverage[1]])[0].split('T')[0]
+        _days = [_day for _day in _days if _day >= _end_day]
+        if not _days or _days[0] != _end_day:
+            return 0
+        _frequency = archiveLib.read_header(_file)[0]
+    else:
+        _frequency = None
+
+    # The run of final days to append.
+    _run = list()
+    _psds = list()
+    for _day in _days:
+        if _run and _day != next_day(_run[-1]):
+            break
+        _file_name = os.path.join(_channel_directory, '{}.npz'.format(_day))
+        try:
+            with np.load(_file_name, allow_pickle=False) as _npz:
+                if float(_npz['expires']) > 0:
+                    break
+                _day_psds = cacheLib.unpack('psd', {_key: _npz[_key] for _key in _npz.files})
+        except (OSError, KeyError, ValueError):
+            break
+        if _frequency is None and _day_psds:
+            _frequency = _day_psds[0][1]
+        if any(not np.array_equal(_psd[1], _frequency) for _psd in _day_psds):
+            break
+        _run.append(_day)
+        _psds += _day_psds
+
+    # A new archive needs the frequencies of at least one PSD.
+    if not _run or _frequency is None:
+        return 0
+
+    archiveLib.append(_file, _frequency, archiveLib.to_epoch([_psd[0] for _psd in _psds]),
+                      np.array([_psd[2] for _psd in _psds], dtype=np.float32).reshape(len(_psds), len(_frequency)),
+                      archiveLib.to_epoch([_run[0]])[0], archiveLib.to_epoch([next_day(_run[-1])])[0])
+    for _day in _run:
+        os.remove(os.path.join(_channel_directory, '{}.npz'.format(_day)))
+    return len(_run)
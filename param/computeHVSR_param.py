@@ -5,6 +5,9 @@
  computeHVSR.py configuration parameters
 
  HISTORY
+  2026-10-18 IRIS DMC Product Team: added workers, the cache, store, archive, outlier rejection, streaming,
+                                    time series, rolling, bootstrap, output format,
+                                    index and profile parameters V.2026.291
   2020-02-24 IRIS DMC Product Team (Manoch): added reportDirectory V.2020.055
   2019-07-31 IRIS DMC Product Team (Manoch): style update V.2019.212
   2018-07-10 IRIS DMC Product Team (Manoch): pre-release V.2018.191
@@ -42,6 +45,63 @@ baselineDirectory = fileLib.mkdir(dataDirectory, 'baseline')
 reportDirectory = fileLib.mkdir(dataDirectory, 'report')
 hvsrDirectory = fileLib.mkdir(dataDirectory, 'hvsr')
 
+# Local cache of the parsed MUSTANG responses under workDir (see lib/cacheLib.py).
+#   off      do not use the cache
+#   read     use the cached response if available, otherwise request and cache it
+#   refresh  always request and cache the response
+cache = 'read'
+cacheDirectory = fileLib.mkdir(workDir, 'cache')
+
+# Maximum cache size (MB), the least recently used responses are removed first.
+cacheSize = 2000
+
+# Responses that end within cacheRecentDays of the time they were cached may still be updated by MUSTANG,
+# these expire after cacheTtl hours.
+cacheRecentDays = 3
+cacheTtl = 24
+
+# Day-partitioned local store of the parsed PSDs under workDir (see lib/storeLib.py). When on, only the days that
+# are not in the store are requested from MUSTANG. The store follows the cache mode above (off also turns it off).
+store = 1
+storeDirectory = fileLib.mkdir(workDir, 'psd')
+
+# Move the stored days that no longer change to one memory-mapped archive file per channel (see lib/archiveLib.py).
+archive = 1
+
+# Streaming mode: read the PSDs of the three channels one day at a time, from the store or as the MUSTANG responses
+# arrive, and keep only the median daily PSDs (and for DFA the daily energy) instead of all the PSDs of the window.
+# The PSD and PDF panels are not plotted in this mode [0=no, 1=yes].
+streaming = 0
+
+# Time series: also write the HVSR and the best ranked f0/A0 of each day (1) or of each rolling window of that many
+# days to a NumPy .npz file next to the HVSR file, for monitoring f0 over time [0=no, days].
+timeseries = 0
+
+# Rolling mode: compute the HVSR of the window of that many days before end and keep its daily HVSRs and running
+# sums under rollingDirectory, so the next run only requests and adds the new days [0=no, days]. The window starts
+# again when the channels or the outlier and baseline settings change.
+rolling = 0
+rollingDirectory = fileLib.mkdir(dataDirectory, 'rolling')
+
+# Bootstrap confidence intervals of f0 and A0: number of resamples of the days (with replacement, 0=none), the seed
+# of the random generator (the same seed gives the same intervals) and the confidence level in percent.
+bootstrap = 0
+bootstrapseed = 0
+bootstrapconfidence = 95
+
+# HVSR output files, a comma list of text (3 decimals), npz (full precision curves, daily HVSRs and run metadata)
+# and parquet (the same as a Parquet table, needs pyarrow, .npz is written if it is not installed).
+outputformat = 'text'
+
+# SQLite index of the peaks and output files of the runs, queried by queryHVSR.py (see lib/indexLib.py) [0=no, 1=yes].
+index = 1
+indexFile = os.path.join(dataDirectory, 'hvsr.sqlite')
+
+# Profile of a run (see lib/profileLib.py): the stage times, request sizes and latencies and PSD counts as a JSON
+# summary under profileDirectory [0=no, 1=JSON summary, 2=JSON summary and cProfile dump].
+profile = 0
+profileDirectory = fileLib.mkdir(workDir, 'profile')
+
 # Default station channel list.
 chan = 'BHZ,BHN,BHE'
 
@@ -49,6 +109,9 @@ chan = 'BHZ,BHN,BHE'
 # Increase 'n' when requesting long time intervals to avoid request failures.
 n = 1
 
+# Number of MUSTANG requests (channels and 'n' segments, PSDs and PDFs) to run concurrently.
+workers = 4
+
 # Define x-axis  type (period or frequency).
 xtype = 'frequency'
 hvsrband = [0.2, 15]
@@ -56,6 +119,12 @@ hvsrband = [0.2, 15]
 # should we remove outliers? (0|1)
 removeoutliers = 1
 
+# outlier rejection: a PSD is rejected if more than outlierfraction (0-1) of its frequency bins fall below the
+# baseline low or above the baseline high by more than outliertolerance (dB). With the defaults (0, 0) a PSD is
+# rejected if any of its bins is outside the baseline.
+outliertolerance = 0
+outlierfraction = 0
+
 # minimum peak amplitude to be considered. By increasing the waterlevel, you will reduce the sensitivity of
 # peak picking.
 waterlevel = 1.8
@@ -76,6 +145,7 @@ minrank = 2
 methodList = ['', 'Diffuse Field Assumption', 'arithmetic mean', 'geometric mean', 'vector summation',
               'quadratic mean', 'maximum horizontal value']
 
+# method may also be a comma list of methods, e.g. '1,4', or 'all' for the methods 2-6.
 method = 4
 
 # plot
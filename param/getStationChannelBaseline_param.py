@@ -5,6 +5,7 @@ IRIS HVSR bundle
   HVSR configuration parameters for getStationChannelBaseline
 
   HISTORY
+    2026-10-18 IRIS DMC Product Team: added the cache and incremental histogram parameters V.2026.291
     2019-07-31 IRIS DMC Product Team (Manoch): style update V.2019.212
     2019-06-03 IRIS DMC Product Team (Manoch): Release V.2019.154
     2018-07-10 IRIS DMC Product Team (Manoch): pre-release V.2018-191
@@ -36,6 +37,27 @@ imageDirectory = fileLib.mkdir(parentDirectory, os.path.join('image', 'baseline'
 workDir = fileLib.mkdir(parentDirectory, 'scratch')
 baselineDirectory = fileLib.mkdir(dataDirectory, 'baseline')
 
+# Local cache of the parsed MUSTANG responses under workDir (see lib/cacheLib.py).
+#   off      do not use the cache
+#   read     use the cached response if available, otherwise request and cache it
+#   refresh  always request and cache the response
+cache = 'read'
+cacheDirectory = fileLib.mkdir(workDir, 'cache')
+
+# Maximum cache size (MB), the least recently used responses are removed first.
+cacheSize = 2000
+
+# Responses that end within cacheRecentDays of the time they were cached may still be updated by MUSTANG,
+# these expire after cacheTtl hours.
+cacheRecentDays = 3
+cacheTtl = 24
+
+# Keep the merged noise-pdf histogram of each channel under histogramDirectory (see lib/histogramLib.py) and only
+# request the days that are not in it yet [0=no, 1=yes]. The baseline then covers all the days of the histogram,
+# remove the channel's histogram file to start over. Days within cacheRecentDays are requested on every run.
+incremental = 0
+histogramDirectory = fileLib.mkdir(dataDirectory, 'histogram')
+
 # Default station channel codes.
 chan = 'BHZ,BH1,BH2'
 